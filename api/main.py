@@ -3,16 +3,20 @@ FastAPI Backend for Student Rating System
 Modern REST API with beautiful web interface
 """
 
-from fastapi import FastAPI, HTTPException, File, UploadFile
+from fastapi import FastAPI, HTTPException, File, UploadFile, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Dict, Any, List
 import sys
 import os
 from datetime import datetime
+from contextlib import asynccontextmanager
 import json
+import time
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -20,12 +24,36 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 from student_rating import StudentRatingModel
 from data_input import StudentDataInput
 from groq_client import GroqSuggestionGenerator
+from groq_pool import get_pool_stats
+from leaderboard import SchemaLeaderboards
+from tiers import api_classifier as tier_classifier
+from sensitivity import SensitivityAnalyzer, DEFAULT_STEPS
+from cohorts import SchemaCohorts, LEVELS
+from rating_schema import RatingSchema, SchemaRegistry
+from job_queue import JobQueue, QueueFullError
+from request_coalescer import RequestCoalescer, canonical_key
+from shared_state import SharedModelState
+import metrics
+import profiling
+from profiling import profiled
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """App lifecycle: stop background workers on shutdown (durable jobs resume on next start)"""
+    yield
+    job_queue.shutdown()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Student Rating System",
     description="FIFA-style student performance analysis with AI-powered insights",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -37,6 +65,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_request_duration(request: Request, call_next):
+    """Time every request into the request-duration histogram"""
+    if not metrics.ENABLED:
+        return await call_next(request)
+    
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Route template (not the raw path) keeps label cardinality bounded
+    route = request.scope.get("route")
+    metrics.observe_request(
+        request.method,
+        getattr(route, "path", "unmatched"),
+        response.status_code,
+        time.perf_counter() - start
+    )
+    return response
+
+
+def _profile_requested(request: Request) -> bool:
+    flag = request.headers.get("x-profile") or request.query_params.get("profile")
+    return flag is not None and flag.lower() in ("1", "true", "yes")
+
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """
+    Profile a single request on demand (admins only).
+    
+    Send `X-Profile: 1` or `?profile=1` with `X-Admin-Token` matching
+    STUDENT_RATING_ADMIN_TOKEN. The profile is saved under
+    STUDENT_RATING_PROFILE_DIR and its hot spots are added to JSON responses
+    as "profile" (other responses get an X-Profile-Id header).
+    
+    Only the request's threadpool work (profiled() callables) is profiled:
+    the event loop interleaves every other request, so its time cannot be
+    attributed to this one.
+    """
+    if not _profile_requested(request):
+        return await call_next(request)
+    if not profiling.is_authorized(request.headers.get("x-admin-token")):
+        return JSONResponse(status_code=403, content={"detail": "Profiling requires a valid admin token"})
+    
+    label = f"{request.method} {request.url.path}"
+    with profiling.profile_session(label, include_caller=False) as session:
+        response = await call_next(request)
+        # Drain the body inside the session so streamed work is profiled too
+        body = b"".join([chunk async for chunk in response.body_iterator])
+    
+    summary = session.summary()
+    headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+    headers["X-Profile-Id"] = session.id
+    if headers.get("content-type") == "application/json":
+        content = json.loads(body)
+        if isinstance(content, dict):
+            content["profile"] = summary
+            return JSONResponse(status_code=response.status_code, content=content, headers=headers)
+    return Response(body, status_code=response.status_code, headers=headers)
+
+
 # Mount static files
 static_path = os.path.join(os.path.dirname(__file__), '..', 'static')
 os.makedirs(static_path, exist_ok=True)
@@ -48,6 +137,33 @@ model_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'student_ra
 if os.path.exists(model_path):
     model.load_model(model_path)
 
+# Multi-worker mode: all worker processes share weights and counters
+shared_state_path = os.environ.get("STUDENT_RATING_SHARED_STATE")
+if shared_state_path:
+    model.attach_shared_state(
+        SharedModelState(
+            shared_state_path, model.weights, model.performance_metrics,
+            statistics=model.learner.get_statistics()
+        )
+    )
+
+# School-specific rating schemas (schemas/*.json, *.yaml), compiled once at startup
+schemas = SchemaRegistry(os.environ.get(
+    "STUDENT_RATING_SCHEMA_DIR", os.path.join(os.path.dirname(__file__), '..', 'schemas')
+))
+logger.info("Rating schemas loaded", extra={"schemas": schemas.names()})
+
+# What-if grids are rated with the same model and tier bands as /api/analyze
+sensitivity = SensitivityAnalyzer(model, tier_classifier)
+
+# Ranking indexes (one per rating schema) seeded from stored ratings, fed by every new rating
+leaderboards = SchemaLeaderboards.from_history(model.prediction_history, model.schema.name)
+
+# School/grade/class aggregates (one set per rating schema), seeded the same way and fed alongside the leaderboards
+cohorts = SchemaCohorts.from_history(
+    model.prediction_history, model, schemas, tier_classifier, model.schema.name
+)
+
 # Try to initialize Groq
 try:
     groq_client = GroqSuggestionGenerator()
@@ -56,18 +172,58 @@ except:
     groq_client = None
     groq_available = False
 
+# AI suggestions run on a bounded background queue so /api/analyze only waits
+# for the rating math. Set STUDENT_RATING_JOB_DB to a SQLite path for a durable queue.
+job_queue = JobQueue(
+    max_workers=int(os.environ.get("STUDENT_RATING_AI_WORKERS", 2)),
+    max_pending=int(os.environ.get("STUDENT_RATING_AI_MAX_PENDING", 100)),
+    db_path=os.environ.get("STUDENT_RATING_JOB_DB"),
+    retention_days=float(os.environ.get("STUDENT_RATING_JOB_RETENTION_DAYS", 7))
+)
+
+
+def _generate_ai_suggestions(payload: Dict[str, Any]) -> str:
+    """Job handler: generate the Groq improvement plan for an analysis (Groq errors fail the job)"""
+    return groq_client.generate_improvement_plan(
+        payload["student_id"],
+        payload["ratings"],
+        payload["weak_category"],
+        payload["recommendation"],
+        payload["all_scores"],
+        raise_on_error=True
+    )
+
+
+job_queue.register_handler("ai_suggestions", _generate_ai_suggestions)
+if groq_available:
+    job_queue.resume()
+
+# Identical concurrent /api/analyze payloads share one computation (and one AI job)
+coalescer = RequestCoalescer(
+    ttl_seconds=float(os.environ.get("STUDENT_RATING_COALESCE_TTL", 5.0))
+)
+
 
 # Pydantic models for request/response
 class StudentInput(BaseModel):
+    # Inputs of school-specific schema categories arrive as extra fields; the
+    # selected schema decides which inputs are required (see _check_inputs)
+    model_config = ConfigDict(extra="allow", populate_by_name=True)
+    
     student_id: str
-    attendance: float
-    homework: float
-    classwork: float
-    class_focus: float
-    exam: float
-    problem_solving: float
-    communication: float
-    discipline: float
+    attendance: Optional[float] = None
+    homework: Optional[float] = None
+    classwork: Optional[float] = None
+    class_focus: Optional[float] = None
+    exam: Optional[float] = None
+    problem_solving: Optional[float] = None
+    communication: Optional[float] = None
+    discipline: Optional[float] = None
+    school: Optional[str] = None
+    grade: Optional[str] = None
+    class_name: Optional[str] = None
+    # Sent as "schema"; named apart from BaseModel.schema
+    rating_schema: Optional[str] = Field(None, alias="schema")
 
 
 class FeedbackInput(BaseModel):
@@ -87,6 +243,8 @@ class AnalysisResponse(BaseModel):
     recommendation: str
     all_scores: Dict[str, float]
     ai_suggestions: Optional[str] = None
+    job_id: Optional[str] = None
+    job_status: Optional[str] = None
     timestamp: str
 
 
@@ -107,83 +265,264 @@ async def health_check():
         "status": "healthy",
         "groq_available": groq_available,
         "model_loaded": True,
+        "shared_state": bool(shared_state_path),
+        "groq_pool": get_pool_stats(),
+        "job_queue": job_queue.get_stats(),
+        "coalescing": coalescer.get_stats(),
         "timestamp": datetime.now().isoformat()
     }
 
 
+def _resolve_schema(name: Optional[str]) -> RatingSchema:
+    """Rating schema by name (the model's own schema if none is given)"""
+    if name is None:
+        return model.schema
+    try:
+        return schemas.get(name)
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown rating schema: {name}")
+
+
+def _request_schema(name: Optional[str], school: Optional[str]) -> RatingSchema:
+    """
+    Schema to rate a request with: the one named explicitly, else the school's
+    own schema if there is one, else the model's. A school without a schema
+    file is still a cohort, rated with the default schema.
+    """
+    if name is not None:
+        return _resolve_schema(name)
+    if school is not None:
+        try:
+            return schemas.get(school)
+        except KeyError:
+            pass
+    return model.schema
+
+
+def _input_names(schema: RatingSchema) -> List[str]:
+    """Request fields a schema rates: scalar category keys and group sub-score names"""
+    return [schema.categories[index].key if name is None else name for index, name in schema.columns]
+
+
+def _check_inputs(student: StudentInput, schema: RatingSchema):
+    """Reject a request that lacks an input the schema declares or has a non-numeric one"""
+    fields = student.model_dump()
+    missing, invalid = [], []
+    for name in _input_names(schema):
+        value = fields.get(name)
+        if value is None:
+            missing.append(name)
+            continue
+        try:
+            float(value)
+        except (TypeError, ValueError):
+            invalid.append(name)
+    if missing or invalid:
+        problems = []
+        if missing:
+            problems.append(f"missing {', '.join(missing)}")
+        if invalid:
+            problems.append(f"non-numeric {', '.join(invalid)}")
+        raise HTTPException(
+            status_code=422, detail=f"Inputs for schema '{schema.name}': {'; '.join(problems)}"
+        )
+
+
+def _student_data(student: StudentInput, schema: RatingSchema) -> Dict[str, Any]:
+    """Student record for the rating model: one field per category, group sub-scores nested"""
+    fields = student.model_dump()
+    student_data = {"student_id": student.student_id}
+    for category in schema.categories:
+        if category.inputs:
+            student_data[category.key] = {
+                k: float(fields[k]) for k in category.inputs if fields.get(k) is not None
+            }
+        elif fields.get(category.key) is not None:
+            student_data[category.key] = float(fields[category.key])
+    student_data["cohort"] = _cohort(student.school, student.grade, student.class_name)
+    return student_data
+
+
+def _cohort(school: Optional[str], grade: Optional[str], class_name: Optional[str]) -> Dict[str, str]:
+    """Cohort groups of a request (only the ones given)"""
+    groups = {"school": school, "grade": grade, "class": class_name}
+    return {level: name for level, name in groups.items() if name is not None}
+
+
+def _rate_student(student: StudentInput, schema: RatingSchema) -> Dict[str, Any]:
+    """Compute ratings, recommendation and tier for an analyze request"""
+    # Calculate ratings
+    ratings = model.compute_student_ratings(_student_data(student, schema), schema)
+    leaderboards.update(ratings)
+    
+    # Get recommendations
+    weak_category, recommendation, all_scores = model.recommend_improvement(ratings, schema)
+    cohorts.update(ratings, weak_category)
+    
+    return {
+        "ratings": ratings,
+        "tier": tier_classifier.label(ratings["overall_rating"]),
+        "weak_category": weak_category,
+        "recommendation": recommendation,
+        "all_scores": all_scores
+    }
+
+
+def _analysis_response(student_id: str, analysis: Dict[str, Any],
+                       ai_suggestions: Optional[str] = None,
+                       job: Optional[Dict[str, Any]] = None) -> AnalysisResponse:
+    """Build the analyze response from a _rate_student result"""
+    ratings = analysis["ratings"]
+    job = job or {}
+    return AnalysisResponse(
+        success=True,
+        student_id=student_id,
+        overall_rating=ratings["overall_rating"],
+        tier=analysis["tier"],
+        subcategories=ratings["subcategories"],
+        weak_category=analysis["weak_category"],
+        recommendation=analysis["recommendation"],
+        all_scores=analysis["all_scores"],
+        ai_suggestions=ai_suggestions,
+        job_id=job.get("id"),
+        job_status=job.get("status"),
+        timestamp=datetime.now().isoformat()
+    )
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @app.post("/api/analyze", response_model=AnalysisResponse)
 async def analyze_student(student: StudentInput):
-    """Analyze a single student"""
+    """
+    Analyze a single student.
+    
+    The rating is returned immediately; AI suggestions (if available) are
+    generated in the background and can be polled at /api/jobs/{job_id}.
+    Identical concurrent requests are coalesced into one computation.
+    """
+    schema = _request_schema(student.rating_schema, student.school)
+    _check_inputs(student, schema)
     try:
-        # Prepare student data
-        student_data = {
-            "student_id": student.student_id,
-            "attendance": student.attendance,
-            "homework": student.homework,
-            "classwork": student.classwork,
-            "class_focus": student.class_focus,
-            "exam": student.exam,
-            "skills": {
-                "problem_solving": student.problem_solving,
-                "communication": student.communication,
-                "discipline": student.discipline
-            }
-        }
-        
-        # Calculate ratings
-        ratings = model.compute_student_ratings(student_data)
-        
-        # Get recommendations
-        weak_category, recommendation, all_scores = model.recommend_improvement(ratings)
-        
-        # Determine tier
-        overall = ratings["overall_rating"]
-        if overall >= 85:
-            tier = "ELITE ⭐⭐⭐"
-        elif overall >= 75:
-            tier = "EXCELLENT ⭐⭐"
-        elif overall >= 65:
-            tier = "GOOD ⭐"
-        elif overall >= 50:
-            tier = "DEVELOPING"
-        else:
-            tier = "NEEDS IMPROVEMENT"
+        key = canonical_key(jsonable_encoder(student))
+        return await coalescer.run(key, lambda: run_in_threadpool(profiled(_analyze), student, schema))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _analyze(student: StudentInput, schema: RatingSchema) -> AnalysisResponse:
+    """Rate a student, queue AI suggestions and persist the model (worker thread)"""
+    analysis = _rate_student(student, schema)
+    
+    # Queue AI suggestions if available
+    job = None
+    if groq_available and groq_client:
+        try:
+            job = job_queue.submit("ai_suggestions", {
+                "student_id": student.student_id,
+                "ratings": analysis["ratings"],
+                "weak_category": analysis["weak_category"],
+                "recommendation": analysis["recommendation"],
+                "all_scores": analysis["all_scores"]
+            })
+        except QueueFullError as e:
+            logger.warning("AI suggestions skipped", extra={"student_id": student.student_id, "error": str(e)})
+            job = {"status": "rejected"}
+    
+    # Save model
+    model.save_model(model_path)
+    
+    return _analysis_response(student.student_id, analysis, job=job)
+
+
+@app.post("/api/analyze/stream")
+async def analyze_student_stream(student: StudentInput):
+    """
+    Analyze a single student, streaming the result as Server-Sent Events.
+    
+    Events: "analysis" (rating result, sent immediately), "token" (one per
+    AI suggestion chunk as Groq produces it) and "done".
+    """
+    schema = _request_schema(student.rating_schema, student.school)
+    _check_inputs(student, schema)
+    try:
+        analysis = await run_in_threadpool(profiled(_rate_student), student, schema)
+        await run_in_threadpool(profiled(model.save_model), model_path)
+        response = jsonable_encoder(_analysis_response(student.student_id, analysis))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    def event_stream():
+        yield _sse("analysis", response)
         
-        # Generate AI suggestions if available
-        ai_suggestions = None
         if groq_available and groq_client:
-            try:
-                ai_suggestions = groq_client.generate_improvement_plan(
-                    student.student_id, ratings, weak_category, recommendation, all_scores
-                )
-            except Exception as e:
-                print(f"Groq API error: {e}")
-        
-        # Save model
-        model.save_model(model_path)
-        
-        return AnalysisResponse(
-            success=True,
-            student_id=student.student_id,
-            overall_rating=ratings["overall_rating"],
-            tier=tier,
-            subcategories=ratings["subcategories"],
-            weak_category=weak_category,
-            recommendation=recommendation,
-            all_scores=all_scores,
-            ai_suggestions=ai_suggestions,
-            timestamp=datetime.now().isoformat()
-        )
+            for chunk in groq_client.stream_improvement_plan(
+                student.student_id,
+                analysis["ratings"],
+                analysis["weak_category"],
+                analysis["recommendation"],
+                analysis["all_scores"]
+            ):
+                yield _sse("token", {"text": chunk})
         
+        yield _sse("done", {"timestamp": datetime.now().isoformat()})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/api/what-if")
+async def what_if(student: StudentInput, k: int = DEFAULT_STEPS):
+    """
+    Sensitivity of a student's rating to each input.
+    
+    Every input is moved -k..+k steps (5 points on percentages, 1 on 1-10
+    scales) and the whole grid is rated in one batch; the response also holds
+    the fewest steps to the next tier. Nothing is stored or ranked.
+    """
+    if not 0 <= k <= 20:
+        raise HTTPException(status_code=400, detail="k must be between 0 and 20")
+    schema = _request_schema(student.rating_schema, student.school)
+    _check_inputs(student, schema)
+    try:
+        analysis = await run_in_threadpool(sensitivity.analyze, _student_data(student, schema), k, schema)
+        return {
+            "success": True,
+            "student_id": student.student_id,
+            **analysis,
+            "timestamp": datetime.now().isoformat()
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Poll a background job (e.g. AI suggestions queued by /api/analyze)"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    
+    return {
+        "success": True,
+        "job": job,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @app.post("/api/feedback")
-async def submit_feedback(feedback: FeedbackInput):
+@profiled
+def submit_feedback(feedback: FeedbackInput):
     """Submit feedback for model improvement"""
     try:
         feedback_data = {
+            "student_id": feedback.student_id,
             "actual_rating": feedback.actual_rating,
             "predicted_rating": feedback.predicted_rating,
             "weak_category": feedback.weak_category
@@ -201,23 +540,226 @@ async def submit_feedback(feedback: FeedbackInput):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Content types accepted by /api/feedback/bulk
+FEEDBACK_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json": "json"
+}
+
+
+@app.post("/api/feedback/bulk")
+async def submit_feedback_bulk(request: Request, format: Optional[str] = None):
+    """
+    Submit a batch of feedback (CSV, NDJSON or a JSON array).
+    
+    Rows need student_id, actual_rating and predicted_rating. The format is
+    taken from ?format= or the Content-Type header. Valid rows are learned
+    from in one weight update and the model is saved once.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    fmt = format or FEEDBACK_FORMATS.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported content type '{content_type}'; use CSV, NDJSON or JSON"
+        )
+    
+    body = await request.body()
+    try:
+        feedback, report = await run_in_threadpool(
+            profiled(StudentDataInput.read_feedback_batch), body, fmt
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        summary = await run_in_threadpool(profiled(_apply_feedback_batch), feedback)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "success": True,
+        **report,
+        **summary,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def _apply_feedback_batch(feedback) -> Dict[str, Any]:
+    """Apply validated feedback rows and persist the model once (worker thread)"""
+    if len(feedback) == 0:
+        return {"learned": 0, "unmatched": 0}
+    
+    summary = model.adapt_weights_batch(
+        feedback["student_id"].tolist(),
+        feedback["actual_rating"].to_numpy(),
+        feedback["predicted_rating"].to_numpy()
+    )
+    model.save_model(model_path)
+    return summary
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Stage and request timing histograms in the Prometheus text format"""
+    return Response(metrics.registry.render(), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+
 @app.get("/api/performance")
-async def get_performance():
-    """Get model performance metrics"""
+@profiled
+def get_performance():
+    """Get model performance metrics and per-stage service timings"""
+    try:
+        return {
+            "success": True,
+            "metrics": model.get_model_performance(),
+            "stages": metrics.get_stage_summary(),
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/leaderboard")
+async def get_leaderboard(k: int = 10, schema: Optional[str] = None):
+    """Get the top-k rated students of one rating schema (the default if none is given)"""
+    name = _resolve_schema(schema).name
+    leaderboard = leaderboards.board(name)
     try:
-        metrics = model.get_model_performance()
         return {
             "success": True,
-            "metrics": metrics,
+            "schema": name,
+            "total_students": len(leaderboard),
+            "leaders": leaderboard.top_k(k),
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/schemas")
+async def list_schemas():
+    """Rating schemas available for the `schema` field (and schools named after them)"""
+    return {
+        "success": True,
+        "default": model.schema.name,
+        "schemas": [schemas.get(name).describe() for name in schemas.names()],
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/api/tiers")
+async def get_tier_distribution(schema: Optional[str] = None):
+    """Tier bands and how many ranked students (of one rating schema) fall in each"""
+    name = _resolve_schema(schema).name
+    # Leaderboard ratings are already sorted: one bisect per tier bound
+    ratings = leaderboards.board(name).ratings()
+    return {
+        "success": True,
+        "schema": name,
+        "tiers": tier_classifier.describe(),
+        "distribution": tier_classifier.histogram(ratings, assume_sorted=True),
+        "total_students": len(ratings),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/api/cohorts")
+async def list_cohorts(level: Optional[str] = None, schema: Optional[str] = None):
+    """Cohort groups (school, grade, class) of one rating schema with their size and mean rating"""
+    if level is not None and level not in ("all",) + LEVELS:
+        raise HTTPException(status_code=400, detail=f"Unknown cohort level: {level}")
+    name = _resolve_schema(schema).name
+    analytics = cohorts.analytics(name)
+    return {
+        "success": True,
+        "schema": name,
+        "levels": list(LEVELS),
+        "total_students": len(analytics),
+        "groups": analytics.groups(level),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/api/cohorts/{level}/{name:path}")
+async def get_cohort(level: str, name: str, schema: Optional[str] = None):
+    """
+    Precomputed aggregates of one group: mean, quantiles, tier and weakest-area counts.
+    
+    Grades and classes are named by their path from the school, e.g.
+    /api/cohorts/class/north/7/A; ratings of each schema are aggregated separately.
+    """
+    schema_name = _resolve_schema(schema).name
+    summary = cohorts.analytics(schema_name).summary(level, name)
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"Unknown cohort: {level}/{name}")
+    return {
+        "success": True,
+        "schema": schema_name,
+        **summary,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/api/leaderboard/{student_id}")
+async def get_student_rank(student_id: str, schema: Optional[str] = None):
+    """Get rank and percentile for a single student within one rating schema"""
+    name = _resolve_schema(schema).name
+    standing = leaderboards.board(name).get(student_id)
+    if standing is None:
+        raise HTTPException(status_code=404, detail=f"Student not ranked: {student_id}")
+    
+    return {
+        "success": True,
+        "schema": name,
+        **standing,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def _rate_students(students: List[Dict[str, Any]], schema: RatingSchema,
+                   cohort: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    """Rate uploaded students and persist the model (worker thread)"""
+    ratings_list = []
+    for student in students:
+        if cohort:
+            # Per-row grade/class columns take precedence over the upload's groups
+            student["cohort"] = {**cohort, **student.get("cohort", {})}
+        ratings = model.compute_student_ratings(student, schema)
+        leaderboards.update(ratings)
+        ratings_list.append(ratings)
+    
+    # Weakest category for the whole upload in one vectorized pass
+    weak_categories, _, main_scores = model.recommend_improvement_batch(
+        model.subcategory_matrix(ratings_list, schema), schema
+    )
+    tiers = tier_classifier.labels_batch([r["overall_rating"] for r in ratings_list])
+    cohorts.update_batch(ratings_list, weak_categories)
+    
+    results = []
+    for student, ratings, tier, weak_category, scores in zip(
+            students, ratings_list, tiers, weak_categories, main_scores):
+        results.append({
+            "student_id": student["student_id"],
+            "overall_rating": ratings["overall_rating"],
+            "tier": tier,
+            "weak_category": weak_category,
+            "all_scores": dict(zip(schema.area_names, scores.tolist()))
+        })
+    
+    # Save model
+    model.save_model(model_path)
+    return results
+
+
 @app.post("/api/upload-csv")
-async def upload_csv(file: UploadFile = File(...)):
-    """Upload and analyze CSV file"""
+async def upload_csv(file: UploadFile = File(...), school: Optional[str] = None,
+                     grade: Optional[str] = None, class_name: Optional[str] = None,
+                     schema: Optional[str] = None):
+    """Upload and analyze CSV file (optionally rated with a named schema and grouped by school/grade/class)"""
+    schema = _request_schema(schema, school)
     try:
         # Save uploaded file temporarily
         temp_path = f"data/temp_{file.filename}"
@@ -225,30 +767,30 @@ async def upload_csv(file: UploadFile = File(...)):
             content = await file.read()
             buffer.write(content)
         
-        # Read students from CSV
-        students = StudentDataInput.read_from_csv(temp_path)
+        # Read students from CSV (one column per input the schema declares)
+        try:
+            students, report = await run_in_threadpool(
+                profiled(StudentDataInput.read_from_csv), temp_path, schema
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        finally:
+            os.remove(temp_path)
         
+        if report["invalid"]:
+            more = report["invalid"] - len(report["errors"])
+            raise HTTPException(
+                status_code=422,
+                detail=f"Inputs for schema '{schema.name}': {'; '.join(report['errors'])}"
+                       + (f"; and {more} more row(s)" if more > 0 else "")
+            )
         if not students:
             raise HTTPException(status_code=400, detail="No valid students found in CSV")
         
         # Analyze all students
-        results = []
-        for student in students:
-            ratings = model.compute_student_ratings(student)
-            weak_category, recommendation, all_scores = model.recommend_improvement(ratings)
-            
-            results.append({
-                "student_id": student["student_id"],
-                "overall_rating": ratings["overall_rating"],
-                "weak_category": weak_category,
-                "all_scores": all_scores
-            })
-        
-        # Save model
-        model.save_model(model_path)
-        
-        # Clean up temp file
-        os.remove(temp_path)
+        results = await run_in_threadpool(
+            profiled(_rate_students), students, schema, _cohort(school, grade, class_name)
+        )
         
         return {
             "success": True,
@@ -257,6 +799,8 @@ async def upload_csv(file: UploadFile = File(...)):
             "timestamp": datetime.now().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
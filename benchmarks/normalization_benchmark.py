@@ -0,0 +1,140 @@
+"""
+Normalization Benchmark
+Per-student cost of compute_student_ratings with table-based normalization
+against the previous per-value formula, for the input shapes each entry point
+produces, plus the vectorized batch path
+
+Traffic shapes:
+    manual_entry  Python ints (Streamlit sliders and number inputs)
+    api           Integer-valued floats (JSON numbers parsed by pydantic)
+    continuous    Fractional percentages (CSV report-card aggregates)
+
+Usage:
+    python benchmarks/normalization_benchmark.py [--calls 20000] [--batch 1000000] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from pathlib import Path
+from typing import Dict, Any, List
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+# Keep the stage timers and per-call logs out of the measurement
+os.environ.setdefault("STUDENT_RATING_METRICS", "0")
+os.environ.setdefault("STUDENT_RATING_LOG_LEVEL", "WARNING")
+
+from rating_schema import normalize_formula
+from student_rating import StudentRatingModel
+
+SKILLS = ("problem_solving", "communication", "discipline")
+
+
+class FormulaRatingModel(StudentRatingModel):
+    """The previous behaviour: every input goes through the affine formula"""
+
+    def _normalize_inputs(self, values, ranges):
+        return [normalize_formula(v, lo, hi) for v, (lo, hi) in zip(values, ranges)]
+
+
+def make_students(shape: str, n: int = 256, seed: int = 0) -> List[Dict[str, Any]]:
+    """Students whose inputs look like the given traffic shape"""
+    rng = np.random.default_rng(seed)
+
+    def value(lo: int, hi: int):
+        if shape == "continuous":
+            return round(float(rng.uniform(lo, hi)), 2)
+        v = int(rng.integers(lo, hi + 1))
+        return float(v) if shape == "api" else v
+
+    return [
+        {
+            "student_id": f"S{i}",
+            "attendance": value(0, 100),
+            "homework": value(1, 10),
+            "classwork": value(1, 10),
+            "class_focus": value(0, 100),
+            "exam": value(0, 100),
+            "skills": {k: value(1, 10) for k in SKILLS}
+        }
+        for i in range(n)
+    ]
+
+
+def per_student_us(model: StudentRatingModel, students: List[Dict[str, Any]], calls: int) -> float:
+    """Best-of-3 mean microseconds per compute_student_ratings call"""
+    state = {"i": 0}
+
+    def call():
+        model.compute_student_ratings(students[state["i"] % len(students)])
+        state["i"] += 1
+
+    call()  # warm-up
+    return min(timeit.repeat(call, number=calls, repeat=3)) / calls * 1e6
+
+
+def batch_ms(values: np.ndarray, vmin: int, vmax: int) -> Dict[str, float]:
+    """Milliseconds to normalize one array: formula vs normalize_batch"""
+    formula = min(timeit.repeat(
+        lambda: normalize_formula(values.astype(float), vmin, vmax), number=1, repeat=3
+    ))
+    table = min(timeit.repeat(
+        lambda: StudentRatingModel.normalize_batch(values, vmin, vmax), number=1, repeat=3
+    ))
+    return {"formula_ms": formula * 1000, "normalize_batch_ms": table * 1000}
+
+
+def run_normalization_benchmark(calls: int = 20_000, batch: int = 1_000_000) -> Dict[str, Any]:
+    """
+    Run all measurements.
+
+    Returns:
+        Dictionary with per-student microseconds per traffic shape and batch timings
+    """
+    results = {"per_student": {}, "batch": {}}
+    for shape in ("manual_entry", "api", "continuous"):
+        students = make_students(shape)
+        formula = per_student_us(FormulaRatingModel(), students, calls)
+        table = per_student_us(StudentRatingModel(), students, calls)
+        results["per_student"][shape] = {
+            "formula_us": formula,
+            "table_us": table,
+            "speedup": formula / table
+        }
+
+    rng = np.random.default_rng(1)
+    results["batch"]["1-10 ints"] = batch_ms(rng.integers(1, 11, batch), 1, 10)
+    results["batch"]["0-100 ints"] = batch_ms(rng.integers(0, 101, batch), 0, 100)
+    results["batch"]["0-100 floats"] = batch_ms(rng.uniform(0, 100, batch), 0, 100)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark rating normalization")
+    parser.add_argument("--calls", type=int, default=20_000, help="compute_student_ratings calls per shape")
+    parser.add_argument("--batch", type=int, default=1_000_000, help="Array size for the batch path")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run_normalization_benchmark(args.calls, args.batch)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print("=" * 60)
+        print("Normalization Benchmark")
+        print("=" * 60)
+        print("\ncompute_student_ratings (µs per student)")
+        print(f"   {'traffic':<16}{'formula':>12}{'tables':>12}{'speedup':>10}")
+        for shape, m in results["per_student"].items():
+            print(f"   {shape:<16}{m['formula_us']:>12.1f}{m['table_us']:>12.1f}{m['speedup']:>9.2f}x")
+        print(f"\nnormalize_batch ({args.batch:,} values, ms)")
+        print(f"   {'input':<16}{'formula':>12}{'batch':>12}")
+        for name, m in results["batch"].items():
+            print(f"   {name:<16}{m['formula_ms']:>12.1f}{m['normalize_batch_ms']:>12.1f}")
+        print("=" * 60)
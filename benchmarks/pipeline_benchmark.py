@@ -0,0 +1,466 @@
+"""
+Pipeline Benchmark
+End-to-end throughput, latency percentiles and peak memory of the rating
+pipeline on synthetic cohorts, compared against a stored JSON baseline
+
+Stages: compute_student_ratings, StudentDataInput.read_from_csv,
+CSVReportProcessor.process_student_csv / process_multiple_students,
+StudentPredictionModel.predict_improvement and the API endpoints (in-process
+TestClient). Groq is replaced by a local stub, so no network calls are made.
+
+Usage:
+    python benchmarks/pipeline_benchmark.py [--sizes 1k,100k,1m] [--json]
+    python benchmarks/pipeline_benchmark.py --update-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Any, List, Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "src"), str(ROOT / "api")]
+# Per-call info logs would dominate the output (and the file log) of a benchmark
+os.environ.setdefault("STUDENT_RATING_LOG_LEVEL", "WARNING")
+
+BASELINE_PATH = ROOT / "benchmarks" / "pipeline_baseline.json"
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+# Stages far slower per item than the rating math run on a capped sample
+STAGE_CAPS = {
+    "csv_files": 200,            # multi-day report cards written to disk
+    "predict_improvement": 20,
+    "api_analyze": 300,
+    "api_upload_csv": 5_000
+}
+REPORT_DAYS = 30
+
+# Calls rerun under tracemalloc per stage for the peak memory figure
+MEMORY_SAMPLE_CALLS = 20
+
+# Whole-batch stages (one call processes the cohort) are repeated for percentiles
+BATCH_REPEAT = 3
+
+# Relative change against the baseline that counts as a regression (generous:
+# timings on shared machines vary by 20-30% run to run)
+DEFAULT_THRESHOLD = 0.5
+
+SUBJECTS = ("Math", "English", "Science", "Bangla")
+COMMENTS = (
+    "Participates actively in class discussions.",
+    "Needs to review last week's assignment.",
+    "Excellent problem solving in math today.",
+    "Was late and distracted during class.",
+    "Good English presentation, clear communication.",
+    "Homework incomplete again, needs more discipline."
+)
+
+
+# ---- Synthetic data ----
+
+def generate_students(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Students in the rating model's input format"""
+    rng = np.random.default_rng(seed)
+    attendance = rng.uniform(50, 100, n).round(1)
+    homework = rng.integers(1, 11, n)
+    classwork = rng.integers(1, 11, n)
+    class_focus = rng.uniform(30, 100, n).round(1)
+    exam = rng.uniform(20, 100, n).round(1)
+    skills = rng.integers(1, 11, (n, 3))
+    return [
+        {
+            "student_id": f"S{i:07d}",
+            "attendance": float(attendance[i]),
+            "homework": int(homework[i]),
+            "classwork": int(classwork[i]),
+            "class_focus": float(class_focus[i]),
+            "exam": float(exam[i]),
+            "skills": {
+                "problem_solving": int(skills[i, 0]),
+                "communication": int(skills[i, 1]),
+                "discipline": int(skills[i, 2])
+            }
+        }
+        for i in range(n)
+    ]
+
+
+def write_students_csv(students: List[Dict[str, Any]], path: str) -> str:
+    """Flat CSV in the format StudentDataInput.read_from_csv expects"""
+    rows = [
+        {k: v for k, v in s.items() if k != "skills"} | s["skills"]
+        for s in students
+    ]
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return path
+
+
+def write_daily_reports(directory: str, n_students: int, days: int = REPORT_DAYS,
+                        seed: int = 0) -> List[str]:
+    """One multi-day report card CSV per student (data/amin.csv format)"""
+    rng = np.random.default_rng(seed)
+    dates = [f"{d.month}/{d.day}/{d.year}" for d in pd.date_range("2025-12-01", periods=days)]
+    paths = []
+    for i in range(n_students):
+        report = pd.DataFrame({
+            "date": dates,
+            "attendance": np.where(rng.random(days) < 0.9, "Present", "Absent"),
+            "HW_issue": rng.random(days) < 0.2,
+            "CW_issue": rng.random(days) < 0.15,
+            "daily_exam1_subject": rng.choice(SUBJECTS, days),
+            "daily_exam1_mark": rng.integers(3, 11, days),
+            "daily_exam2_subject": rng.choice(SUBJECTS, days),
+            "daily_exam2_mark": rng.integers(3, 11, days),
+            "teacher_comment": rng.choice(COMMENTS, days)
+        })
+        path = os.path.join(directory, f"student{i:05d}.csv")
+        report.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+# ---- Groq stubs ----
+
+def _stub_completion(content: str) -> SimpleNamespace:
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class StubGroqClient:
+    """Stands in for groq.Groq: chat.completions.create returns canned text"""
+
+    def __init__(self, content: str = "7,8,6"):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(
+            create=lambda **kwargs: _stub_completion(content)
+        ))
+
+
+class StubSuggestionGenerator:
+    """Stands in for GroqSuggestionGenerator in the API"""
+
+    PLAN = "1. Practice daily.\n2. Review mistakes.\n3. Ask questions in class."
+
+    def generate_improvement_plan(self, *args, **kwargs) -> str:
+        return self.PLAN
+
+    def stream_improvement_plan(self, *args, **kwargs) -> Iterable[str]:
+        yield from self.PLAN.splitlines(keepends=True)
+
+
+# ---- Measurement ----
+
+def _percentile_ms(latencies: List[float], q: float) -> float:
+    return round(float(np.percentile(latencies, q)) * 1000, 4) if latencies else 0.0
+
+
+def measure_stage(calls: List[Callable[[], Any]], items: int,
+                  memory_sample: int = MEMORY_SAMPLE_CALLS) -> Dict[str, Any]:
+    """
+    Time each call (after one warm-up call), then rerun a sample of them
+    under tracemalloc.
+
+    Args:
+        calls: Zero-argument callables (one per request / file / batch)
+        items: Number of students the calls process in total
+        memory_sample: How many calls to rerun under tracemalloc
+
+    Returns:
+        Dictionary with items, seconds, throughput (items/s), latency
+        percentiles (ms per call) and peak_mb (largest traced allocation
+        peak of a single call)
+    """
+    latencies = []
+    peak = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        calls[0]()  # warm-up: lazy imports, caches, first-use allocations
+        for call in calls:
+            start = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - start)
+
+        # Separate pass on a sample: tracemalloc slows allocation-heavy code 10x+
+        tracemalloc.start()
+        try:
+            for call in calls[:memory_sample]:
+                tracemalloc.reset_peak()
+                call()
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    seconds = sum(latencies)
+    return {
+        "items": items,
+        "calls": len(latencies),
+        "seconds": round(seconds, 4),
+        "throughput": round(items / seconds, 2) if seconds else 0.0,
+        "p50_ms": _percentile_ms(latencies, 50),
+        "p95_ms": _percentile_ms(latencies, 95),
+        "p99_ms": _percentile_ms(latencies, 99),
+        "peak_mb": round(peak / 2**20, 3)
+    }
+
+
+# ---- Stages ----
+
+def bench_compute_ratings(students: List[Dict[str, Any]]) -> Dict[str, Any]:
+    from student_rating import StudentRatingModel
+
+    model = StudentRatingModel()
+    return measure_stage([lambda s=s: model.compute_student_ratings(s) for s in students],
+                         len(students))
+
+
+def bench_read_from_csv(csv_path: str, n: int) -> Dict[str, Any]:
+    from data_input import StudentDataInput
+
+    return measure_stage([lambda: StudentDataInput.read_from_csv(csv_path)] * BATCH_REPEAT,
+                         n * BATCH_REPEAT, memory_sample=1)
+
+
+def bench_csv_processors(report_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        from csv_processor import CSVReportProcessor
+        processor = CSVReportProcessor()
+    processor.groq_client = StubGroqClient()
+
+    return {
+        "process_student_csv": measure_stage(
+            [lambda p=p: processor.process_student_csv(p) for p in report_paths],
+            len(report_paths)
+        ),
+        "process_multiple_students": measure_stage(
+            [lambda: processor.process_multiple_students(report_paths)] * BATCH_REPEAT,
+            len(report_paths) * BATCH_REPEAT, memory_sample=1
+        )
+    }
+
+
+def bench_predict_improvement(students: List[Dict[str, Any]]) -> Dict[str, Any]:
+    from prediction_model import StudentPredictionModel
+
+    tasks = [
+        {"xp": 30, "time_estimate_minutes": 45},
+        {"xp": 40, "time_estimate_minutes": 60},
+        {"xp": 25, "time_estimate_minutes": 30}
+    ]
+    model = StudentPredictionModel()
+    # Training happens once on first use; benchmark steady-state predictions
+    with contextlib.redirect_stdout(io.StringIO()):
+        model.predict_improvement(students[0], tasks)
+    return measure_stage(
+        [lambda s=s: model.predict_improvement(s, tasks) for s in students], len(students)
+    )
+
+
+@contextlib.contextmanager
+def _api_client(workdir: str):
+    """TestClient on a fresh in-process API with the Groq stub and a scratch model file"""
+    os.environ["GROQ_API_KEY"] = ""
+    with contextlib.redirect_stdout(io.StringIO()):
+        import main
+        from fastapi.testclient import TestClient
+        from leaderboard import SchemaLeaderboards
+        from cohorts import SchemaCohorts
+        from job_queue import JobQueue
+        from request_coalescer import RequestCoalescer
+        from sensitivity import SensitivityAnalyzer
+        from student_rating import StudentRatingModel
+
+    # Every global that holds the model or accumulates traffic is replaced, so
+    # benchmark requests never touch the live model, aggregates or job store
+    saved = {k: getattr(main, k) for k in (
+        "model", "model_path", "leaderboards", "cohorts", "sensitivity",
+        "job_queue", "coalescer", "groq_client", "groq_available"
+    )}
+    main.model = StudentRatingModel()
+    main.model_path = os.path.join(workdir, "student_rating_model.pkl")
+    main.leaderboards = SchemaLeaderboards(main.model.schema.name)
+    main.cohorts = SchemaCohorts(main.model.schema.name, main.tier_classifier)
+    main.sensitivity = SensitivityAnalyzer(main.model, main.tier_classifier)
+    main.job_queue = JobQueue(max_workers=2)
+    main.job_queue.register_handler("ai_suggestions", main._generate_ai_suggestions)
+    main.coalescer = RequestCoalescer(ttl_seconds=saved["coalescer"].ttl_seconds)
+    main.groq_client = StubSuggestionGenerator()
+    main.groq_available = True
+    try:
+        with TestClient(main.app) as client:
+            yield client
+    finally:
+        main.job_queue.shutdown(wait=True)
+        for key, value in saved.items():
+            setattr(main, key, value)
+
+
+def bench_api(students: List[Dict[str, Any]], upload_csv: str, upload_rows: int,
+              workdir: str) -> Dict[str, Dict[str, Any]]:
+    def analyze(student):
+        payload = {k: v for k, v in student.items() if k != "skills"} | student["skills"]
+        response = client.post("/api/analyze", json=payload)
+        response.raise_for_status()
+
+    def upload():
+        with open(upload_csv, "rb") as f:
+            response = client.post(
+                "/api/upload-csv", files={"file": ("bench_upload.csv", f, "text/csv")}
+            )
+        response.raise_for_status()
+
+    def leaderboard():
+        client.get("/api/leaderboard", params={"k": 10}).raise_for_status()
+
+    with _api_client(workdir) as client:
+        results = {
+            "api_analyze": measure_stage(
+                [lambda s=s: analyze(s) for s in students], len(students)
+            ),
+            "api_upload_csv": measure_stage(
+                [upload] * BATCH_REPEAT, upload_rows * BATCH_REPEAT, memory_sample=1
+            ),
+            "api_leaderboard": measure_stage([leaderboard] * 200, 200)
+        }
+    return results
+
+
+def run_pipeline_benchmark(sizes: Iterable[str] = ("1k",), seed: int = 0) -> Dict[str, Any]:
+    """
+    Run every stage for each cohort size.
+
+    Args:
+        sizes: Keys of SIZES (1k, 100k, 1m)
+        seed: Seed for the synthetic data
+
+    Returns:
+        {"<size>": {"<stage>": metrics}}
+    """
+    results = {}
+    for size in sizes:
+        n = SIZES[size]
+        students = generate_students(n, seed)
+        stages = {}
+        with tempfile.TemporaryDirectory() as workdir:
+            csv_path = write_students_csv(students, os.path.join(workdir, "students.csv"))
+            n_reports = min(n, STAGE_CAPS["csv_files"])
+            reports = write_daily_reports(workdir, n_reports, seed=seed)
+            n_upload = min(n, STAGE_CAPS["api_upload_csv"])
+            upload_csv = write_students_csv(
+                students[:n_upload], os.path.join(workdir, "upload.csv")
+            )
+
+            stages["compute_student_ratings"] = bench_compute_ratings(students)
+            stages["read_from_csv"] = bench_read_from_csv(csv_path, n)
+            stages.update(bench_csv_processors(reports))
+            stages["predict_improvement"] = bench_predict_improvement(
+                students[:STAGE_CAPS["predict_improvement"]]
+            )
+            stages.update(bench_api(
+                students[:STAGE_CAPS["api_analyze"]], upload_csv, n_upload, workdir
+            ))
+        results[size] = stages
+    return results
+
+
+# ---- Baseline ----
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(results: Dict[str, Any], path: Path = BASELINE_PATH):
+    """Merge results into the baseline file (sizes not rerun are kept)"""
+    baseline = load_baseline(path)
+    baseline.setdefault("results", {}).update(results)
+    baseline["python"] = sys.version.split()[0]
+    baseline["updated"] = time.strftime("%Y-%m-%d")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any],
+                        threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Return regressions: throughput down, median latency or peak memory up by
+    more than `threshold` (relative) against the baseline. Tail percentiles
+    are reported but not gated (too noisy on shared machines). Stages without
+    a baseline entry are skipped.
+    """
+    regressions = []
+    for size, stages in results.items():
+        for stage, metrics in stages.items():
+            base = baseline.get("results", {}).get(size, {}).get(stage)
+            if not base:
+                continue
+            if base["throughput"] and metrics["throughput"] < base["throughput"] * (1 - threshold):
+                regressions.append(
+                    f"{size}/{stage}: throughput {metrics['throughput']:.1f}/s "
+                    f"vs baseline {base['throughput']:.1f}/s"
+                )
+            for key, unit in (("p50_ms", "ms"), ("peak_mb", "MB")):
+                if base[key] and metrics[key] > base[key] * (1 + threshold):
+                    regressions.append(
+                        f"{size}/{stage}: {key} {metrics[key]:.3f}{unit} "
+                        f"vs baseline {base[key]:.3f}{unit}"
+                    )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the rating pipeline end to end")
+    parser.add_argument("--sizes", default="1k", help=f"Comma-separated cohort sizes ({', '.join(SIZES)})")
+    parser.add_argument("--threshold", type=float,
+                        default=float(os.environ.get("PIPELINE_BENCH_THRESHOLD", DEFAULT_THRESHOLD)),
+                        help="Allowed relative regression against the baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+
+    os.chdir(ROOT)
+    results = run_pipeline_benchmark(sizes)
+    regressions = [] if args.update_baseline else compare_to_baseline(
+        results, load_baseline(), args.threshold
+    )
+    if args.update_baseline:
+        save_baseline(results)
+
+    if args.json:
+        print(json.dumps({"results": results, "regressions": regressions}, indent=2))
+    else:
+        print("=" * 78)
+        print("Pipeline Benchmark")
+        print("=" * 78)
+        for size, stages in results.items():
+            print(f"\n{size} students")
+            print(f"   {'stage':<26}{'items/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak MB':>10}")
+            for stage, m in stages.items():
+                print(f"   {stage:<26}{m['throughput']:>12.1f}{m['p50_ms']:>10.3f}"
+                      f"{m['p95_ms']:>10.3f}{m['p99_ms']:>10.3f}{m['peak_mb']:>10.2f}")
+        print()
+        if args.update_baseline:
+            print(f"   ✓ Baseline updated: {BASELINE_PATH.relative_to(ROOT)}")
+        for regression in regressions:
+            print(f"   ✗ Regression: {regression}")
+        if not regressions and not args.update_baseline:
+            print(f"   ✓ No regressions beyond {args.threshold:.0%}")
+        print("=" * 78)
+
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,95 @@
+"""
+Similarity Benchmark
+Top-k query latency of StudentSimilarityIndex over stored student profiles,
+per backend, with a brute-force NumPy scan (no cached norms) as reference
+
+Usage:
+    python benchmarks/similarity_benchmark.py [--rows 100000] [--queries 200] [--k 5] [--json]
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import Dict, Any
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from rating_schema import DEFAULT_SCHEMA
+from similarity_index import StudentSimilarityIndex
+
+
+def build_index(rows: int, backend: str, seed: int = 0) -> StudentSimilarityIndex:
+    """Index holding `rows` random default-schema profiles (rating scale 1-100)"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.uniform(1, 100, (rows, len(DEFAULT_SCHEMA.columns))).astype(np.float32)
+    return StudentSimilarityIndex.from_export(
+        vectors, [f"S{i}" for i in range(rows)], [{"tasks": [], "weak_category": None}] * rows, backend
+    )
+
+
+def query_ms(index: StudentSimilarityIndex, queries: np.ndarray, k: int) -> Dict[str, float]:
+    """Best-of-3 mean and worst single-query milliseconds"""
+    index.query(queries[0], k)  # warm-up (builds the tree for tree backends)
+    mean = min(timeit.repeat(
+        lambda: [index.query(q, k) for q in queries], number=1, repeat=3
+    )) / len(queries)
+    worst = max(timeit.timeit(lambda q=q: index.query(q, k), number=1) for q in queries)
+    return {"mean_ms": mean * 1000, "max_ms": worst * 1000}
+
+
+def run_similarity_benchmark(rows: int = 100_000, queries: int = 200, k: int = 5,
+                             backends=("brute", "kdtree", "balltree")) -> Dict[str, Any]:
+    """
+    Run all measurements.
+
+    Returns:
+        Dictionary with per-backend query timings and the reference scan
+    """
+    rng = np.random.default_rng(1)
+    points = rng.uniform(1, 100, (queries, len(DEFAULT_SCHEMA.columns))).astype(np.float32)
+    results = {"rows": rows, "queries": queries, "k": k, "backends": {}}
+
+    for backend in backends:
+        if backend != "brute":
+            try:
+                import sklearn  # noqa: F401
+            except ImportError:
+                continue
+        results["backends"][backend] = query_ms(build_index(rows, backend), points, k)
+
+    vectors = build_index(rows, "brute").export()[0]
+    scan = min(timeit.repeat(
+        lambda: [np.argpartition(((vectors - q) ** 2).sum(axis=1), k)[:k] for q in points],
+        number=1, repeat=3
+    )) / len(points)
+    results["reference_scan_ms"] = scan * 1000
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark similarity index queries")
+    parser.add_argument("--rows", type=int, default=100_000, help="Stored student profiles")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per backend")
+    parser.add_argument("--k", type=int, default=5, help="Neighbours per query")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run_similarity_benchmark(args.rows, args.queries, args.k)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print("=" * 60)
+        print("Similarity Benchmark")
+        print("=" * 60)
+        print(f"\nTop-{args.k} query over {args.rows:,} profiles (ms)")
+        print(f"   {'backend':<16}{'mean':>12}{'max':>12}")
+        for backend, m in results["backends"].items():
+            print(f"   {backend:<16}{m['mean_ms']:>12.3f}{m['max_ms']:>12.3f}")
+        print(f"   {'numpy scan':<16}{results['reference_scan_ms']:>12.3f}")
+        print("=" * 60)
@@ -0,0 +1,172 @@
+"""
+Startup Benchmark
+Measures import time and time-to-first-response of the API, checks that heavy
+optional dependencies stay unloaded, and enforces a startup budget
+
+Usage:
+    python benchmarks/startup_benchmark.py [--repeat 3] [--json]
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, Any, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Dependencies that must only load when their feature is first used
+# (the tiny plotly package root is needed to set up its lazy submodules)
+HEAVY_MODULES = ("sklearn", "groq", "plotly.graph_objects", "plotly.express")
+# The API only needs pandas for CSV uploads and exports
+API_HEAVY_MODULES = HEAVY_MODULES + ("pandas",)
+
+# Seconds; override with STARTUP_BUDGET_IMPORT / STARTUP_BUDGET_FIRST_RESPONSE
+DEFAULT_BUDGET = {
+    "api_import": 2.5,
+    "webapp_import": 3.0,
+    "api_first_response": 6.0
+}
+
+_IMPORT_PROBE = """
+import sys, time, json
+sys.path[:0] = {paths!r}
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+# Modules registered by lazy_import but never touched do not count
+loaded = [
+    m for m in {heavy!r}
+    if m in sys.modules and type(sys.modules[m]).__name__ != "_LazyModule"
+]
+print(json.dumps({{"seconds": elapsed, "heavy_loaded": loaded}}))
+"""
+
+# Modules webapp.py imports before rendering (streamlit itself excluded)
+WEBAPP_IMPORTS = (
+    "import pandas, numpy\n"
+    "import student_rating, csv_processor, improvement_model, prediction_model\n"
+    "import leaderboard, groq_client, lazy_imports\n"
+    "go = lazy_imports.lazy_import('plotly.graph_objects')"
+)
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    # Startup must not depend on (or spend time on) the Groq API
+    env["GROQ_API_KEY"] = ""
+    return env
+
+
+def measure_import(imports: str, paths: List[str], heavy=HEAVY_MODULES) -> Dict[str, Any]:
+    """Import modules in a fresh interpreter; returns seconds and heavy modules loaded"""
+    code = _IMPORT_PROBE.format(paths=paths, imports=imports, heavy=tuple(heavy))
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=_child_env(),
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_response(timeout: float = 30.0) -> float:
+    """Seconds from launching uvicorn until /api/health first answers"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/health"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", "api",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=_child_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError(f"API did not respond within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def run_startup_benchmark(repeat: int = 3, include_server: bool = True) -> Dict[str, Any]:
+    """
+    Run the startup measurements (best of `repeat` runs each).
+
+    Returns:
+        Dictionary of timings (seconds) and heavy modules loaded at import
+    """
+    api = [measure_import("import main", ["api", "src"], API_HEAVY_MODULES) for _ in range(repeat)]
+    webapp = [measure_import(WEBAPP_IMPORTS, ["src"]) for _ in range(repeat)]
+
+    results = {
+        "api_import": min(r["seconds"] for r in api),
+        "api_heavy_loaded": api[-1]["heavy_loaded"],
+        "webapp_import": min(r["seconds"] for r in webapp),
+        "webapp_heavy_loaded": webapp[-1]["heavy_loaded"]
+    }
+    if include_server:
+        results["api_first_response"] = min(measure_first_response() for _ in range(repeat))
+    return results
+
+
+def check_budget(results: Dict[str, Any], budget: Dict[str, float] = None) -> List[str]:
+    """Return a list of budget violations (empty if within budget)"""
+    budget = dict(budget or DEFAULT_BUDGET)
+    budget["api_import"] = float(os.environ.get("STARTUP_BUDGET_IMPORT", budget["api_import"]))
+    budget["webapp_import"] = float(os.environ.get("STARTUP_BUDGET_IMPORT", budget["webapp_import"]))
+    budget["api_first_response"] = float(
+        os.environ.get("STARTUP_BUDGET_FIRST_RESPONSE", budget["api_first_response"])
+    )
+
+    violations = []
+    for key, limit in budget.items():
+        if key in results and results[key] > limit:
+            violations.append(f"{key}: {results[key]:.2f}s exceeds budget {limit:.2f}s")
+    for key in ("api_heavy_loaded", "webapp_heavy_loaded"):
+        if results.get(key):
+            violations.append(f"{key}: {', '.join(results[key])} imported at startup")
+    return violations
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure API/webapp startup time")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is kept)")
+    parser.add_argument("--no-server", action="store_true", help="Skip the time-to-first-response run")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run_startup_benchmark(args.repeat, include_server=not args.no_server)
+    violations = check_budget(results)
+
+    if args.json:
+        print(json.dumps({"results": results, "violations": violations}, indent=2))
+    else:
+        print("=" * 60)
+        print("Startup Benchmark")
+        print("=" * 60)
+        for key, value in results.items():
+            shown = f"{value:.3f}s" if isinstance(value, float) else (", ".join(value) or "none")
+            print(f"   {key:<22} {shown}")
+        print()
+        for violation in violations:
+            print(f"   ✗ {violation}")
+        if not violations:
+            print("   ✓ Within startup budget")
+        print("=" * 60)
+
+    sys.exit(1 if violations else 0)
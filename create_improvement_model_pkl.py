@@ -108,6 +108,14 @@ if __name__ == "__main__":
     print(f"📊 File size: {file_size:,} bytes ({file_size/1024:.2f} KB)")
     print()
     
+    # Export the versioned artifact (JSON manifest + .npy arrays)
+    artifact_path = output_path[:-len('.pkl')]
+    manifest = model.to_artifact(artifact_path)
+    StudentImprovementModel.from_artifact(artifact_path)
+    print(f"📦 Artifact saved to: {artifact_path}/")
+    print(f"   Content hash: {manifest['content_hash'][:16]}")
+    print()
+    
     if existing_info:
         print("✨ Model updated successfully!")
     else:
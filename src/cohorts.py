@@ -0,0 +1,443 @@
+"""
+Cohort Analytics
+Materialized rating aggregates per school, grade and class (and rating schema),
+kept up to date as ratings are computed
+"""
+
+import math
+import threading
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from running_stats import merge_moments
+from tiers import TierClassifier, default_classifier
+
+# Group levels a rating can belong to (besides the whole population, "all")
+LEVELS = ("school", "grade", "class")
+
+# Histogram bin width in rating points; quantiles are exact to within one bin
+RESOLUTION = 0.1
+
+MAX_RATING = 100.0
+
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# Every student belongs to the whole-population group
+ALL_KEYS = (("all", "all"),)
+
+
+def group_name(*names: Optional[str]) -> str:
+    """
+    Name of a grade or class group: its path from the school, e.g. "north/7/A"
+
+    Grades and classes are only unique within their school (and classes
+    within their grade), so each group is named by the full path; a level
+    that is not given stays empty ("/7" is grade 7 without a school).
+    """
+    return "/".join("" if name is None else str(name) for name in names)
+
+
+def normalize_name(name: Any) -> Optional[str]:
+    """
+    Canonical form of one school, grade or class name (None if empty)
+
+    Surrounding whitespace is dropped and whole numbers lose leading zeros
+    and a trailing ".0", so "07", " 7" and 7.0 (a spreadsheet grade) all name
+    grade "7".
+    """
+    if name is None:
+        return None
+    name = str(name).strip()
+    if not name:
+        return None
+    whole, _, fraction = name.partition(".")
+    if whole.isdecimal() and not fraction.strip("0"):
+        return str(int(whole))
+    return name
+
+
+@lru_cache(maxsize=4096)
+def _cohort_keys(*names) -> Tuple[Tuple[str, str], ...]:
+    """Group keys for one (school, grade, class) combination; cohorts repeat, so they are cached"""
+    names = tuple(normalize_name(name) for name in names)
+    return ALL_KEYS + tuple(
+        (level, group_name(*names[:depth + 1])) for depth, level in enumerate(LEVELS)
+        if names[depth] is not None
+    )
+
+
+class _GroupAggregate:
+    """Count, mean and M2 (Welford/Chan), rating histogram, tier counts and weakest areas of one group"""
+
+    __slots__ = ("count", "mean", "m2", "histogram", "tiers", "weakest")
+
+    def __init__(self, n_bins: int, n_tiers: int):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.histogram = np.zeros(n_bins, dtype=np.int64)
+        self.tiers = np.zeros(n_tiers, dtype=np.int64)
+        self.weakest = Counter()
+
+    def add(self, rating: float, bin_index: int, tier_index: int,
+            weak_category: Optional[str], sign: int = 1):
+        """Add (sign=1) or withdraw (sign=-1) one student's rating"""
+        self.count, self.mean, self.m2 = merge_moments((self.count, self.mean, self.m2), (1, rating, 0.0), sign)
+        self.histogram[bin_index] += sign
+        self.tiers[tier_index] += sign
+        if weak_category is not None:
+            self.weakest[weak_category] += sign
+            if not self.weakest[weak_category]:
+                del self.weakest[weak_category]
+
+    def add_many(self, ratings: np.ndarray, bin_indices: np.ndarray, tier_indices: np.ndarray,
+                 weak_categories: List[Optional[str]], sign: int = 1):
+        """Add (sign=1) or withdraw (sign=-1) several students' ratings at once"""
+        batch_mean = float(ratings.mean())
+        batch_m2 = float(np.sum((ratings - batch_mean) ** 2))
+        self.count, self.mean, self.m2 = merge_moments(
+            (self.count, self.mean, self.m2), (len(ratings), batch_mean, batch_m2), sign
+        )
+        self.histogram += sign * np.bincount(bin_indices, minlength=len(self.histogram))
+        self.tiers += sign * np.bincount(tier_indices, minlength=len(self.tiers))
+        weakest = Counter(w for w in weak_categories if w is not None)
+        if sign > 0:
+            self.weakest.update(weakest)
+        else:
+            self.weakest.subtract(weakest)
+            self.weakest = +self.weakest
+
+
+class CohortAnalytics:
+    """
+    Per-group rating statistics maintained incrementally.
+
+    Each student counts once, with their latest rating, in the "all" group
+    and in each school/grade/class group named in the rating's "cohort"
+    field (grades and classes keyed by their path from the school, see
+    group_name). Groups keep count, mean and M2 merged as in RunningStats, a
+    fixed-width rating histogram, tier counts and weakest-area counts; a new
+    rating withdraws the student's previous contribution (inverse merge) and
+    adds the new one. Summaries
+    (mean, spread, quantiles from the histogram) cost the same for ten
+    students or a hundred thousand. Group names are normalised (see
+    normalize_name), so "07" and "7" are one grade.
+
+    Ratings are assumed to share one schema; SchemaCohorts keeps one
+    instance per schema.
+    """
+
+    def __init__(self, classifier: Optional[TierClassifier] = None,
+                 resolution: float = RESOLUTION):
+        """
+        Args:
+            classifier: Tier bands for the tier counts (default tiers if None)
+            resolution: Histogram bin width in rating points
+        """
+        self.classifier = classifier or default_classifier
+        self.resolution = float(resolution)
+        self._n_bins = int(np.ceil(MAX_RATING / self.resolution))
+        self._groups: Dict[Tuple[str, str], _GroupAggregate] = {}
+        # Latest contribution per student: (group keys, rating, bin, tier, weakest area)
+        self._members: Dict[str, Tuple[Tuple[Tuple[str, str], ...], float, int, int, Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    @staticmethod
+    def group_keys(cohort: Optional[Dict[str, Any]]) -> Tuple[Tuple[str, str], ...]:
+        """(level, name) keys of the groups a cohort field places a student in"""
+        if not cohort:
+            return ALL_KEYS
+        return _cohort_keys(*(cohort.get(level) for level in LEVELS))
+
+    @staticmethod
+    def path_name(level: str, name: Any) -> str:
+        """Canonical group name for a lookup ("north/07/A" -> "north/7/A")"""
+        if level == "all":
+            return str(name)
+        return group_name(*(normalize_name(part) for part in str(name).split("/")))
+
+    def update(self, ratings_dict: Dict[str, Any], weak_category: Optional[str] = None):
+        """
+        Insert or replace a student using a compute_student_ratings result.
+
+        Args:
+            ratings_dict: Rating result (its optional "cohort" field names the
+                school, grade and class)
+            weak_category: Weakest focus area from recommend_improvement
+        """
+        student_id = str(ratings_dict.get("student_id", "unknown"))
+        rating = float(ratings_dict["overall_rating"])
+        bin_index = min(max(math.floor(rating / self.resolution + 1e-9), 0), self._n_bins - 1)
+        tier_index = int(self.classifier.classify_batch(rating))
+        weak_category = None if weak_category is None else str(weak_category)
+        keys = self.group_keys(ratings_dict.get("cohort"))
+
+        with self._lock:
+            # Add before withdrawing, so a student staying in a group never empties it
+            previous = self._members.get(student_id)
+            for key in keys:
+                self._group_locked(key).add(rating, bin_index, tier_index, weak_category)
+            self._members[student_id] = (keys, rating, bin_index, tier_index, weak_category)
+            if previous is not None:
+                self._withdraw_locked(previous)
+
+    def update_batch(self, ratings_list: Sequence[Dict[str, Any]],
+                     weak_categories: Optional[Sequence[Optional[str]]] = None):
+        """
+        Insert or replace many students at once (tiers and bins in one pass).
+
+        Args:
+            ratings_list: Results of compute_student_ratings
+            weak_categories: Weakest focus area per result (None to skip)
+        """
+        if not len(ratings_list):
+            return
+        ratings = np.array([r["overall_rating"] for r in ratings_list], dtype=float)
+        bins = self._bin_indices(ratings)
+        tiers = self.classifier.classify_batch(ratings)
+        if weak_categories is None:
+            weak_categories = [None] * len(ratings_list)
+        weak_categories = [None if w is None else str(w) for w in weak_categories]
+
+        # Latest result per student in the batch
+        rows = {str(result.get("student_id", "unknown")): row for row, result in enumerate(ratings_list)}
+        ratings_, bins_, tiers_ = ratings.tolist(), bins.tolist(), tiers.tolist()
+
+        with self._lock:
+            previous = [self._members[student_id] for student_id in rows if student_id in self._members]
+            members = defaultdict(list)
+            for student_id, row in rows.items():
+                keys = self.group_keys(ratings_list[row].get("cohort"))
+                for key in keys:
+                    members[key].append(row)
+                self._members[student_id] = (keys, ratings_[row], bins_[row], tiers_[row], weak_categories[row])
+
+            # One bincount per group instead of one update per student
+            for key, group_rows in members.items():
+                self._group_locked(key).add_many(
+                    ratings[group_rows], bins[group_rows], tiers[group_rows],
+                    [weak_categories[row] for row in group_rows]
+                )
+            if previous:
+                self._withdraw_many_locked(previous)
+
+    def remove(self, student_id: str) -> bool:
+        """Withdraw a student from every group, returns False if absent"""
+        student_id = str(student_id)
+        with self._lock:
+            if student_id not in self._members:
+                return False
+            self._remove_locked(student_id)
+            return True
+
+    def _group_locked(self, key: Tuple[str, str]) -> _GroupAggregate:
+        """Aggregate of a group, created on first use (caller holds the lock)"""
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = _GroupAggregate(self._n_bins, len(self.classifier.tiers))
+        return group
+
+    def _remove_locked(self, student_id: str):
+        """Withdraw a student's stored contribution (caller holds the lock)"""
+        self._withdraw_locked(self._members.pop(student_id))
+
+    def _withdraw_locked(self, member: Tuple):
+        """Subtract one stored contribution from its groups, dropping emptied groups"""
+        keys, rating, bin_index, tier_index, weak_category = member
+        for key in keys:
+            group = self._groups[key]
+            group.add(rating, bin_index, tier_index, weak_category, sign=-1)
+            if not group.count:
+                del self._groups[key]
+
+    def _withdraw_many_locked(self, members: List[Tuple]):
+        """Subtract many stored contributions, one bincount per affected group"""
+        by_group = defaultdict(list)
+        for member in members:
+            for key in member[0]:
+                by_group[key].append(member)
+        for key, group_members in by_group.items():
+            _, ratings, bins, tiers, weak_categories = zip(*group_members)
+            group = self._groups[key]
+            group.add_many(np.array(ratings), np.array(bins), np.array(tiers), weak_categories, sign=-1)
+            if not group.count:
+                del self._groups[key]
+
+    def _bin_indices(self, ratings: np.ndarray) -> np.ndarray:
+        """Histogram bin of each rating (ratings outside 0-100 go to the end bins)"""
+        # The small offset keeps ratings on a bin edge (e.g. 0.3 / 0.1) in the upper bin
+        bins = np.floor(ratings / self.resolution + 1e-9).astype(int)
+        return np.clip(bins, 0, self._n_bins - 1)
+
+    def _quantiles(self, histogram: np.ndarray, count: int, quantiles: Sequence[float]) -> np.ndarray:
+        """Quantiles interpolated linearly inside the histogram bin that holds them"""
+        cumulative = np.cumsum(histogram)
+        ranks = np.maximum(np.asarray(quantiles, dtype=float) * count, 1e-9)
+        bins = np.minimum(np.searchsorted(cumulative, ranks, side="left"), self._n_bins - 1)
+        before = cumulative[bins] - histogram[bins]
+        within = (ranks - before) / np.maximum(histogram[bins], 1)
+        return np.minimum((bins + within) * self.resolution, MAX_RATING)
+
+    def groups(self, level: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Known groups with their size and mean rating.
+
+        Args:
+            level: Only groups of this level ("all", "school", "grade", "class")
+
+        Returns:
+            List of {level, name, count, mean}, sorted by level then name
+        """
+        with self._lock:
+            return [
+                {"level": key[0], "name": key[1], "count": group.count,
+                 "mean": round(group.mean, 2)}
+                for key, group in sorted(self._groups.items())
+                if level is None or key[0] == level
+            ]
+
+    def summary(self, level: str, name: str,
+                quantiles: Sequence[float] = QUANTILES) -> Optional[Dict[str, Any]]:
+        """
+        Aggregates of one group.
+
+        Args:
+            level: "all", "school", "grade" or "class"
+            name: Group name ("all" for the whole population; grades and
+                classes by path, e.g. "north/7" or "north/7/A")
+            quantiles: Quantiles to report, in 0-1
+
+        Returns:
+            Dictionary with count, mean, std, min/max (to within one bin),
+            quantiles (e.g. "p50"), tier counts and weakest-area counts (most
+            common first), or None if the group is unknown
+        """
+        name = self.path_name(level, name)
+        with self._lock:
+            group = self._groups.get((level, name))
+            if group is None:
+                return None
+            count = group.count
+            mean = group.mean
+            variance = group.m2 / count
+            histogram = group.histogram.copy()
+            tiers = group.tiers.tolist()
+            weakest = group.weakest.most_common()
+
+        occupied = np.flatnonzero(histogram)
+        values = self._quantiles(histogram, count, quantiles)
+        return {
+            "level": level,
+            "name": name,
+            "count": count,
+            "mean": round(mean, 2),
+            "std": round(float(np.sqrt(variance)), 2),
+            "min": round(float(occupied[0] * self.resolution), 2),
+            "max": round(float(min((occupied[-1] + 1) * self.resolution, MAX_RATING)), 2),
+            "quantiles": {f"p{q * 100:g}": round(float(v), 2) for q, v in zip(quantiles, values)},
+            "tiers": dict(zip(self.classifier.names, tiers)),
+            "weakest_categories": dict(weakest),
+            "resolution": self.resolution
+        }
+
+
+class SchemaCohorts:
+    """
+    One CohortAnalytics per rating schema.
+
+    Schemas weigh different categories, so a group's ratings under two
+    schemas are not comparable and are aggregated separately, the way
+    SchemaLeaderboards ranks them. Results without a "schema" field were
+    rated with the default schema.
+    """
+
+    def __init__(self, default: str = "default", classifier: Optional[TierClassifier] = None,
+                 resolution: float = RESOLUTION):
+        """
+        Args:
+            default: Name of the schema results without a "schema" field belong to
+            classifier: Tier bands for the tier counts (default tiers if None)
+            resolution: Histogram bin width in rating points
+        """
+        self.default = default
+        self.classifier = classifier or default_classifier
+        self.resolution = resolution
+        self._analytics: Dict[str, CohortAnalytics] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_history(cls, prediction_history: Iterable[Dict[str, Any]], model,
+                     schemas=None, classifier: Optional[TierClassifier] = None,
+                     default: str = "default") -> "SchemaCohorts":
+        """
+        Build per-schema aggregates from stored rating results (oldest first).
+
+        Args:
+            prediction_history: Results produced by compute_student_ratings
+            model: StudentRatingModel, used to recompute each weakest area
+            schemas: SchemaRegistry for results rated with a school schema
+                (their weakest areas are left out if it is None or lacks them)
+            classifier: Tier bands (default tiers if None)
+            default: Name of the default schema
+
+        Returns:
+            SchemaCohorts holding the latest rating per student and schema
+        """
+        cohorts = cls(default, classifier)
+        latest = defaultdict(dict)
+        for result in prediction_history:
+            latest[result.get("schema") or default][str(result.get("student_id", "unknown"))] = result
+
+        for name, by_student in latest.items():
+            results = list(by_student.values())
+            schema = None
+            if name != default:
+                try:
+                    schema = schemas.get(name) if schemas is not None else None
+                except KeyError:
+                    pass
+                if schema is None:
+                    cohorts.analytics(name).update_batch(results)
+                    continue
+            weak_categories, _, _ = model.recommend_improvement_batch(
+                model.subcategory_matrix(results, schema), schema
+            )
+            cohorts.analytics(name).update_batch(results, weak_categories)
+        return cohorts
+
+    def analytics(self, schema: Optional[str] = None) -> CohortAnalytics:
+        """Aggregates of one schema (the default if None), created on first use"""
+        name = schema or self.default
+        with self._lock:
+            analytics = self._analytics.get(name)
+            if analytics is None:
+                analytics = self._analytics[name] = CohortAnalytics(self.classifier, self.resolution)
+            return analytics
+
+    def update(self, ratings_dict: Dict[str, Any], weak_category: Optional[str] = None):
+        """Insert or replace a student in the aggregates of the result's schema"""
+        self.analytics(ratings_dict.get("schema")).update(ratings_dict, weak_category)
+
+    def update_batch(self, ratings_list: Sequence[Dict[str, Any]],
+                     weak_categories: Optional[Sequence[Optional[str]]] = None):
+        """Insert or replace many students, each in the aggregates of its result's schema"""
+        if weak_categories is None:
+            weak_categories = [None] * len(ratings_list)
+        by_schema = defaultdict(lambda: ([], []))
+        for result, weak_category in zip(ratings_list, weak_categories):
+            results, weak = by_schema[result.get("schema") or self.default]
+            results.append(result)
+            weak.append(weak_category)
+        for name, (results, weak) in by_schema.items():
+            self.analytics(name).update_batch(results, weak)
+
+    def names(self) -> List[str]:
+        """Schemas that have aggregates"""
+        with self._lock:
+            return sorted(self._analytics)
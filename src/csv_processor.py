@@ -7,46 +7,50 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any, Optional
 import os
-import pickle
-import sys
-from groq import Groq
+
+from groq_pool import get_groq_client
+from metrics import stage_timer
+from model_artifacts import load_model
+from rating_schema import RatingSchema, DEFAULT_SCHEMA
+from scoring_model import StudentScoringModel
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
 
 
 class CSVReportProcessor:
     """Process student CSV report cards and analyze with Groq API"""
     
-    def __init__(self):
-        """Initialize processor with scoring model and optional Groq API client"""
-        self.groq_client = None
+    def __init__(self, schema: Optional[RatingSchema] = None):
+        """
+        Initialize processor with scoring model and optional Groq API client
+        
+        Args:
+            schema: Rating schema supplying the class focus weights (default schema if None)
+        """
+        self.schema = schema or DEFAULT_SCHEMA
+        self._groq_client = None
         self.scoring_model = None
         
-        # Load the scoring model from pickle
+        # Load the scoring model: versioned artifact first, legacy pickle as fallback
         try:
-            # Import the class definition before loading pickle
-            # Add src to path if needed
-            src_path = os.path.join(os.path.dirname(os.path.abspath(__file__)))
-            if src_path not in sys.path:
-                sys.path.insert(0, src_path)
-            from scoring_model import StudentScoringModel
-            
-            model_path = "models/student_scoring_model.pkl"
-            if os.path.exists(model_path):
-                with open(model_path, 'rb') as f:
-                    self.scoring_model = pickle.load(f)
-                print(f"[OK] Scoring model loaded (v{self.scoring_model.model_version})")
+            self.scoring_model = load_model(StudentScoringModel)
         except Exception as e:
-            print(f"[WARN] Could not load scoring model: {e}")
-            print("  Will use built-in methods")
+            logger.warning("Could not load scoring model; using built-in methods", extra={"error": str(e)})
         
-        # Try to initialize Groq client
-        api_key = os.environ.get("GROQ_API_KEY")
-        if api_key:
-            try:
-                self.groq_client = Groq(api_key=api_key)
-                print("[OK] Groq API connected for comment analysis")
-            except Exception as e:
-                print(f"[WARN] Groq API initialization failed: {e}")
-                print("  Will use keyword-based analysis instead")
+        # Groq client is fetched from the shared pool on first use
+        self._groq_api_key = os.environ.get("GROQ_API_KEY")
+    
+    @property
+    def groq_client(self):
+        """Shared Groq client, created lazily (None without an API key)"""
+        if self._groq_client is None and self._groq_api_key:
+            self._groq_client = get_groq_client(self._groq_api_key)
+        return self._groq_client
+    
+    @groq_client.setter
+    def groq_client(self, client):
+        self._groq_client = client
     
     def compute_attendance(self, df: pd.DataFrame) -> Dict[str, float]:
         """
@@ -92,8 +96,8 @@ class CSVReportProcessor:
                           hwcw_scores: Dict[str, Dict[str, int]], 
                           exam_scores: Dict[str, float]) -> Dict[str, float]:
         """
-        Compute class focus % as weighted average:
-        45% exam, 25% attendance, 15% HW, 15% CW
+        Compute class focus % as weighted average of the schema's class focus
+        weights (default: 45% exam, 25% attendance, 15% HW, 15% CW)
         """
         cf = {}
         for student in attendance_dict.keys():
@@ -101,7 +105,7 @@ class CSVReportProcessor:
             hw = hwcw_scores[student]['homework'] / 10 * 100
             cw = hwcw_scores[student]['classwork'] / 10 * 100
             exam = exam_scores[student]
-            cf[student] = 0.45*exam + 0.25*att + 0.15*hw + 0.15*cw
+            cf[student] = self.schema.class_focus_score(exam, att, hw, cw)
         return cf
 
     def infer_skills_from_comments_keyword(self, comments: Dict[str, str]) -> Dict[str, Dict[str, int]]:
@@ -162,15 +166,16 @@ Respond ONLY with three numbers separated by commas: problem_solving,communicati
 Example: 7,8,6
 """
             
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {"role": "system", "content": "You are an educational assessment expert. Analyze teacher comments and provide skill scores."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=50
-            )
+            with stage_timer("llm_call"):
+                response = self.groq_client.chat.completions.create(
+                    model="llama-3.3-70b-versatile",
+                    messages=[
+                        {"role": "system", "content": "You are an educational assessment expert. Analyze teacher comments and provide skill scores."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.3,
+                    max_tokens=50
+                )
             
             # Parse response
             result = response.choices[0].message.content.strip()
@@ -183,8 +188,10 @@ Example: 7,8,6
             }
             
         except Exception as e:
-            print(f"[WARN] Groq API analysis failed: {e}")
-            print("  Falling back to keyword-based analysis")
+            logger.warning(
+                "Groq API analysis failed; falling back to keyword-based analysis",
+                extra={"student_id": student_name, "error": str(e)}
+            )
             return self.infer_skills_from_comments_keyword({student_name: comments})[student_name]
 
     def process_student_csv(self, filepath: str, student_name: Optional[str] = None) -> Dict[str, Any]:
@@ -199,7 +206,8 @@ Example: 7,8,6
             Dictionary with processed student data ready for rating model
         """
         # Read CSV
-        df = pd.read_csv(filepath)
+        with stage_timer("csv_parse"):
+            df = pd.read_csv(filepath)
         
         # Extract student name
         if student_name is None:
@@ -222,10 +230,11 @@ Example: 7,8,6
         df['CW_issue'] = df['CW_issue'].astype(bool)
         
         # Compute metrics
-        attendance = self.compute_attendance(df)
-        hwcw = self.compute_hw_cw_score(df)
-        exams = self.compute_exam_score(df)
-        class_focus = self.compute_class_focus(attendance, hwcw, exams)
+        with stage_timer("aggregation"):
+            attendance = self.compute_attendance(df)
+            hwcw = self.compute_hw_cw_score(df)
+            exams = self.compute_exam_score(df)
+            class_focus = self.compute_class_focus(attendance, hwcw, exams)
         
         # Process teacher comments
         if 'teacher_comment' in df.columns:
@@ -265,8 +274,8 @@ Example: 7,8,6
                 student_data = self.process_student_csv(filepath)
                 student_name = student_data['student_id']
                 results[student_name] = student_data
-                print(f"[OK] Processed: {student_name}")
+                logger.info("Processed report card", extra={"student_id": student_name})
             except Exception as e:
-                print(f"[ERROR] Error processing {filepath}: {e}")
+                logger.error("Error processing report card", extra={"path": filepath, "error": str(e)})
         
         return results
@@ -3,58 +3,180 @@ Data Input Module
 Handles CSV reading and manual data entry for student information
 """
 
-import pandas as pd
-from typing import Dict, Any, List
+import io
+from typing import Dict, Any, List, Optional, Tuple
 import json
 
+from lazy_imports import lazy_import
+from metrics import timed
+from rating_schema import DEFAULT_SCHEMA, RatingSchema
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Loaded on first use (the API imports this module for every request type)
+pd = lazy_import("pandas")
+
+
+# Columns of a bulk feedback batch and the valid rating range
+FEEDBACK_COLUMNS = ("student_id", "actual_rating", "predicted_rating")
+RATING_RANGE = (0.0, 100.0)
+
+# Optional student CSV columns naming a student's cohort groups (column -> level)
+COHORT_COLUMNS = {"grade": "grade", "class_name": "class"}
+
+# Invalid rows listed by number in a validation report
+MAX_REPORTED_ROWS = 20
+
 
 class StudentDataInput:
     """Handle various input methods for student data"""
     
     @staticmethod
-    def read_from_csv(filepath: str) -> List[Dict[str, Any]]:
+    @timed("csv_parse")
+    def read_from_csv(filepath: str, schema: Optional[RatingSchema] = None
+                      ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
         """
-        Read student data from CSV file
+        Read student data from CSV file, one column per schema input
         
-        Expected CSV format:
+        Expected CSV format (default schema):
         student_id, attendance, homework, classwork, class_focus, exam, 
         problem_solving, communication, discipline
+        (optional: grade, class_name -> the student's "cohort" groups)
+        
+        Scalar categories are read from the column named by the category key,
+        group sub-scores from the column named by the sub-score. Rows missing
+        an input the schema declares, or holding a non-numeric one, are left
+        out and reported.
         
         Args:
             filepath: Path to CSV file
+            schema: Rating schema naming the input columns (default schema if None)
             
         Returns:
-            List of student dictionaries
+            Tuple of (student dictionaries, validation report with invalid rows)
+            
+        Raises:
+            ValueError: If the file cannot be read
         """
+        schema = schema or DEFAULT_SCHEMA
         try:
-            df = pd.read_csv(filepath)
-            students = []
-            
-            for _, row in df.iterrows():
-                student = {
-                    "student_id": row.get("student_id", "unknown"),
-                    "attendance": float(row.get("attendance", 80)),
-                    "homework": float(row.get("homework", 7)),
-                    "classwork": float(row.get("classwork", 7)),
-                    "class_focus": float(row.get("class_focus", 70)),
-                    "exam": float(row.get("exam", 65)),
-                    "skills": {
-                        "problem_solving": float(row.get("problem_solving", 7)),
-                        "communication": float(row.get("communication", 7)),
-                        "discipline": float(row.get("discipline", 7))
-                    }
-                }
-                students.append(student)
+            df = pd.read_csv(filepath, dtype={"student_id": str, **{column: str for column in COHORT_COLUMNS}})
+        except Exception as e:
+            logger.error("Error reading CSV", extra={"path": filepath, "error": str(e)})
+            raise ValueError(f"Could not parse CSV: {e}") from None
+        
+        # Column-wise validation: missing cells vs. cells that are not numbers
+        values, checks = {}, []
+        for index, name in schema.columns:
+            column = schema.categories[index].key if name is None else name
+            if column not in df.columns:
+                checks.append((column, "missing", pd.Series(True, index=df.index)))
+                continue
+            values[column] = pd.to_numeric(df[column], errors="coerce").astype(float)
+            checks.append((column, "missing", df[column].isna()))
+            checks.append((column, "non-numeric", df[column].notna() & values[column].isna()))
+        
+        invalid = pd.Series(False, index=df.index)
+        for _, _, mask in checks:
+            invalid |= mask
+        invalid_rows = df.index[invalid][:MAX_REPORTED_ROWS]
+        errors = []
+        for i in invalid_rows:
+            found: Dict[str, List[str]] = {}
+            for column, kind, mask in checks:
+                if mask[i]:
+                    found.setdefault(kind, []).append(column)
+            errors.append(f"row {int(i) + 1} " + "; ".join(
+                f"{kind} {', '.join(columns)}" for kind, columns in found.items()
+            ))
+        report = {
+            "received": len(df),
+            "valid": int((~invalid).sum()),
+            "invalid": int(invalid.sum()),
+            # 1-based data row numbers, first MAX_REPORTED_ROWS only
+            "invalid_rows": [int(i) + 1 for i in invalid_rows],
+            "errors": errors
+        }
+        
+        # Plain lists: per-cell Series lookups dominate on large uploads
+        keep = (~invalid).tolist()
+        ids = df["student_id"].tolist() if "student_id" in df.columns else ["unknown"] * len(df)
+        columns = {column: series.tolist() for column, series in values.items()}
+        cohorts = {
+            level: df[column].tolist() for column, level in COHORT_COLUMNS.items() if column in df.columns
+        }
+        students = []
+        for i, valid in enumerate(keep):
+            if not valid:
+                continue
+            student = {"student_id": ids[i] if pd.notna(ids[i]) else "unknown"}
+            for category in schema.categories:
+                if category.inputs:
+                    student[category.key] = {name: columns[name][i] for name in category.inputs}
+                else:
+                    student[category.key] = columns[category.key][i]
+            cohort = {level: names[i] for level, names in cohorts.items() if pd.notna(names[i])}
+            if cohort:
+                student["cohort"] = cohort
+            students.append(student)
+        
+        logger.info("Loaded students from CSV", extra={
+            "count": len(students), "invalid": report["invalid"], "path": filepath, "schema": schema.name
+        })
+        return students, report
+    
+    @staticmethod
+    @timed("csv_parse")
+    def read_feedback_batch(data: bytes, fmt: str = "csv") -> Tuple["pd.DataFrame", Dict[str, Any]]:
+        """
+        Parse and validate a bulk feedback batch column-wise
+        
+        Expected columns: student_id, actual_rating, predicted_rating
+        (extra columns such as weak_category are kept).
+        
+        Args:
+            data: Raw CSV, NDJSON or JSON-array bytes
+            fmt: "csv", "ndjson" or "json"
             
-            print(f"✓ Successfully loaded {len(students)} student(s) from {filepath}")
-            return students
+        Returns:
+            Tuple of (valid rows, validation report with invalid row numbers)
             
-        except FileNotFoundError:
-            print(f"✗ Error: File not found - {filepath}")
-            return []
+        Raises:
+            ValueError: If the batch cannot be parsed or lacks required columns
+        """
+        if fmt not in ("csv", "ndjson", "json"):
+            raise ValueError(f"Unsupported feedback format: {fmt}")
+        try:
+            if fmt == "csv":
+                df = pd.read_csv(io.BytesIO(data), dtype={"student_id": str})
+            else:
+                df = pd.read_json(io.BytesIO(data), lines=(fmt == "ndjson"), dtype={"student_id": str})
         except Exception as e:
-            print(f"✗ Error reading CSV: {str(e)}")
-            return []
+            raise ValueError(f"Could not parse {fmt} feedback: {e}") from None
+        
+        missing = [col for col in FEEDBACK_COLUMNS if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+        
+        low, high = RATING_RANGE
+        valid = df["student_id"].notna() & (df["student_id"].astype(str).str.strip() != "")
+        for col in ("actual_rating", "predicted_rating"):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+            valid &= df[col].between(low, high)
+        
+        invalid_rows = df.index[~valid]
+        report = {
+            "received": len(df),
+            "valid": int(valid.sum()),
+            "invalid": len(invalid_rows),
+            # 1-based data row numbers, first MAX_REPORTED_ROWS only
+            "invalid_rows": [int(i) + 1 for i in invalid_rows[:MAX_REPORTED_ROWS]]
+        }
+        
+        df = df[valid].reset_index(drop=True)
+        df["student_id"] = df["student_id"].astype(str).str.strip()
+        return df, report
     
     @staticmethod
     def manual_input_interactive() -> Dict[str, Any]:
@@ -164,10 +286,10 @@ class StudentDataInput:
             
             df = pd.DataFrame(flattened)
             df.to_csv(filepath, index=False)
-            print(f"✓ Student data saved to {filepath}")
+            logger.info("Student data saved", extra={"count": len(students), "path": filepath})
             
         except Exception as e:
-            print(f"✗ Error saving CSV: {str(e)}")
+            logger.error("Error saving CSV", extra={"path": filepath, "error": str(e)})
     
     @staticmethod
     def create_sample_csv(filepath: str = "data/sample_students.csv"):
@@ -215,5 +337,5 @@ class StudentDataInput:
         
         df = pd.DataFrame(sample_data)
         df.to_csv(filepath, index=False)
-        print(f"✓ Sample CSV created at {filepath}")
+        logger.info("Sample CSV created", extra={"path": filepath})
         return filepath
@@ -0,0 +1,85 @@
+"""
+Export Log
+Appendable JSON-lines segment files for analysis exports (one line per export)
+instead of one small JSON file per export
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional
+
+
+class SegmentLog:
+    """
+    Append-only log split into size-bounded segments.
+
+    Records go to <directory>/<prefix>-<YYYYMMDD>-<NNN>.jsonl; a new segment
+    starts each day and whenever the current one exceeds max_bytes. Every line
+    is one self-contained JSON object, so segments can be tailed, grepped or
+    loaded with pandas.read_json(lines=True).
+    """
+
+    def __init__(self, directory: str = os.path.join("logs", "exports"),
+                 prefix: str = "exports", max_bytes: int = 8 * 2**20):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def segments(self) -> List[str]:
+        """Segment paths, oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith(f"{self.prefix}-") and name.endswith(".jsonl")
+        )
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _current_segment(self) -> str:
+        """Today's newest segment, or the next one if it is full"""
+        day = datetime.now().strftime("%Y%m%d")
+        today = [p for p in self.segments() if os.path.basename(p).startswith(f"{self.prefix}-{day}-")]
+        if today and os.path.getsize(today[-1]) < self.max_bytes:
+            return today[-1]
+        return os.path.join(self.directory, f"{self.prefix}-{day}-{len(today):03d}.jsonl")
+
+    def append(self, kind: str, data: Any, **fields) -> str:
+        """
+        Append one export.
+
+        Args:
+            kind: Export type, e.g. "analysis", "improvement_plan", "predictions"
+            data: JSON-serializable payload
+            **fields: Extra top-level fields (e.g. student_id) for filtering
+
+        Returns:
+            Path of the segment the record was written to
+        """
+        line = json.dumps(
+            {"ts": datetime.now().isoformat(), "kind": kind, **fields, "data": data},
+            default=str, ensure_ascii=False
+        ) + "\n"
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._current_segment()
+            # One write per line in append mode: concurrent writers never interleave lines
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+        return path
+
+    def read(self, kind: Optional[str] = None, **fields) -> Iterator[Dict[str, Any]]:
+        """Iterate records (oldest first), optionally filtered by kind and fields"""
+        for path in self.segments():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if kind is not None and record.get("kind") != kind:
+                        continue
+                    if any(record.get(k) != v for k, v in fields.items()):
+                        continue
+                    yield record
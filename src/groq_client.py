@@ -3,11 +3,13 @@ Groq API Integration
 Generate detailed improvement suggestions using Groq LLM
 """
 
-from groq import Groq
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterator
 from dotenv import load_dotenv
 
+from groq_pool import get_groq_client
+from metrics import stage_timer
+
 # Load environment variables
 load_dotenv()
 
@@ -30,7 +32,16 @@ class GroqSuggestionGenerator:
                 "or pass it to the constructor."
             )
         
-        self.client = Groq(api_key=self.api_key)
+        self._client = None
+    
+    @property
+    def client(self):
+        """Shared Groq client, created on first LLM call"""
+        if self._client is None:
+            self._client = get_groq_client(self.api_key)
+            if self._client is None:
+                raise RuntimeError("Groq client could not be initialized")
+        return self._client
     
     def generate_improvement_plan(
         self,
@@ -38,7 +49,8 @@ class GroqSuggestionGenerator:
         ratings: Dict[str, Any],
         weak_category: str,
         recommendation: str,
-        all_scores: Dict[str, float]
+        all_scores: Dict[str, float],
+        raise_on_error: bool = False
     ) -> str:
         """
         Generate detailed improvement plan using Groq
@@ -49,14 +61,127 @@ class GroqSuggestionGenerator:
             weak_category: Weakest performance category
             recommendation: Basic recommendation text
             all_scores: All category scores
+            raise_on_error: Raise Groq errors instead of returning an error
+                message in place of the plan (for job handlers)
             
         Returns:
             Detailed improvement plan as text
         """
+        try:
+            prompt = self._build_improvement_prompt(
+                student_id, ratings, weak_category, recommendation, all_scores
+            )
+            with stage_timer("llm_call"):
+                response = self.client.chat.completions.create(
+                    model="llama-3.3-70b-versatile",  # or "mixtral-8x7b-32768"
+                    messages=self._improvement_messages(prompt),
+                    temperature=0.7,
+                    max_tokens=2000
+                )
+            
+            improvement_plan = response.choices[0].message.content
+            return improvement_plan
+            
+        except Exception as e:
+            if raise_on_error:
+                raise
+            return f"Error generating improvement plan: {str(e)}\n\nBasic Recommendation: {recommendation}"
+    
+    def stream_improvement_plan(
+        self,
+        student_id: str,
+        ratings: Dict[str, Any],
+        weak_category: str,
+        recommendation: str,
+        all_scores: Dict[str, float]
+    ) -> Iterator[str]:
+        """
+        Streaming variant of generate_improvement_plan.
+        Yields text chunks as Groq produces them instead of waiting for the
+        whole completion.
+        
+        Args:
+            student_id: Student identifier
+            ratings: Full rating dictionary
+            weak_category: Weakest performance category
+            recommendation: Basic recommendation text
+            all_scores: All category scores
+            
+        Yields:
+            Pieces of the improvement plan text
+        """
+        try:
+            prompt = self._build_improvement_prompt(
+                student_id, ratings, weak_category, recommendation, all_scores
+            )
+            # Timed until the stream completes (or the consumer stops reading)
+            with stage_timer("llm_call"):
+                stream = self.client.chat.completions.create(
+                    model="llama-3.3-70b-versatile",
+                    messages=self._improvement_messages(prompt),
+                    temperature=0.7,
+                    max_tokens=2000,
+                    stream=True
+                )
+                
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield delta
+                    
+        except Exception as e:
+            yield f"Error generating improvement plan: {str(e)}\n\nBasic Recommendation: {recommendation}"
+    
+    @staticmethod
+    def _improvement_messages(prompt: str) -> List[Dict[str, str]]:
+        """Chat messages for an improvement plan request"""
+        return [
+            {
+                "role": "system",
+                "content": "You are an expert educational consultant who creates detailed, actionable improvement plans for students."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    @staticmethod
+    def _format_breakdown(subcategories: Dict[str, Any]) -> str:
+        """
+        One line per rating category (any schema); a group lists its sub-scores
         
+        Args:
+            subcategories: The "subcategories" of a rating result
+            
+        Returns:
+            Bullet list, e.g. "- Attendance: 90.0/100"
+        """
+        lines = []
+        for label, score in subcategories.items():
+            if isinstance(score, dict):
+                lines.append(f"- {label}:")
+                lines.extend(
+                    f"  * {name.replace('_', ' ').title()}: {value}/100" for name, value in score.items()
+                )
+            else:
+                lines.append(f"- {label}: {score}/100")
+        return "\n".join(lines)
+    
+    @staticmethod
+    def _build_improvement_prompt(
+        student_id: str,
+        ratings: Dict[str, Any],
+        weak_category: str,
+        recommendation: str,
+        all_scores: Dict[str, float]
+    ) -> str:
+        """Build the improvement plan prompt from a student's ratings"""
         # Build context for the LLM
         overall_rating = ratings["overall_rating"]
-        subcats = ratings["subcategories"]
+        breakdown = GroqSuggestionGenerator._format_breakdown(ratings["subcategories"])
         
         prompt = f"""You are an educational consultant AI. Analyze this student's performance and create a detailed, actionable improvement plan.
 
@@ -64,15 +189,7 @@ STUDENT ID: {student_id}
 OVERALL RATING: {overall_rating}/100
 
 PERFORMANCE BREAKDOWN:
-- Attendance: {subcats['Attendance']}/100
-- Homework: {subcats['Homework']}/100
-- Classwork: {subcats['Classwork']}/100
-- Class Focus: {subcats['Class Focus']}/100
-- Exam: {subcats['Exam']}/100
-- Skills:
-  * Problem Solving: {subcats['Skills'].get('problem_solving', 'N/A')}/100
-  * Communication: {subcats['Skills'].get('communication', 'N/A')}/100
-  * Discipline: {subcats['Skills'].get('discipline', 'N/A')}/100
+{breakdown}
 
 WEAKEST AREA: {weak_category} ({all_scores.get(weak_category, 0):.2f}/100)
 BASIC RECOMMENDATION: {recommendation}
@@ -88,29 +205,7 @@ Please create a comprehensive improvement plan with:
 Focus especially on the weakest area ({weak_category}) but provide a holistic approach.
 Be specific, actionable, and encouraging. Format with clear sections and bullet points.
 """
-        
-        try:
-            response = self.client.chat.completions.create(
-                model="llama-3.3-70b-versatile",  # or "mixtral-8x7b-32768"
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert educational consultant who creates detailed, actionable improvement plans for students."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=2000
-            )
-            
-            improvement_plan = response.choices[0].message.content
-            return improvement_plan
-            
-        except Exception as e:
-            return f"Error generating improvement plan: {str(e)}\n\nBasic Recommendation: {recommendation}"
+        return prompt
     
     def generate_strengths_analysis(
         self,
@@ -127,7 +222,7 @@ Be specific, actionable, and encouraging. Format with clear sections and bullet
         Returns:
             Strengths analysis as text
         """
-        subcats = ratings["subcategories"]
+        breakdown = self._format_breakdown(ratings["subcategories"])
         overall = ratings["overall_rating"]
         
         prompt = f"""Analyze this student's strengths and provide encouragement.
@@ -136,27 +231,23 @@ STUDENT ID: {student_id}
 OVERALL RATING: {overall}/100
 
 SCORES:
-- Attendance: {subcats['Attendance']}/100
-- Homework: {subcats['Homework']}/100
-- Classwork: {subcats['Classwork']}/100
-- Class Focus: {subcats['Class Focus']}/100
-- Exam: {subcats['Exam']}/100
-- Skills: {subcats['Skills']}
+{breakdown}
 
 Identify the top 3 strengths and explain how they can leverage these strengths to improve weaker areas.
 Be specific and encouraging. Keep it under 200 words.
 """
         
         try:
-            response = self.client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {"role": "system", "content": "You are a supportive educational coach."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=300
-            )
+            with stage_timer("llm_call"):
+                response = self.client.chat.completions.create(
+                    model="llama-3.3-70b-versatile",
+                    messages=[
+                        {"role": "system", "content": "You are a supportive educational coach."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=300
+                )
             
             return response.choices[0].message.content
             
@@ -181,7 +272,7 @@ Be specific and encouraging. Keep it under 200 words.
             Teacher recommendations as text
         """
         overall = ratings["overall_rating"]
-        subcats = ratings["subcategories"]
+        breakdown = self._format_breakdown(ratings["subcategories"])
         
         prompt = f"""As an educational expert, provide recommendations for teachers/educators working with this student.
 
@@ -190,7 +281,7 @@ OVERALL RATING: {overall}/100
 WEAKEST AREA: {weak_category}
 
 PERFORMANCE DATA:
-{subcats}
+{breakdown}
 
 Provide:
 1. Teaching strategies tailored to this student
@@ -202,15 +293,16 @@ Keep it practical and actionable for educators. About 150-200 words.
 """
         
         try:
-            response = self.client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {"role": "system", "content": "You are an educational consultant advising teachers."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=400
-            )
+            with stage_timer("llm_call"):
+                response = self.client.chat.completions.create(
+                    model="llama-3.3-70b-versatile",
+                    messages=[
+                        {"role": "system", "content": "You are an educational consultant advising teachers."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=400
+                )
             
             return response.choices[0].message.content
             
@@ -0,0 +1,169 @@
+"""
+Shared Groq Client Pool
+Process-wide registry of lazily constructed Groq clients that share one
+keep-alive HTTP connection pool
+"""
+
+import os
+import threading
+from typing import Dict, Any, Optional
+
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+class GroqClientPool:
+    """
+    Registry of Groq clients keyed by API key.
+
+    Nothing is imported or constructed until the first client is requested,
+    so processes that never call the LLM pay no startup cost. All clients
+    share a single httpx connection pool, and connection reuse is tracked
+    through httpcore trace events.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None
+    ):
+        self.max_connections = max_connections or int(
+            os.environ.get("GROQ_POOL_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)
+        )
+        self.max_keepalive_connections = max_keepalive_connections or int(
+            os.environ.get("GROQ_POOL_MAX_KEEPALIVE", DEFAULT_MAX_KEEPALIVE_CONNECTIONS)
+        )
+        self.keepalive_expiry = keepalive_expiry or float(
+            os.environ.get("GROQ_POOL_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY)
+        )
+
+        self._clients: Dict[str, Any] = {}
+        self._http_client = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "clients_created": 0,
+            "client_lookups": 0,
+            "http_requests": 0,
+            "connections_opened": 0
+        }
+
+    def configure(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None
+    ):
+        """Change pool limits; only allowed before the first client is created"""
+        with self._lock:
+            if self._http_client is not None:
+                raise RuntimeError("Groq connection pool already in use; configure it at startup")
+            if max_connections is not None:
+                self.max_connections = max_connections
+            if max_keepalive_connections is not None:
+                self.max_keepalive_connections = max_keepalive_connections
+            if keepalive_expiry is not None:
+                self.keepalive_expiry = keepalive_expiry
+
+    def get_client(self, api_key: Optional[str] = None):
+        """
+        Get the shared Groq client for an API key, creating it on first use.
+
+        Args:
+            api_key: Groq API key (if not provided, reads GROQ_API_KEY)
+
+        Returns:
+            Groq client, or None if no key is available or construction failed
+        """
+        api_key = api_key or os.environ.get("GROQ_API_KEY")
+        if not api_key:
+            return None
+
+        with self._lock:
+            self._stats["client_lookups"] += 1
+            client = self._clients.get(api_key)
+            if client is not None:
+                return client
+
+            try:
+                from groq import Groq
+
+                client = Groq(api_key=api_key, http_client=self._get_http_client())
+            except Exception as e:
+                logger.warning("Groq API initialization failed", extra={"error": str(e)})
+                return None
+
+            self._clients[api_key] = client
+            self._stats["clients_created"] += 1
+            logger.info("Groq API client created (shared connection pool)")
+            return client
+
+    def _get_http_client(self):
+        """Build the shared httpx client (caller holds the lock)"""
+        if self._http_client is None:
+            import httpx
+
+            self._http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                timeout=httpx.Timeout(60.0, connect=5.0),
+                event_hooks={"request": [self._on_request]}
+            )
+        return self._http_client
+
+    def _on_request(self, request):
+        """Count requests and attach a trace hook that sees new connections"""
+        self._stats["http_requests"] += 1
+        request.extensions["trace"] = self._on_trace
+
+    def _on_trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.complete":
+            self._stats["connections_opened"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Connection reuse statistics for the shared pool"""
+        stats = dict(self._stats)
+        reused = max(0, stats["http_requests"] - stats["connections_opened"])
+        stats["connections_reused"] = reused
+        stats["reuse_ratio"] = (
+            round(reused / stats["http_requests"], 3) if stats["http_requests"] else 0.0
+        )
+        stats["max_connections"] = self.max_connections
+        stats["max_keepalive_connections"] = self.max_keepalive_connections
+        return stats
+
+    def close(self):
+        """Close the shared connections and forget all clients"""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            self._http_client = None
+            self._clients = {}
+
+
+# Process-wide default pool
+_default_pool = GroqClientPool()
+
+
+def get_groq_client(api_key: Optional[str] = None):
+    """Get a shared Groq client from the process-wide pool"""
+    return _default_pool.get_client(api_key)
+
+
+def get_pool() -> GroqClientPool:
+    """Get the process-wide Groq client pool"""
+    return _default_pool
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Connection reuse statistics for the process-wide pool"""
+    return _default_pool.get_stats()
@@ -8,9 +8,18 @@ import os
 import json
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterable, Iterator
 from datetime import datetime
-from groq import Groq
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from groq_pool import get_groq_client
+from rating_schema import DEFAULT_SCHEMA
+from similarity_index import SchemaSimilarityIndex, StudentSimilarityIndex
+from task_library import TaskLibrary, DEFAULT_PATH
+from model_artifacts import save_artifact, load_artifact
+from metrics import stage_timer
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
 
 
 class StudentImprovementModel:
@@ -22,22 +31,109 @@ class StudentImprovementModel:
     4. Generates specific, actionable task lists
     """
     
+    ARTIFACT_NAME = "student_improvement_model"
+    
     def __init__(self):
         self.model_version = "1.0"
         self.created_date = "2025-12-09"
         
-        # Initialize Groq client
-        self.groq_client = None
-        api_key = os.environ.get("GROQ_API_KEY")
-        if api_key:
-            try:
-                self.groq_client = Groq(api_key=api_key)
-                print("[OK] Groq API connected for improvement suggestions")
-            except Exception as e:
-                print(f"[WARN] Groq API initialization failed: {e}")
+        # Groq client is fetched from the shared pool on first use
+        self._groq_client = None
+        self._groq_api_key = os.environ.get("GROQ_API_KEY")
         
         # Track improvement history
         self.improvement_history = []
+        
+        # Rating-vector indexes (one per rating schema) of past students and the tasks they were given
+        self.similarity_index = SchemaSimilarityIndex()
+        
+        # Generated tasks, reused for students with the same weak area (one copy per process)
+        self.task_library = TaskLibrary.shared()
+    
+    def __setstate__(self, state):
+        state = dict(state)
+        # Older pickles store the client itself; the key is read from the environment instead
+        state.pop("groq_client", None)
+        state.setdefault("_groq_client", None)
+        state.setdefault("_groq_api_key", os.environ.get("GROQ_API_KEY"))
+        state.setdefault("improvement_history", [])
+        self.__dict__.update(state)
+        index = state.get("similarity_index")
+        if index is None:
+            self.similarity_index = SchemaSimilarityIndex()
+        elif isinstance(index, StudentSimilarityIndex):
+            # Older pickles hold a single index of default-schema vectors
+            self.similarity_index = SchemaSimilarityIndex.from_export(
+                {index.schema_name: index.export()}, index.backend
+            )
+        # Older pickles embed a library snapshot; serve from the process-wide copy of its file
+        library = state.get("task_library")
+        self.task_library = TaskLibrary.shared(library.filepath if library is not None else DEFAULT_PATH)
+    
+    @property
+    def groq_client(self):
+        """Shared Groq client, created lazily (None without an API key)"""
+        client = getattr(self, "_groq_client", None)
+        api_key = getattr(self, "_groq_api_key", None)
+        if client is None and api_key:
+            client = self._groq_client = get_groq_client(api_key)
+        return client
+    
+    @groq_client.setter
+    def groq_client(self, client):
+        self._groq_client = client
+    
+    def to_artifact(self, path: str) -> Dict[str, Any]:
+        """Save history and the similarity indexes as a model artifact directory"""
+        exports = self.similarity_index.export()
+        # The default schema keeps the original keys; other schemas get their own arrays
+        vectors, student_ids, payloads = exports.pop(
+            DEFAULT_SCHEMA.name, (np.zeros((0, len(DEFAULT_SCHEMA.columns)), dtype=np.float32), [], [])
+        )
+        return save_artifact(
+            path, self.ARTIFACT_NAME, self.model_version,
+            state={
+                "created_date": self.created_date,
+                "improvement_history": self.improvement_history,
+                "similarity": {
+                    "backend": self.similarity_index.backend,
+                    "student_ids": student_ids,
+                    "payloads": payloads,
+                    "schemas": {
+                        name: {"student_ids": ids, "payloads": data}
+                        for name, (_, ids, data) in exports.items()
+                    }
+                }
+            },
+            arrays={
+                "similarity_vectors": vectors,
+                **{f"similarity_vectors.{name}": export[0] for name, export in exports.items()}
+            }
+        )
+    
+    @classmethod
+    def from_artifact(cls, path: str) -> "StudentImprovementModel":
+        """Load a model saved with to_artifact (the task library stays in its own file)"""
+        artifact = load_artifact(path)
+        state = artifact.state
+        model = cls()
+        model.model_version = artifact.model_version
+        model.created_date = state.get("created_date", model.created_date)
+        model.improvement_history = state.get("improvement_history", [])
+        
+        similarity = state.get("similarity", {})
+        exports = {
+            name: (artifact.arrays[f"similarity_vectors.{name}"], entry["student_ids"], entry["payloads"])
+            for name, entry in similarity.get("schemas", {}).items()
+        }
+        if similarity.get("student_ids"):
+            exports[DEFAULT_SCHEMA.name] = (
+                artifact.arrays["similarity_vectors"], similarity["student_ids"], similarity["payloads"]
+            )
+        model.similarity_index = SchemaSimilarityIndex.from_export(
+            exports, backend=similarity.get("backend", "brute")
+        )
+        return model
     
     def merge_suggestions_with_groq(
         self,
@@ -99,21 +195,22 @@ Respond in JSON format with these fields:
 }}
 """
             
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert educational advisor who creates personalized improvement strategies. Always respond in valid JSON format."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=500
-            )
+            with stage_timer("llm_call"):
+                response = self.groq_client.chat.completions.create(
+                    model="llama-3.3-70b-versatile",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are an expert educational advisor who creates personalized improvement strategies. Always respond in valid JSON format."
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=0.3,
+                    max_tokens=500
+                )
             
             # Parse Groq response
             result_text = response.choices[0].message.content.strip()
@@ -135,7 +232,7 @@ Respond in JSON format with these fields:
             }
             
         except Exception as e:
-            print(f"[WARN] Groq merge failed: {e}")
+            logger.warning("Groq merge failed; using rule-based merge", extra={"error": str(e)})
             return self._fallback_merge(
                 rating_recommendation,
                 teacher_suggestion,
@@ -180,7 +277,8 @@ Skills: {json.dumps(student_data.get('skills', {}), indent=2)}
     ) -> List[Dict[str, Any]]:
         """
         Use Groq AI to generate specific, actionable tasks based on the merged strategy.
-        Tasks are reusable for students with similar issues.
+        Tasks are reusable for students with similar issues: the task library is
+        checked first and Groq is only called when it cannot fill the plan.
         
         Args:
             merged_strategy: The merged improvement strategy
@@ -190,12 +288,22 @@ Skills: {json.dumps(student_data.get('skills', {}), indent=2)}
         Returns:
             List of task dictionaries with details
         """
+        weak_area = self._identify_weakest_area(student_data)
+        
+        library_tasks = self.task_library.serve(
+            weak_area,
+            merged_strategy.get('key_focus_areas', []),
+            num_tasks
+        )
+        if library_tasks:
+            # Serve counts (the least-served rotation) are merged periodically and at exit
+            self.task_library.save_if_due()
+            return library_tasks
+        
         if not self.groq_client:
             return self._fallback_task_list(merged_strategy, num_tasks)
         
         try:
-            weak_area = self._identify_weakest_area(student_data)
-            
             prompt = f"""You are creating a personalized improvement plan for a student.
 
 IMPROVEMENT STRATEGY:
@@ -232,21 +340,22 @@ Respond in JSON format:
 }}
 """
             
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert educational task planner. Create specific, actionable tasks. Always respond in valid JSON format."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.4,
-                max_tokens=800
-            )
+            with stage_timer("llm_call"):
+                response = self.groq_client.chat.completions.create(
+                    model="llama-3.3-70b-versatile",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are an expert educational task planner. Create specific, actionable tasks. Always respond in valid JSON format."
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=0.4,
+                    max_tokens=800
+                )
             
             result_text = response.choices[0].message.content.strip()
             
@@ -264,10 +373,14 @@ Respond in JSON format:
                 task["created_date"] = datetime.now().isoformat()
                 task["status"] = "pending"
             
+            # Keep for future students with the same weak area
+            if self.task_library.add_many(tasks, weak_area):
+                self.task_library.save()
+            
             return tasks
             
         except Exception as e:
-            print(f"[WARN] Groq task generation failed: {e}")
+            logger.warning("Groq task generation failed; using fallback tasks", extra={"error": str(e)})
             return self._fallback_task_list(merged_strategy, num_tasks)
     
     def _fallback_task_list(
@@ -314,7 +427,8 @@ Respond in JSON format:
         rating_recommendation: str,
         teacher_suggestion: str,
         weak_category: str,
-        num_tasks: int = 5
+        num_tasks: int = 5,
+        ratings: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Complete improvement plan pipeline:
@@ -328,6 +442,8 @@ Respond in JSON format:
             teacher_suggestion: Teacher input
             weak_category: Weakest area
             num_tasks: Number of tasks to generate
+            ratings: Optional compute_student_ratings result; when given, the plan
+                lists similar past students and the student is added to the index
             
         Returns:
             Complete improvement plan
@@ -348,6 +464,123 @@ Respond in JSON format:
         )
         
         # Step 3: Create complete plan
+        return self._package_plan(
+            student_data,
+            rating_recommendation,
+            teacher_suggestion,
+            weak_category,
+            merged_strategy,
+            tasks,
+            ratings
+        )
+    
+    def create_improvement_plans(
+        self,
+        plan_requests: Iterable[Dict[str, Any]],
+        num_tasks: int = 5,
+        max_concurrency: int = 4
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Pipelined batch version of create_improvement_plan.
+        
+        Up to max_concurrency students are in flight at once. As soon as a
+        student's merge finishes, its task generation is queued on the same
+        worker pool, so merges for later students overlap with task generation
+        for earlier ones. Plans are yielded in completion order, one per
+        student: a student whose merge or task generation raises gets the
+        rule-based fallback for that step instead of ending the batch.
+        
+        Args:
+            plan_requests: Dicts with the create_improvement_plan arguments
+                (student_data, rating_recommendation, teacher_suggestion,
+                weak_category and optional ratings)
+            num_tasks: Number of tasks per plan
+            max_concurrency: Maximum students (and Groq calls) in flight
+            
+        Yields:
+            Complete improvement plans as they finish
+        """
+        requests_iter = iter(plan_requests)
+        pool = ThreadPoolExecutor(max_workers=max(1, max_concurrency))
+        in_flight = {}
+        
+        def start_next() -> bool:
+            request = next(requests_iter, None)
+            if request is None:
+                return False
+            future = pool.submit(
+                self.merge_suggestions_with_groq,
+                request["rating_recommendation"],
+                request["teacher_suggestion"],
+                request["student_data"],
+                request["weak_category"]
+            )
+            in_flight[future] = ("merge", request, None)
+            return True
+        
+        try:
+            for _ in range(max(1, max_concurrency)):
+                if not start_next():
+                    break
+            
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, request, merged_strategy = in_flight.pop(future)
+                    
+                    if stage == "merge":
+                        try:
+                            merged_strategy = future.result()
+                        except Exception as e:
+                            # One student's failure must not drop the rest of the batch
+                            logger.warning("Plan merge failed; using rule-based merge", extra={
+                                "student_id": request["student_data"].get("student_id"), "error": str(e)
+                            })
+                            merged_strategy = self._fallback_merge(
+                                request["rating_recommendation"],
+                                request["teacher_suggestion"],
+                                request["weak_category"]
+                            )
+                        task_future = pool.submit(
+                            self.generate_task_list_with_groq,
+                            merged_strategy,
+                            request["student_data"],
+                            num_tasks
+                        )
+                        in_flight[task_future] = ("tasks", request, merged_strategy)
+                        continue
+                    
+                    try:
+                        tasks = future.result()
+                    except Exception as e:
+                        logger.warning("Plan task generation failed; using fallback tasks", extra={
+                            "student_id": request["student_data"].get("student_id"), "error": str(e)
+                        })
+                        tasks = self._fallback_task_list(merged_strategy, num_tasks)
+                    yield self._package_plan(
+                        request["student_data"],
+                        request["rating_recommendation"],
+                        request["teacher_suggestion"],
+                        request["weak_category"],
+                        merged_strategy,
+                        tasks,
+                        request.get("ratings")
+                    )
+                    start_next()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _package_plan(
+        self,
+        student_data: Dict[str, Any],
+        rating_recommendation: str,
+        teacher_suggestion: str,
+        weak_category: str,
+        merged_strategy: Dict[str, Any],
+        tasks: List[Dict[str, Any]],
+        ratings: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Assemble a plan and record it in the history and similarity index"""
         improvement_plan = {
             "student_id": student_data.get("student_id", "unknown"),
             "generated_date": datetime.now().isoformat(),
@@ -361,6 +594,10 @@ Respond in JSON format:
             "model_version": self.model_version
         }
         
+        if ratings is not None:
+            improvement_plan["similar_students"] = self.find_similar_students(ratings)
+            self.similarity_index.add_ratings(ratings, tasks, weak_category)
+        
         # Track history
         self.improvement_history.append({
             "student_id": student_data.get("student_id"),
@@ -371,6 +608,19 @@ Respond in JSON format:
         
         return improvement_plan
     
+    def find_similar_students(self, ratings: Dict[str, Any], k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Find past students with the most similar rating profile.
+        
+        Args:
+            ratings: compute_student_ratings result for the student
+            k: Number of similar students to return
+            
+        Returns:
+            List of similar students with distance, weak category and their tasks
+        """
+        return self.similarity_index.query_ratings(ratings, k)
+    
     def get_reusable_tasks_for_category(self, category: str) -> List[Dict[str, Any]]:
         """
         Get previously generated tasks that are reusable for a specific category.
@@ -380,16 +630,13 @@ Respond in JSON format:
             category: The performance category (e.g., "Attendance", "Exam")
             
         Returns:
-            List of reusable tasks for that category
+            List of reusable tasks generated for that weak area or addressing that category
         """
-        reusable = []
-        for plan in self.improvement_history:
-            if plan.get("weak_category") == category:
-                # In a real system, this would query a database
-                # For now, return placeholder
-                reusable.append({
-                    "note": f"Tasks for {category} from previous students",
-                    "available": True
-                })
+        reusable = self.task_library.find(weak_area=category)
+        seen = {task["task_hash"] for task in reusable}
+        
+        for task in self.task_library.find(category=category):
+            if task["task_hash"] not in seen:
+                reusable.append(task)
         
         return reusable
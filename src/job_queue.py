@@ -0,0 +1,271 @@
+"""
+Background Job Queue
+Bounded in-process worker queue for slow work (AI suggestions) with an
+optional SQLite-backed durable store
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, Callable, Optional
+
+# Minimum seconds between two prunes of the durable store
+PRUNE_INTERVAL = 60.0
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the queue already holds its maximum number of unfinished jobs"""
+
+
+class JobQueue:
+    """
+    Thread-pool job queue with a bound on unfinished jobs.
+
+    Jobs are identified by a kind (mapped to a registered handler) and a
+    JSON-serializable payload, so they can be stored in SQLite and resumed
+    after a restart. Without a database path the queue is memory-only.
+    Finished jobs are kept for retention_days and at most max_stored of them
+    in the database (max_retained in memory); older ones are pruned.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_pending: int = 100,
+        db_path: Optional[str] = None,
+        max_retained: int = 1000,
+        retention_days: Optional[float] = 7.0,
+        max_stored: Optional[int] = 100_000
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_retained = max_retained
+        self.retention_days = retention_days
+        self.max_stored = max_stored
+        self.db_path = db_path
+        self._last_prune = 0.0
+
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._unfinished = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-queue")
+
+        if db_path:
+            self._init_db()
+
+    # ---- Persistence ----
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_updated ON jobs (status, updated_at)")
+        self.prune()
+
+    def prune(self) -> int:
+        """
+        Delete finished jobs older than retention_days, then the oldest
+        finished jobs beyond max_stored, from the durable store.
+
+        Returns:
+            Number of jobs deleted
+        """
+        if not self.db_path:
+            return 0
+        self._last_prune = time.monotonic()
+        deleted = 0
+        with self._connect() as conn:
+            if self.retention_days is not None:
+                cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+                deleted += conn.execute(
+                    "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < ?",
+                    (cutoff,)
+                ).rowcount
+            if self.max_stored is not None:
+                deleted += conn.execute(
+                    """DELETE FROM jobs WHERE id IN (
+                        SELECT id FROM jobs WHERE status IN ('completed', 'failed')
+                        ORDER BY updated_at DESC LIMIT -1 OFFSET ?
+                    )""",
+                    (self.max_stored,)
+                ).rowcount
+        return deleted
+
+    def _persist(self, job: Dict[str, Any]):
+        if not self.db_path:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job["id"], job["kind"], job["status"], json.dumps(job["payload"]),
+                    json.dumps(job["result"]), job["error"],
+                    job["created_at"], job["updated_at"]
+                )
+            )
+
+    def _load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if not self.db_path:
+            return None
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0], "kind": row[1], "status": row[2], "payload": json.loads(row[3]),
+            "result": json.loads(row[4]) if row[4] else None, "error": row[5],
+            "created_at": row[6], "updated_at": row[7]
+        }
+
+    # ---- Jobs ----
+
+    def register_handler(self, kind: str, handler: Callable[[Dict[str, Any]], Any]):
+        """Register the function that runs jobs of a given kind"""
+        self._handlers[kind] = handler
+
+    def resume(self) -> int:
+        """
+        Re-enqueue jobs left pending or running in the durable store
+        (e.g. after a restart). Call once all handlers are registered.
+
+        Returns:
+            Number of jobs resumed
+        """
+        if not self.db_path:
+            return 0
+        with self._connect() as conn:
+            ids = [row[0] for row in conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('pending', 'running') ORDER BY created_at"
+            )]
+
+        for job_id in ids:
+            job = self._load(job_id)
+            job["status"] = "pending"
+            with self._lock:
+                self._jobs[job_id] = job
+                self._unfinished += 1
+            self._executor.submit(self._run, job_id)
+        return len(ids)
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Enqueue a job.
+
+        Args:
+            kind: Registered handler name
+            payload: JSON-serializable handler input
+
+        Returns:
+            Job record (id, status, timestamps)
+
+        Raises:
+            QueueFullError: If max_pending jobs are already unfinished
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+
+        now = datetime.now().isoformat()
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "pending",
+            "payload": payload,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now
+        }
+
+        with self._lock:
+            if self._unfinished >= self.max_pending:
+                raise QueueFullError(f"Job queue full ({self.max_pending} unfinished jobs)")
+            self._unfinished += 1
+            self._jobs[job["id"]] = job
+            self._trim_locked()
+
+        public = self._public(job)
+        self._persist(job)
+        self._executor.submit(self._run, job["id"])
+        return public
+
+    def _run(self, job_id: str):
+        """Worker entry point: run one job and record its outcome"""
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = "running"
+            job["updated_at"] = datetime.now().isoformat()
+        self._persist(job)
+
+        try:
+            result = self._handlers[job["kind"]](job["payload"])
+            status, error = "completed", None
+        except Exception as e:
+            result, status, error = None, "failed", str(e)
+
+        with self._lock:
+            job.update({
+                "status": status,
+                "result": result,
+                "error": error,
+                "updated_at": datetime.now().isoformat()
+            })
+            self._unfinished -= 1
+        self._persist(job)
+        if self.db_path and time.monotonic() - self._last_prune >= PRUNE_INTERVAL:
+            self.prune()
+
+    def _trim_locked(self):
+        """Forget the oldest finished jobs beyond max_retained (caller holds the lock)"""
+        excess = len(self._jobs) - self.max_retained
+        if excess <= 0:
+            return
+        for job_id in [jid for jid, j in self._jobs.items()
+                       if j["status"] in ("completed", "failed")][:excess]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Job record without the (possibly large) payload"""
+        return {k: v for k, v in job.items() if k != "payload"}
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a job by id (memory first, then the durable store)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return self._public(dict(job))
+        job = self._load(job_id)
+        return self._public(job) if job else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and limits"""
+        with self._lock:
+            return {
+                "unfinished": self._unfinished,
+                "max_pending": self.max_pending,
+                "max_workers": self.max_workers,
+                "durable": bool(self.db_path)
+            }
+
+    def shutdown(self, wait: bool = False):
+        """Stop the worker pool; durable unfinished jobs resume on next start"""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
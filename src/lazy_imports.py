@@ -0,0 +1,38 @@
+"""
+Lazy Imports
+Defer loading heavy optional dependencies until they are first used
+"""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Return a module whose code runs on first attribute access.
+
+    Use for heavy dependencies (plotly, pandas, scikit-learn) that only some
+    features need, so processes that never touch them skip the import cost.
+    Note that `mod.Attr` in annotations or default values is evaluated at
+    definition time and would trigger the load; quote such annotations.
+
+    Args:
+        name: Absolute module name, e.g. "plotly.express"
+
+    Returns:
+        The (possibly not yet executed) module object
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'")
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
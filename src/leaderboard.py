@@ -0,0 +1,207 @@
+"""
+Student Leaderboard
+Maintained ranking index over computed student ratings
+"""
+
+import bisect
+import threading
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+
+class StudentLeaderboard:
+    """
+    FIFA-style leaderboard kept in sorted order as ratings arrive.
+
+    Every student holds one entry (their latest overall rating). Entries are
+    stored in ascending order so rank, percentile and top-k lookups are
+    bisect-based instead of re-sorting the whole cohort on each query.
+    """
+
+    def __init__(self):
+        # Parallel sorted arrays: (rating, student_id) keys and bare ratings
+        self._keys: List[Tuple[float, str]] = []
+        self._ratings: List[float] = []
+        self._latest: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_history(cls, prediction_history: Iterable[Dict[str, Any]]) -> "StudentLeaderboard":
+        """
+        Build a leaderboard from stored rating results (oldest first).
+
+        Args:
+            prediction_history: Results produced by compute_student_ratings
+
+        Returns:
+            Leaderboard holding the latest rating per student
+        """
+        board = cls()
+        for result in prediction_history:
+            board.update(result)
+        return board
+
+    def __len__(self) -> int:
+        return len(self._ratings)
+
+    def __contains__(self, student_id: str) -> bool:
+        return str(student_id) in self._latest
+
+    def update(self, ratings_dict: Dict[str, Any]):
+        """Insert or replace a student using a compute_student_ratings result"""
+        self.add(ratings_dict.get("student_id", "unknown"), ratings_dict["overall_rating"])
+
+    def add(self, student_id: str, rating: float):
+        """
+        Insert or replace the rating for a student.
+
+        Args:
+            student_id: Student identifier
+            rating: Overall rating (1-100)
+        """
+        student_id = str(student_id)
+        rating = float(rating)
+
+        with self._lock:
+            if student_id in self._latest:
+                self._remove_locked(student_id)
+
+            key = (rating, student_id)
+            pos = bisect.bisect_left(self._keys, key)
+            self._keys.insert(pos, key)
+            self._ratings.insert(pos, rating)
+            self._latest[student_id] = rating
+
+    def remove(self, student_id: str) -> bool:
+        """Remove a student from the leaderboard, returns False if absent"""
+        student_id = str(student_id)
+        with self._lock:
+            if student_id not in self._latest:
+                return False
+            self._remove_locked(student_id)
+            return True
+
+    def _remove_locked(self, student_id: str):
+        """Drop the stored entry for a student (caller holds the lock)"""
+        key = (self._latest.pop(student_id), student_id)
+        pos = bisect.bisect_left(self._keys, key)
+        del self._keys[pos]
+        del self._ratings[pos]
+
+    def rank_of_rating(self, rating: float) -> int:
+        """Rank (1 = best) a given rating would hold; ties share a rank"""
+        return len(self._ratings) - bisect.bisect_right(self._ratings, float(rating)) + 1
+
+    def percentile_of_rating(self, rating: float) -> float:
+        """
+        Percentile rank of a rating within the leaderboard (0-100).
+        Students below count fully, students tied count as half.
+        """
+        n = len(self._ratings)
+        if n == 0:
+            return 0.0
+        rating = float(rating)
+        below = bisect.bisect_left(self._ratings, rating)
+        tied = bisect.bisect_right(self._ratings, rating) - below
+        return round((below + 0.5 * tied) / n * 100, 2)
+
+    def get(self, student_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a student's standing.
+
+        Returns:
+            Dictionary with rank, percentile and rating, or None if unknown
+        """
+        student_id = str(student_id)
+        with self._lock:
+            rating = self._latest.get(student_id)
+            if rating is None:
+                return None
+            return {
+                "student_id": student_id,
+                "overall_rating": rating,
+                "rank": self.rank_of_rating(rating),
+                "percentile": self.percentile_of_rating(rating),
+                "total_students": len(self._ratings)
+            }
+
+    def top_k(self, k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Best k students, highest rating first.
+
+        Args:
+            k: Number of entries to return
+
+        Returns:
+            List of leaderboard entries with rank and percentile
+        """
+        with self._lock:
+            k = max(0, min(int(k), len(self._keys)))
+            leaders = []
+            for rating, student_id in reversed(self._keys[len(self._keys) - k:]):
+                leaders.append({
+                    "rank": self.rank_of_rating(rating),
+                    "student_id": student_id,
+                    "overall_rating": rating,
+                    "percentile": self.percentile_of_rating(rating)
+                })
+            return leaders
+
+    def ratings(self) -> List[float]:
+        """Snapshot of all current ratings, ascending"""
+        with self._lock:
+            return list(self._ratings)
+
+
+class SchemaLeaderboards:
+    """
+    One StudentLeaderboard per rating schema.
+
+    Schemas weigh different categories, so their ratings are not comparable
+    and are ranked separately. Results without a "schema" field were rated
+    with the default schema.
+    """
+
+    def __init__(self, default: str = "default"):
+        """
+        Args:
+            default: Name of the schema results without a "schema" field belong to
+        """
+        self.default = default
+        self._boards: Dict[str, StudentLeaderboard] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_history(cls, prediction_history: Iterable[Dict[str, Any]],
+                     default: str = "default") -> "SchemaLeaderboards":
+        """
+        Build per-schema leaderboards from stored rating results (oldest first).
+
+        Args:
+            prediction_history: Results produced by compute_student_ratings
+            default: Name of the default schema
+
+        Returns:
+            SchemaLeaderboards holding the latest rating per student and schema
+        """
+        boards = cls(default)
+        for result in prediction_history:
+            boards.update(result)
+        return boards
+
+    def board(self, schema: Optional[str] = None) -> StudentLeaderboard:
+        """Leaderboard of one schema (the default if None), created on first use"""
+        name = schema or self.default
+        with self._lock:
+            board = self._boards.get(name)
+            if board is None:
+                board = self._boards[name] = StudentLeaderboard()
+            return board
+
+    def update(self, ratings_dict: Dict[str, Any]):
+        """Insert or replace a student on the leaderboard of the result's schema"""
+        self.board(ratings_dict.get("schema")).update(ratings_dict)
+
+    def names(self) -> List[str]:
+        """Schemas that have a leaderboard"""
+        with self._lock:
+            return sorted(self._boards)
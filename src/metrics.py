@@ -0,0 +1,207 @@
+"""
+Service Metrics
+Per-stage timing histograms rendered in the Prometheus text exposition format
+
+Set STUDENT_RATING_METRICS=0 to disable: timers then cost nothing (decorated
+functions are left unwrapped) and /metrics reports no samples.
+"""
+
+import os
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+# Seconds; spans sub-millisecond rating math up to multi-second LLM calls
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+ENABLED = os.environ.get("STUDENT_RATING_METRICS", "1").lower() not in ("0", "false", "off", "no")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram keyed by label values.
+
+    observe() is one bisect plus three increments under a lock, cheap enough
+    for per-request hot paths.
+    """
+
+    def __init__(self, name: str, documentation: str,
+                 labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str):
+        """Record one observation for the given label values"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Dict[str, Any]]:
+        """Per-series cumulative bucket counts, sum and count"""
+        with self._lock:
+            copied = {k: (list(v[0]), v[1]) for k, v in self._series.items()}
+
+        result = {}
+        for labelvalues, (counts, total) in copied.items():
+            cumulative, running = [], 0
+            for count in counts:
+                running += count
+                cumulative.append(running)
+            result[labelvalues] = {"buckets": cumulative, "sum": total, "count": running}
+        return result
+
+    def render(self) -> List[str]:
+        """Prometheus text exposition lines"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram"
+        ]
+        bounds = self.buckets + (float("inf"),)
+        for labelvalues, series in sorted(self.snapshot().items()):
+            labels = [f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, labelvalues)]
+            for bound, count in zip(bounds, series["buckets"]):
+                bucket_labels = ",".join(labels + [f'le="{_format_value(bound)}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {count}")
+            suffix = "{" + ",".join(labels) + "}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{suffix} {series['count']}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """Named histograms rendered together for the /metrics endpoint"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, documentation: str,
+                  labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, documentation, labelnames, buckets)
+            return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Clear all recorded samples (metrics stay registered)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "student_rating_stage_seconds",
+    "Time spent in each pipeline stage",
+    labelnames=("stage",)
+)
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "student_rating_http_request_seconds",
+    "API request duration until the response starts",
+    labelnames=("method", "route", "status")
+)
+
+
+@contextmanager
+def _timer(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage)
+
+
+_NOOP = nullcontext()
+
+
+def stage_timer(stage: str):
+    """
+    Context manager recording the block's duration under `stage`.
+
+    Stages: csv_parse, aggregation, rating, recommendation, llm_call,
+    persistence.
+    """
+    return _timer(stage) if ENABLED else _NOOP
+
+
+def timed(stage: str):
+    """Decorator form of stage_timer (returns the function untouched when disabled)"""
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - start, stage)
+        return wrapper
+    return decorator
+
+
+def observe_request(method: str, route: str, status: int, seconds: float):
+    """Record one API request (no-op when metrics are disabled)"""
+    if ENABLED:
+        HTTP_REQUEST_SECONDS.observe(seconds, method, route, str(status))
+
+
+def get_stage_summary(stage: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """Count, total and mean seconds per stage (for JSON health/debug output)"""
+    summary = {}
+    for (name,), series in STAGE_SECONDS.snapshot().items():
+        if stage is not None and name != stage:
+            continue
+        count = series["count"]
+        summary[name] = {
+            "count": count,
+            "total_seconds": round(series["sum"], 6),
+            "mean_ms": round(series["sum"] / count * 1000, 4) if count else 0.0
+        }
+    return summary
@@ -0,0 +1,307 @@
+"""
+Model Artifacts
+Versioned on-disk model format: a JSON manifest plus one NumPy .npy file per
+array, loaded memory-mapped so processes share the same physical pages
+"""
+
+import os
+import json
+import hashlib
+import pickle
+import shutil
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+ARTIFACT_FORMAT = "student-rating-artifact"
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "models")
+
+
+class ArtifactError(ValueError):
+    """Raised when an artifact is missing, of an unknown format or corrupted"""
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _content_hash(state: Dict[str, Any], array_entries: Dict[str, Dict[str, Any]]) -> str:
+    """Hash over the state and the per-array hashes (identifies the whole artifact)"""
+    digest = hashlib.sha256(json.dumps(state, sort_keys=True, default=str).encode("utf-8"))
+    for key in sorted(array_entries):
+        digest.update(f"{key}:{array_entries[key]['sha256']}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ModelArtifact:
+    """A loaded artifact: manifest header, plain-data state and named arrays"""
+
+    def __init__(self, path: str, manifest: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        self.path = path
+        self.manifest = manifest
+        self.arrays = arrays
+
+    @property
+    def name(self) -> str:
+        return self.manifest["name"]
+
+    @property
+    def model_version(self) -> str:
+        return self.manifest["model_version"]
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        return self.manifest["state"]
+
+    @property
+    def content_hash(self) -> str:
+        return self.manifest["content_hash"]
+
+
+def save_artifact(
+    path: str,
+    name: str,
+    model_version: str,
+    state: Optional[Dict[str, Any]] = None,
+    arrays: Optional[Dict[str, np.ndarray]] = None
+) -> Dict[str, Any]:
+    """
+    Write a model artifact directory (replaces an existing one atomically).
+
+    Args:
+        path: Artifact directory, e.g. models/student_scoring_model
+        name: Model name
+        model_version: Version of the model code that produced it
+        state: JSON-serializable scalars, lists and dicts
+        arrays: Named NumPy arrays, each stored as <name>.npy
+
+    Returns:
+        The manifest that was written
+    """
+    state = state or {}
+    arrays = arrays or {}
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    entries = {}
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype == object:
+            raise ArtifactError(f"Array '{key}' has dtype object; store it in state instead")
+        filename = f"{key}.npy"
+        np.save(os.path.join(tmp_path, filename), array, allow_pickle=False)
+        entries[key] = {
+            "file": filename,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "sha256": _sha256_file(os.path.join(tmp_path, filename))
+        }
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "name": name,
+        "model_version": model_version,
+        "created_at": datetime.now().isoformat(),
+        "content_hash": _content_hash(state, entries),
+        "arrays": entries,
+        "state": state
+    }
+    with open(os.path.join(tmp_path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, default=str)
+
+    # Swap directories: the old artifact stays readable until the new one is complete
+    old_path = f"{path}.old"
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return manifest
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """Read and check an artifact manifest without touching the arrays"""
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise ArtifactError(f"No model artifact at {path}")
+
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ArtifactError(f"{path} is not a model artifact")
+    if manifest.get("format_version", 0) > ARTIFACT_FORMAT_VERSION:
+        raise ArtifactError(
+            f"Artifact format v{manifest['format_version']} is newer than supported "
+            f"v{ARTIFACT_FORMAT_VERSION}"
+        )
+    return manifest
+
+
+def load_artifact(path: str, mmap: bool = True, verify: bool = False) -> ModelArtifact:
+    """
+    Load a model artifact.
+
+    Args:
+        path: Artifact directory
+        mmap: Memory-map arrays read-only instead of reading them into memory
+        verify: Check every array file against its recorded sha256
+
+    Returns:
+        ModelArtifact
+
+    Raises:
+        ArtifactError: If the artifact is missing, unsupported or corrupted
+    """
+    manifest = read_manifest(path)
+    if verify:
+        verify_artifact(path, manifest)
+
+    arrays = {}
+    for key, entry in manifest["arrays"].items():
+        array = np.load(
+            os.path.join(path, entry["file"]),
+            mmap_mode="r" if mmap else None,
+            allow_pickle=False
+        )
+        if list(array.shape) != entry["shape"] or array.dtype.str != entry["dtype"]:
+            raise ArtifactError(f"Array '{key}' in {path} does not match its manifest entry")
+        arrays[key] = array
+    return ModelArtifact(path, manifest, arrays)
+
+
+def verify_artifact(path: str, manifest: Optional[Dict[str, Any]] = None):
+    """Raise ArtifactError if any array file or the content hash does not match"""
+    manifest = manifest or read_manifest(path)
+    for key, entry in manifest["arrays"].items():
+        if _sha256_file(os.path.join(path, entry["file"])) != entry["sha256"]:
+            raise ArtifactError(f"Array '{key}' in {path} is corrupted (sha256 mismatch)")
+    if _content_hash(manifest["state"], manifest["arrays"]) != manifest["content_hash"]:
+        raise ArtifactError(f"Artifact {path} content hash mismatch")
+
+
+def load_model(model_cls, models_dir: str = MODELS_DIR):
+    """
+    Load a model for serving: versioned artifact first, legacy pickle as fallback.
+
+    Args:
+        model_cls: Model class with ARTIFACT_NAME and from_artifact; the
+            artifact is <models_dir>/<ARTIFACT_NAME>/, the pickle
+            <models_dir>/<ARTIFACT_NAME>.pkl
+        models_dir: Directory holding the saved models
+
+    Returns:
+        The loaded model, or None if neither file exists
+    """
+    artifact_path = os.path.join(models_dir, model_cls.ARTIFACT_NAME)
+    pickle_path = f"{artifact_path}.pkl"
+    if os.path.isdir(artifact_path):
+        try:
+            model = model_cls.from_artifact(artifact_path)
+            logger.info("Model artifact loaded", extra={"path": artifact_path, "version": model.model_version})
+            return model
+        except ArtifactError as e:
+            logger.warning("Could not load model artifact; trying pickle", extra={"path": artifact_path, "error": str(e)})
+    if os.path.exists(pickle_path):
+        with open(pickle_path, "rb") as f:
+            model = pickle.load(f)
+        logger.info("Model pickle loaded", extra={"path": pickle_path, "version": model.model_version})
+        return model
+    return None
+
+
+# ---- Random forests as flat arrays ----
+
+def forest_to_arrays(forest, prefix: str) -> Dict[str, np.ndarray]:
+    """
+    Flatten a fitted scikit-learn random forest into node arrays.
+
+    All trees are concatenated; <prefix>_roots holds each tree's first node
+    and child indices are global (-1 marks a leaf).
+    """
+    trees = [estimator.tree_ for estimator in forest.estimators_]
+    sizes = np.array([tree.node_count for tree in trees])
+    roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+
+    def children(attr):
+        return np.concatenate([
+            np.where(getattr(tree, attr) < 0, -1, getattr(tree, attr) + root)
+            for tree, root in zip(trees, roots)
+        ]).astype(np.int64)
+
+    values = np.concatenate([tree.value[:, 0, :] for tree in trees]).astype(np.float64)
+    return {
+        f"{prefix}_roots": roots,
+        f"{prefix}_left": children("children_left"),
+        f"{prefix}_right": children("children_right"),
+        f"{prefix}_feature": np.concatenate([tree.feature for tree in trees]).astype(np.int64),
+        f"{prefix}_threshold": np.concatenate([tree.threshold for tree in trees]).astype(np.float64),
+        f"{prefix}_value": values
+    }
+
+
+class ForestEvaluator:
+    """
+    NumPy evaluation of a forest exported by forest_to_arrays.
+
+    Provides the predict / predict_proba interface the prediction model uses,
+    without importing scikit-learn or materializing estimator objects.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], prefix: str, classes=None):
+        self.roots = arrays[f"{prefix}_roots"]
+        self.left = arrays[f"{prefix}_left"]
+        self.right = arrays[f"{prefix}_right"]
+        self.feature = arrays[f"{prefix}_feature"]
+        self.threshold = arrays[f"{prefix}_threshold"]
+        self.value = arrays[f"{prefix}_value"]
+        self.classes_ = None if classes is None else np.asarray(classes)
+
+    def _leaves(self, X) -> np.ndarray:
+        """Leaf node reached in every tree, shape (n_samples, n_trees)"""
+        # scikit-learn compares float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        while True:
+            left = self.left[node]
+            internal = left >= 0
+            if not internal.any():
+                return node
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(internal, np.where(go_left, left, self.right[node]), node)
+
+    def predict(self, X) -> np.ndarray:
+        """Mean leaf value over trees (regression)"""
+        return self.value[self._leaves(X), 0].mean(axis=1)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Mean normalized class distribution over trees (classification)"""
+        dist = self.value[self._leaves(X)]
+        dist = dist / dist.sum(axis=2, keepdims=True)
+        return dist.mean(axis=1)
+
+
+class ArrayScaler:
+    """StandardScaler.transform from stored mean_ / scale_ arrays"""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
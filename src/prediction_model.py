@@ -10,26 +10,31 @@ import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Tuple
-from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error, r2_score
-from sklearn.preprocessing import StandardScaler
 import json
 
+from model_artifacts import (
+    save_artifact, load_artifact, forest_to_arrays, ForestEvaluator, ArrayScaler
+)
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
 
 class StudentPredictionModel:
     """
     Predicts student improvement across multiple timelines
     """
     
+    ARTIFACT_NAME = "student_prediction_model"
+    
     def __init__(self):
         self.model_version = "1.0"
         self.created_date = "2025-12-09"
         
-        # ML models
-        self.classifier = RandomForestClassifier(n_estimators=150, random_state=42)
-        self.regressor = RandomForestRegressor(n_estimators=150, random_state=42)
-        self.scaler = StandardScaler()
+        # ML models (scikit-learn is imported when training first needs them)
+        self.classifier = None
+        self.regressor = None
+        self.scaler = None
         self.feature_cols = None
         self.is_trained = False
         
@@ -43,6 +48,60 @@ class StudentPredictionModel:
             '1y': 1.0
         }
     
+    def _init_estimators(self):
+        """Fresh (unfitted) scikit-learn estimators"""
+        from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
+        from sklearn.preprocessing import StandardScaler
+        
+        self.classifier = RandomForestClassifier(n_estimators=150, random_state=42)
+        self.regressor = RandomForestRegressor(n_estimators=150, random_state=42)
+        self.scaler = StandardScaler()
+    
+    def to_artifact(self, path: str) -> Dict[str, Any]:
+        """
+        Save as a model artifact directory
+        
+        A trained model's forests are stored as flat node arrays and the
+        scaler as mean/scale arrays; no estimator objects are pickled.
+        """
+        state = {
+            "created_date": self.created_date,
+            "is_trained": self.is_trained,
+            "feature_cols": self.feature_cols,
+            "timeline_multipliers": self.timeline_multipliers
+        }
+        arrays = {}
+        if self.is_trained:
+            state["classes"] = np.asarray(self.classifier.classes_).tolist()
+            arrays.update(forest_to_arrays(self.classifier, "classifier"))
+            arrays.update(forest_to_arrays(self.regressor, "regressor"))
+            arrays["scaler_mean"] = self.scaler.mean_
+            arrays["scaler_scale"] = self.scaler.scale_
+        return save_artifact(path, self.ARTIFACT_NAME, self.model_version, state, arrays)
+    
+    @classmethod
+    def from_artifact(cls, path: str) -> "StudentPredictionModel":
+        """
+        Load a model saved with to_artifact
+        
+        Forests are evaluated directly from the memory-mapped arrays. Calling
+        train_model afterwards trains fresh scikit-learn estimators.
+        """
+        artifact = load_artifact(path)
+        state = artifact.state
+        model = cls()
+        model.model_version = artifact.model_version
+        model.created_date = state.get("created_date", model.created_date)
+        model.feature_cols = state.get("feature_cols")
+        model.timeline_multipliers = state.get("timeline_multipliers", model.timeline_multipliers)
+        
+        if state.get("is_trained"):
+            model.classifier = ForestEvaluator(artifact.arrays, "classifier", state["classes"])
+            model.regressor = ForestEvaluator(artifact.arrays, "regressor")
+            model.scaler = ArrayScaler(artifact.arrays["scaler_mean"], artifact.arrays["scaler_scale"])
+            model.is_trained = True
+        return model
+    
     @staticmethod
     def normalize_attributes(df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
         """Normalize attribute columns to 0-1 scale"""
@@ -217,13 +276,17 @@ class StudentPredictionModel:
         
         self.feature_cols = feature_columns
         
+        # Not created yet, or loaded from an artifact (evaluate-only)
+        if self.classifier is None or not hasattr(self.classifier, "fit"):
+            self._init_estimators()
+        
         # Scale and train
         X_scaled = self.scaler.fit_transform(X)
         self.classifier.fit(X_scaled, y_clf)
         self.regressor.fit(X_scaled, y_reg)
         
         self.is_trained = True
-        print(f"[OK] Model trained on {len(df)} samples")
+        logger.info("Prediction model trained", extra={"samples": len(df)})
     
     def predict_timeline(
         self,
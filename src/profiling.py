@@ -0,0 +1,184 @@
+"""
+Request Profiling
+Opt-in cProfile sessions for a single request or analysis run, saved as
+.prof files (pstats / snakeviz) and summarized as plain data
+"""
+
+import os
+import hmac
+import uuid
+import cProfile
+import pstats
+import threading
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from typing import Dict, Any, List, Optional
+
+PROFILE_DIR = os.environ.get("STUDENT_RATING_PROFILE_DIR", "profiles")
+
+# Profiling is only available to callers presenting this token
+ADMIN_TOKEN_ENV = "STUDENT_RATING_ADMIN_TOKEN"
+
+_current: ContextVar[Optional["ProfileSession"]] = ContextVar("profile_session", default=None)
+
+
+def profiling_available() -> bool:
+    """True if an admin token is configured (profiling is off otherwise)"""
+    return bool(os.environ.get(ADMIN_TOKEN_ENV))
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    """Check a caller-supplied token against the configured admin token"""
+    expected = os.environ.get(ADMIN_TOKEN_ENV)
+    if not expected or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), expected.encode("utf-8"))
+
+
+class ProfileSession:
+    """
+    One profiled request.
+
+    cProfile only sees the thread it is enabled in, so every thread that does
+    work for the request (threadpool workers, and the calling thread when
+    include_caller is set) gets its own profiler via profile_thread(); they
+    are merged when the session is saved.
+    """
+
+    def __init__(self, label: str, directory: Optional[str] = None, include_caller: bool = True):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.directory = directory or PROFILE_DIR
+        self.include_caller = include_caller
+        self.path: Optional[str] = None
+        self._profiles: List[cProfile.Profile] = []
+        self._active_threads = set()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def profile_thread(self):
+        """Profile the calling thread for the duration of the block"""
+        thread_id = threading.get_ident()
+        with self._lock:
+            nested = thread_id in self._active_threads
+            self._active_threads.add(thread_id)
+        if nested:
+            yield
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler already owns this thread
+            profiler = None
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            with self._lock:
+                self._active_threads.discard(thread_id)
+                if profiler is not None:
+                    self._profiles.append(profiler)
+
+    def _stats(self) -> Optional[pstats.Stats]:
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def save(self) -> Optional[str]:
+        """Write the merged profile to <directory>/<time>_<label>_<id>.prof"""
+        stats = self._stats()
+        if stats is None:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        safe_label = "".join(c if c.isalnum() else "_" for c in self.label).strip("_")
+        filename = f"{datetime.now():%Y%m%d_%H%M%S}_{safe_label}_{self.id}.prof"
+        self.path = os.path.join(self.directory, filename)
+        stats.dump_stats(self.path)
+        return self.path
+
+    def summary(self, top: int = 15) -> Dict[str, Any]:
+        """
+        Hot spots by cumulative time.
+
+        Returns:
+            Dictionary with id, label, saved file name, which threads were
+            profiled, total profiled seconds and the `top` functions (calls,
+            own and cumulative time)
+        """
+        stats = self._stats()
+        result = {
+            "id": self.id,
+            "label": self.label,
+            "file": os.path.basename(self.path) if self.path else None,
+            "scope": "caller and worker threads" if self.include_caller else "worker threads only",
+            "total_seconds": 0.0,
+            "top": []
+        }
+        if stats is None:
+            return result
+
+        result["total_seconds"] = round(stats.total_tt, 6)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        for (filename, line, func), (_, calls, own, cumulative, _) in rows[:top]:
+            where = func if filename == "~" else f"{os.path.basename(filename)}:{line}({func})"
+            result["top"].append({
+                "function": where,
+                "calls": calls,
+                "own_seconds": round(own, 6),
+                "cumulative_seconds": round(cumulative, 6)
+            })
+        return result
+
+
+@contextmanager
+def profile_session(label: str, directory: Optional[str] = None, include_caller: bool = True):
+    """
+    Profile a block and everything it hands to profiled() callables.
+
+    The session is saved when the block exits; read session.summary() after.
+
+    Args:
+        label: Name for the saved profile
+        directory: Where to save it (default PROFILE_DIR)
+        include_caller: Also profile the calling thread. Leave off on an
+            event-loop thread: it runs other requests' coroutines meanwhile,
+            which would be recorded as this block's work
+    """
+    session = ProfileSession(label, directory, include_caller)
+    token = _current.set(session)
+    try:
+        with session.profile_thread() if include_caller else nullcontext():
+            yield session
+    finally:
+        _current.reset(token)
+        session.save()
+
+
+def current_session() -> Optional[ProfileSession]:
+    return _current.get()
+
+
+def profiled(func):
+    """
+    Wrap a function that runs in a worker thread so it joins the profile of
+    the request that submitted it (no-op when no session is active).
+    Context variables follow the work into the threadpool.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        session = _current.get()
+        if session is None:
+            return func(*args, **kwargs)
+        with session.profile_thread():
+            return func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,426 @@
+"""
+Rating Schema
+Declarative description of how a school rates students (categories, input
+ranges, weights, focus areas, class-focus formula), compiled once into flat
+arrays for fast evaluation
+
+A schema is a JSON (or YAML, if PyYAML is installed) document:
+
+    {
+        "name": "riverside",
+        "categories": [
+            {"key": "attendance", "label": "Attendance", "range": [0, 100], "weight": 0.3, "default": 80},
+            {"key": "exam", "label": "Exam", "range": [0, 50], "weight": 0.5, "default": 30},
+            {"key": "skills", "label": "Skills", "range": [1, 5], "weight": 0.2, "default": 3,
+             "inputs": ["teamwork", "creativity"]}
+        ],
+        "focus_areas": [
+            {"name": "Attendance", "categories": ["attendance"], "recommendation": "..."},
+            ...
+        ],
+        "class_focus": {"exam": 0.45, "attendance": 0.25, "homework": 0.15, "classwork": 0.15}
+    }
+
+Categories with "inputs" are groups: the student record holds a dict of
+sub-scores under the key and the category score is their mean. Focus areas
+(optional) drive weakest-area recommendations; by default each category is
+its own area.
+"""
+
+import json
+import os
+import threading
+from types import MappingProxyType
+from typing import Dict, Any, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+SCHEMA_DIR = os.environ.get("STUDENT_RATING_SCHEMA_DIR", "schemas")
+
+# Sum of category weights may be off by this much (hand-written decimals)
+WEIGHT_TOLERANCE = 1e-6
+
+# Integer domains up to this many values get a normalization lookup table
+MAX_TABLE_SIZE = 1001
+
+_tables: Dict[Tuple[float, float], Tuple[np.ndarray, List[float]]] = {}
+
+
+def normalize_formula(val, vmin, vmax):
+    """Affine map to the 1-100 scale with clipping (scalars or arrays)"""
+    return np.clip(1.0 + 99.0 * (val - vmin) / (vmax - vmin + 1e-9), 1.0, 100.0)
+
+
+def normalize_table(vmin: float, vmax: float) -> Optional[Tuple[np.ndarray, List[float]]]:
+    """
+    Normalized score of every integer in [vmin, vmax], computed once per domain
+
+    Returns:
+        (array, list of floats) for integer domains of up to MAX_TABLE_SIZE
+        values, None otherwise
+    """
+    tables = _tables.get((vmin, vmax))
+    if tables is None:
+        if not (float(vmin).is_integer() and float(vmax).is_integer()) or vmax - vmin >= MAX_TABLE_SIZE:
+            return None
+        array = normalize_formula(np.arange(vmin, vmax + 1, dtype=float), vmin, vmax)
+        tables = _tables.setdefault((vmin, vmax), (array, array.tolist()))
+    return tables
+
+
+class Category(NamedTuple):
+    """One rated category; `inputs` is non-empty for grouped sub-scores"""
+    key: str
+    label: str
+    vmin: float
+    vmax: float
+    weight: float
+    default: Any
+    inputs: Tuple[str, ...]
+
+
+class FocusArea(NamedTuple):
+    """Categories averaged for weakest-area detection, with their advice"""
+    name: str
+    categories: Tuple[str, ...]
+    recommendation: str
+
+
+DEFAULT_SPEC = {
+    "name": "default",
+    "description": "Standard FIFA-style student rating",
+    "categories": [
+        {"key": "attendance", "label": "Attendance", "range": [0, 100], "weight": 0.2, "default": 80},
+        {"key": "homework", "label": "Homework", "range": [1, 10], "weight": 0.15, "default": 7},
+        {"key": "classwork", "label": "Classwork", "range": [1, 10], "weight": 0.1, "default": 7},
+        {"key": "class_focus", "label": "Class Focus", "range": [0, 100], "weight": 0.15, "default": 70},
+        {"key": "exam", "label": "Exam", "range": [0, 100], "weight": 0.25, "default": 65},
+        {"key": "skills", "label": "Skills", "range": [1, 10], "weight": 0.15, "default": 7,
+         "inputs": ["problem_solving", "communication", "discipline"]}
+    ],
+    "focus_areas": [
+        {"name": "Attendance", "categories": ["attendance"],
+         "recommendation": "Improve class presence; track absences and ensure punctuality."},
+        {"name": "Homework/Classwork", "categories": ["homework", "classwork"],
+         "recommendation": "Submit homework & classwork on time; improve quality and consistency."},
+        {"name": "Class Focus", "categories": ["class_focus"],
+         "recommendation": "Increase concentration in class; use short quizzes and active participation."},
+        {"name": "Exam", "categories": ["exam"],
+         "recommendation": "Practice exam strategy, time management, and answer organization."},
+        {"name": "Skills", "categories": ["skills"],
+         "recommendation": "Enhance key skills through practice, presentations, and problem-solving drills."}
+    ],
+    # Class focus % from report cards: components are percentages (HW/CW 1-10 scaled x10)
+    "class_focus": {"exam": 0.45, "attendance": 0.25, "homework": 0.15, "classwork": 0.15}
+}
+
+CLASS_FOCUS_COMPONENTS = ("exam", "attendance", "homework", "classwork")
+
+
+class RatingSchema:
+    """
+    A validated, compiled rating schema.
+
+    Compilation flattens the categories into per-column arrays (one column per
+    scalar input, one per sub-score of a group): min/max bounds, defaults and
+    the owning category, plus a weight vector over categories and a
+    category-to-focus-area indicator matrix. Evaluation is then pure array
+    arithmetic, and a compiled schema can be shared freely between threads.
+    """
+
+    def __init__(self, name: str, categories: Iterable[Category],
+                 focus_areas: Optional[Iterable[FocusArea]] = None,
+                 class_focus: Optional[Mapping[str, float]] = None,
+                 description: str = ""):
+        self.name = name
+        self.description = description
+        self.categories = tuple(categories)
+        if not self.categories:
+            raise ValueError(f"Schema '{name}' has no categories")
+
+        self.keys = tuple(c.key for c in self.categories)
+        if len(set(self.keys)) != len(self.keys):
+            raise ValueError(f"Schema '{name}' has duplicate category keys")
+        for c in self.categories:
+            if not c.vmax > c.vmin:
+                raise ValueError(f"Schema '{name}': range of '{c.key}' must have max > min")
+            if c.weight < 0:
+                raise ValueError(f"Schema '{name}': weight of '{c.key}' is negative")
+        total = sum(c.weight for c in self.categories)
+        if abs(total - 1.0) > WEIGHT_TOLERANCE:
+            raise ValueError(f"Schema '{name}': category weights sum to {total:g}, expected 1")
+
+        self.labels = tuple(c.label for c in self.categories)
+        self.weights = np.array([c.weight for c in self.categories], dtype=float)
+        self.default_weights: Mapping[str, float] = MappingProxyType(
+            {c.key: c.weight for c in self.categories}
+        )
+
+        # Flattened input columns
+        columns, spans = [], []
+        for index, c in enumerate(self.categories):
+            start = len(columns)
+            for input_name in (c.inputs or (None,)):
+                columns.append((index, input_name))
+            spans.append((start, len(columns)))
+        self.columns: Tuple[Tuple[int, Optional[str]], ...] = tuple(columns)
+        self.column_names = tuple(
+            self.categories[i].key if name is None else f"{self.categories[i].key}.{name}"
+            for i, name in self.columns
+        )
+        self.column_mins = np.array([self.categories[i].vmin for i, _ in self.columns], dtype=float)
+        self.column_maxs = np.array([self.categories[i].vmax for i, _ in self.columns], dtype=float)
+        self.column_defaults = np.array(
+            [self._column_default(self.categories[i], name) for i, name in self.columns], dtype=float
+        )
+        self._spans = tuple(spans)
+
+        # Focus areas: area score = mean of its categories' scores
+        if focus_areas is None:
+            focus_areas = [
+                FocusArea(c.label, (c.key,), f"Focus on improving {c.label.lower()}.")
+                for c in self.categories
+            ]
+        self.focus_areas = tuple(focus_areas)
+        self.area_names = tuple(a.name for a in self.focus_areas)
+        self.recommendations: Mapping[str, str] = MappingProxyType(
+            {a.name: a.recommendation for a in self.focus_areas}
+        )
+        key_index = {key: i for i, key in enumerate(self.keys)}
+        self.area_indicator = np.zeros((len(self.categories), len(self.focus_areas)))
+        for j, area in enumerate(self.focus_areas):
+            unknown = [k for k in area.categories if k not in key_index]
+            if unknown or not area.categories:
+                raise ValueError(f"Schema '{name}': focus area '{area.name}' has unknown categories {unknown}")
+            for key in area.categories:
+                self.area_indicator[key_index[key], j] = 1.0
+        self.area_sizes = self.area_indicator.sum(axis=0)
+        # Index -> label lookups for batch results
+        self.area_name_lookup = np.array(self.area_names, dtype=object)
+        self.recommendation_lookup = np.array([a.recommendation for a in self.focus_areas], dtype=object)
+
+        class_focus = dict(class_focus if class_focus is not None else DEFAULT_SPEC["class_focus"])
+        unknown = set(class_focus) - set(CLASS_FOCUS_COMPONENTS)
+        if unknown:
+            raise ValueError(f"Schema '{name}': unknown class focus components {sorted(unknown)}")
+        # Fixed component order keeps the weighted sum reproducible
+        self.class_focus: Mapping[str, float] = MappingProxyType(
+            {k: float(class_focus[k]) for k in CLASS_FOCUS_COMPONENTS if k in class_focus}
+        )
+
+    @staticmethod
+    def _column_default(category: Category, input_name: Optional[str]) -> float:
+        if input_name is None:
+            return category.default
+        return category.default[input_name]
+
+    # ---- Construction ----
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> "RatingSchema":
+        """
+        Compile a schema from its declarative form
+
+        Args:
+            spec: Parsed schema document (see module docstring)
+
+        Returns:
+            Compiled RatingSchema
+        """
+        name = spec.get("name")
+        if not name:
+            raise ValueError("Schema needs a name")
+
+        categories = []
+        for entry in spec.get("categories", []):
+            try:
+                key = entry["key"]
+                vmin, vmax = entry["range"]
+                weight = float(entry["weight"])
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Schema '{name}': invalid category {entry!r} ({e})") from None
+            inputs = tuple(entry.get("inputs", ()))
+            default = entry.get("default", (vmin + vmax) / 2)
+            if inputs:
+                # One default for every sub-score, or a dict per sub-score
+                if not isinstance(default, dict):
+                    default = dict.fromkeys(inputs, default)
+                default = MappingProxyType({k: default[k] for k in inputs})
+            categories.append(Category(
+                key=key,
+                label=entry.get("label", key.replace("_", " ").title()),
+                vmin=vmin, vmax=vmax, weight=weight, default=default, inputs=inputs
+            ))
+
+        focus_areas = None
+        if "focus_areas" in spec:
+            focus_areas = [
+                FocusArea(area["name"], tuple(area["categories"]), area.get("recommendation", ""))
+                for area in spec["focus_areas"]
+            ]
+
+        return cls(name, categories, focus_areas, spec.get("class_focus"), spec.get("description", ""))
+
+    @classmethod
+    def load(cls, path: str) -> "RatingSchema":
+        """Compile a schema from a .json or .yaml/.yml file (name defaults to the file stem)"""
+        with open(path, "r", encoding="utf-8") as f:
+            if path.endswith((".yaml", ".yml")):
+                try:
+                    import yaml
+                except ImportError:
+                    raise ImportError(f"PyYAML is required to load {path} (pip install pyyaml)") from None
+                spec = yaml.safe_load(f)
+            else:
+                spec = json.load(f)
+        spec.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+        return cls.from_dict(spec)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Declarative form (round-trips through from_dict)"""
+        categories = []
+        for c in self.categories:
+            entry = {"key": c.key, "label": c.label, "range": [c.vmin, c.vmax], "weight": c.weight}
+            if c.inputs:
+                entry["inputs"] = list(c.inputs)
+                entry["default"] = dict(c.default)
+            else:
+                entry["default"] = c.default
+            categories.append(entry)
+        return {
+            "name": self.name,
+            "description": self.description,
+            "categories": categories,
+            "focus_areas": [
+                {"name": a.name, "categories": list(a.categories), "recommendation": a.recommendation}
+                for a in self.focus_areas
+            ],
+            "class_focus": dict(self.class_focus)
+        }
+
+    # ---- Evaluation ----
+
+    def raw_matrix(self, students: Iterable[Dict[str, Any]]) -> np.ndarray:
+        """
+        Stack raw student inputs into an (n, n_columns) matrix
+
+        Missing inputs take the schema defaults. Group sub-scores are read by
+        the names declared in the schema.
+        """
+        rows = []
+        for student in students:
+            row = []
+            for (index, input_name), default in zip(self.columns, self.column_defaults):
+                key = self.categories[index].key
+                if input_name is None:
+                    row.append(student.get(key, default))
+                else:
+                    row.append(student.get(key, {}).get(input_name, default))
+            rows.append(row)
+        if not rows:
+            return np.empty((0, len(self.columns)))
+        return np.array(rows, dtype=float)
+
+    def evaluate(self, raw: np.ndarray, weights: Optional[np.ndarray] = None
+                 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Rate a whole cohort in one pass
+
+        Args:
+            raw: (n, n_columns) matrix from raw_matrix
+            weights: Category weights overriding the schema's (e.g. learned ones)
+
+        Returns:
+            Tuple of (column_scores, category_scores, overall): normalized 1-100
+            scores per input column, per category (group = mean of its
+            columns), and the weighted overall rating per student
+        """
+        raw = np.asarray(raw, dtype=float)
+        if raw.ndim != 2 or raw.shape[1] != len(self.columns):
+            raise ValueError(f"Expected an (n, {len(self.columns)}) matrix, got shape {raw.shape}")
+        column_scores = normalize_formula(raw, self.column_mins, self.column_maxs)
+        category_scores = np.empty((len(raw), len(self.categories)))
+        for index, (start, stop) in enumerate(self._spans):
+            if stop - start == 1:
+                category_scores[:, index] = column_scores[:, start]
+            else:
+                category_scores[:, index] = column_scores[:, start:stop].mean(axis=1)
+        weights = self.weights if weights is None else np.asarray(weights, dtype=float)
+        return column_scores, category_scores, category_scores @ weights
+
+    def area_scores(self, category_scores: np.ndarray) -> np.ndarray:
+        """(n, n_areas) focus-area scores: mean of each area's category scores"""
+        return (np.asarray(category_scores, dtype=float) @ self.area_indicator) / self.area_sizes
+
+    def class_focus_score(self, exam: float, attendance: float, homework: float, classwork: float) -> float:
+        """
+        Class focus % from report-card aggregates
+
+        Args:
+            exam, attendance: Percentages
+            homework, classwork: Percentages (1-10 scores scaled by 10)
+        """
+        components = {"exam": exam, "attendance": attendance, "homework": homework, "classwork": classwork}
+        return sum(weight * components[key] for key, weight in self.class_focus.items())
+
+    def describe(self) -> Dict[str, Any]:
+        """Summary for listings: name, description and category weights"""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "categories": [
+                {"key": c.key, "label": c.label, "range": [c.vmin, c.vmax], "weight": c.weight,
+                 **({"inputs": list(c.inputs)} if c.inputs else {})}
+                for c in self.categories
+            ],
+            "focus_areas": list(self.area_names)
+        }
+
+
+DEFAULT_SCHEMA = RatingSchema.from_dict(DEFAULT_SPEC)
+
+
+class SchemaRegistry:
+    """
+    Compiled schemas by name, loaded from a directory of .json/.yaml files.
+
+    Files are compiled once on first use; "default" is always available.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or SCHEMA_DIR
+        self._schemas: Optional[Dict[str, RatingSchema]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, RatingSchema]:
+        schemas = {DEFAULT_SCHEMA.name: DEFAULT_SCHEMA}
+        if os.path.isdir(self.directory):
+            for filename in sorted(os.listdir(self.directory)):
+                if filename.endswith((".json", ".yaml", ".yml")):
+                    schema = RatingSchema.load(os.path.join(self.directory, filename))
+                    schemas[schema.name] = schema
+        return schemas
+
+    def _all(self) -> Dict[str, RatingSchema]:
+        if self._schemas is None:
+            with self._lock:
+                if self._schemas is None:
+                    self._schemas = self._load()
+        return self._schemas
+
+    def get(self, name: Optional[str] = None) -> RatingSchema:
+        """Schema by name (None means default); raises KeyError if unknown"""
+        if name is None:
+            return DEFAULT_SCHEMA
+        schemas = self._all()
+        if name not in schemas:
+            raise KeyError(f"Unknown rating schema: {name}")
+        return schemas[name]
+
+    def names(self) -> List[str]:
+        return list(self._all())
+
+    def reload(self):
+        """Re-read the schema directory"""
+        with self._lock:
+            self._schemas = self._load()
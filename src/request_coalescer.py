@@ -0,0 +1,100 @@
+"""
+Request Coalescer
+Single-flight deduplication with a short-TTL result cache for identical
+concurrent requests
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Awaitable, Hashable
+
+
+def canonical_key(payload: Dict[str, Any]) -> str:
+    """Stable key for a request payload (sorted keys, no whitespace)"""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class RequestCoalescer:
+    """
+    Share one computation between identical requests.
+
+    While a computation for a key is in flight, later callers with the same
+    key await the same task instead of starting their own; cancelling one
+    caller leaves the task running for the others. Finished results
+    are kept for ttl_seconds so near-simultaneous refreshes are served from
+    cache. Failures are not cached.
+    """
+
+    def __init__(self, ttl_seconds: float = 5.0, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._in_flight: Dict[Hashable, "asyncio.Task"] = {}
+        self._cache: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._stats = {
+            "requests": 0,
+            "executed": 0,
+            "coalesced": 0,
+            "cache_hits": 0
+        }
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the result for key, computing it at most once per flight/TTL.
+
+        Args:
+            key: Canonical request key (see canonical_key)
+            compute: Coroutine factory producing the result
+
+        Returns:
+            The (possibly shared) result
+        """
+        self._stats["requests"] += 1
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            expires, value = cached
+            if expires > time.monotonic():
+                self._stats["cache_hits"] += 1
+                return value
+            del self._cache[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            # The computation runs as its own task: a caller that is cancelled
+            # (client disconnect) stops waiting but does not cancel it for the rest
+            task = asyncio.ensure_future(self._execute(key, compute))
+            # Retrieve a failure even if every caller has gone, so it is not logged as unhandled
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._in_flight[key] = task
+            self._stats["executed"] += 1
+        return await asyncio.shield(task)
+
+    async def _execute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one shared computation and cache its result"""
+        try:
+            value = await compute()
+            self._store(key, value)
+            return value
+        finally:
+            del self._in_flight[key]
+
+    def _store(self, key: Hashable, value: Any):
+        """Cache a result, evicting the oldest entries beyond max_entries"""
+        if self.ttl_seconds <= 0:
+            return
+        self._cache[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Coalescing counters"""
+        stats = dict(self._stats)
+        stats["in_flight"] = len(self._in_flight)
+        stats["cached"] = len(self._cache)
+        return stats
@@ -0,0 +1,149 @@
+"""
+Running Statistics
+Constant-memory aggregates over an unbounded stream of values
+"""
+
+import math
+from collections import deque
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+
+def merge_moments(a: Tuple[int, float, float], b: Tuple[int, float, float],
+                  sign: int = 1) -> Tuple[int, float, float]:
+    """
+    Chan et al. merge of two (count, mean, M2) summaries.
+
+    With sign=-1, b is withdrawn from a (the inverse merge), e.g. to take a
+    value back out of an aggregate it was merged into. Unlike running sums of
+    x and x^2, this never subtracts two large, nearly equal numbers.
+
+    Args:
+        a: (count, mean, M2) of the aggregate
+        b: (count, mean, M2) of the values to merge in or withdraw
+        sign: 1 to merge, -1 to withdraw
+
+    Returns:
+        (count, mean, M2) of the result
+    """
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + sign * n_b
+    if n <= 0:
+        return 0, 0.0, 0.0
+    delta = mean_b - mean_a
+    mean = mean_a + sign * delta * n_b / n
+    m2 = m2_a + sign * (m2_b + delta * delta * n_a * n_b / n)
+    return n, mean, max(m2, 0.0)
+
+
+class RunningStats:
+    """
+    Streaming mean/variance (Welford), a recent-window mean and an
+    exponentially weighted moving average.
+
+    Each value is absorbed in O(1) and memory is bounded by the window size,
+    however many values have been seen.
+    """
+
+    def __init__(self, window: int = 100, alpha: float = 0.05):
+        """
+        Args:
+            window: Number of most recent values kept for the window mean
+            alpha: EWMA smoothing factor (weight of the newest value)
+        """
+        self.window = window
+        self.alpha = alpha
+
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.ewma: Optional[float] = None
+        self._recent = deque(maxlen=window)
+
+    def add(self, value: float):
+        """Absorb one value"""
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+        self.ewma = value if self.ewma is None else self.ewma + self.alpha * (value - self.ewma)
+        self._recent.append(value)
+
+    def add_many(self, values: Iterable[float]):
+        """Absorb a batch of values (vectorized; same result as repeated add)"""
+        values = np.asarray(values, dtype=float).ravel()
+        n = len(values)
+        if n == 0:
+            return
+
+        # Chan et al. parallel merge of (count, mean, M2)
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        self.count, self.mean, self._m2 = merge_moments(
+            (self.count, self.mean, self._m2), (n, batch_mean, batch_m2)
+        )
+
+        # EWMA over the batch in closed form
+        start = 0
+        if self.ewma is None:
+            self.ewma = float(values[0])
+            start = 1
+        rest = values[start:]
+        if len(rest):
+            decay = 1.0 - self.alpha
+            powers = decay ** np.arange(len(rest) - 1, -1, -1)
+            self.ewma = float(decay ** len(rest) * self.ewma + self.alpha * (powers @ rest))
+
+        self._recent.extend(values[-self.window:].tolist())
+
+    @property
+    def variance(self) -> float:
+        """Sample variance"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def window_mean(self) -> float:
+        """Mean of the most recent values (bounded work)"""
+        return sum(self._recent) / len(self._recent) if self._recent else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """All aggregates as plain numbers"""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": self.std,
+            "window_mean": self.window_mean,
+            "window_size": len(self._recent),
+            "ewma": self.ewma if self.ewma is not None else 0.0
+        }
+
+    def get_state(self) -> Dict[str, Any]:
+        """Plain-data state for persistence"""
+        return {
+            "window": self.window,
+            "alpha": self.alpha,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self._m2,
+            "ewma": self.ewma,
+            "recent": list(self._recent)
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "RunningStats":
+        """Rebuild from get_state output"""
+        stats = cls(window=state.get("window", 100), alpha=state.get("alpha", 0.05))
+        stats.count = int(state.get("count", 0))
+        stats.mean = float(state.get("mean", 0.0))
+        stats._m2 = float(state.get("m2", 0.0))
+        stats.ewma = state.get("ewma")
+        stats._recent.extend(state.get("recent", []))
+        return stats
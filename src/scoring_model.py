@@ -7,14 +7,35 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any, Optional
 
+from model_artifacts import save_artifact, load_artifact
+from rating_schema import RatingSchema, DEFAULT_SCHEMA
+
 
 class StudentScoringModel:
     """Student scoring model extracted from notebook"""
     
+    ARTIFACT_NAME = "student_scoring_model"
+    
     def __init__(self):
         self.model_version = "1.0"
         self.created_date = "2025-12-02"
     
+    def to_artifact(self, path: str) -> Dict[str, Any]:
+        """Save as a model artifact directory (see model_artifacts)"""
+        return save_artifact(
+            path, self.ARTIFACT_NAME, self.model_version,
+            state={"created_date": self.created_date}
+        )
+    
+    @classmethod
+    def from_artifact(cls, path: str) -> "StudentScoringModel":
+        """Load a model saved with to_artifact"""
+        artifact = load_artifact(path)
+        model = cls()
+        model.model_version = artifact.model_version
+        model.created_date = artifact.state.get("created_date", model.created_date)
+        return model
+    
     def compute_attendance(self, df: pd.DataFrame) -> Dict[str, float]:
         """
         Compute attendance % for each student.
@@ -57,18 +78,20 @@ class StudentScoringModel:
 
     def compute_class_focus(self, attendance_dict: Dict[str, float], 
                           hwcw_scores: Dict[str, Dict[str, int]], 
-                          exam_scores: Dict[str, float]) -> Dict[str, float]:
+                          exam_scores: Dict[str, float],
+                          schema: Optional[RatingSchema] = None) -> Dict[str, float]:
         """
-        Compute class focus % as weighted average:
-        45% exam, 25% attendance, 15% HW, 15% CW
+        Compute class focus % as weighted average of the schema's class focus
+        weights (default: 45% exam, 25% attendance, 15% HW, 15% CW)
         """
+        schema = schema or DEFAULT_SCHEMA
         cf = {}
         for student in attendance_dict.keys():
             att = attendance_dict[student]
             hw = hwcw_scores[student]['homework'] / 10 * 100
             cw = hwcw_scores[student]['classwork'] / 10 * 100
             exam = exam_scores[student]
-            cf[student] = 0.45*exam + 0.25*att + 0.15*hw + 0.15*cw
+            cf[student] = schema.class_focus_score(exam, att, hw, cw)
         return cf
 
     def infer_skills_from_comments(self, comments: Dict[str, str]) -> Dict[str, Dict[str, int]]:
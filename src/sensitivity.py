@@ -0,0 +1,172 @@
+"""
+Sensitivity Analysis
+What-if engine for one student: rates a whole grid of input perturbations in
+one vectorized batch and finds the fewest input steps to the next tier
+"""
+
+import heapq
+import numpy as np
+from typing import Dict, Any, List, Optional
+
+from rating_schema import RatingSchema
+from tiers import TierClassifier, default_classifier
+
+# Perturbation steps on each side of the current value
+DEFAULT_STEPS = 5
+
+# Step size as a fraction of an input's range (1 on 1-10 scales, 5 on percentages)
+STEP_FRACTION = 0.05
+
+
+class SensitivityAnalyzer:
+    """
+    Evaluates "what if" changes to a student's inputs.
+
+    Every input of the schema is moved -k..+k steps while the others stay at
+    the student's values; all (inputs x (2k+1)) points, plus the climb of each
+    input up to its maximum, are rated with one RatingSchema.evaluate call.
+    The overall rating is a sum of independent per-input terms, each concave
+    in its input (linear until clipped at the range maximum), so taking the
+    largest remaining per-step gain first yields the fewest steps to a target.
+    """
+
+    def __init__(self, model, classifier: Optional[TierClassifier] = None):
+        """
+        Args:
+            model: StudentRatingModel (its learned weights rate its own schema)
+            classifier: Tier bands (default tiers if None)
+        """
+        self.model = model
+        self.classifier = classifier or default_classifier
+
+    @staticmethod
+    def default_steps(schema: RatingSchema) -> np.ndarray:
+        """Step size per input column: STEP_FRACTION of the range, at least 1"""
+        spans = schema.column_maxs - schema.column_mins
+        return np.maximum(1.0, np.round(spans * STEP_FRACTION))
+
+    def analyze(self, student: Dict[str, Any], k: int = DEFAULT_STEPS,
+                schema: Optional[RatingSchema] = None) -> Dict[str, Any]:
+        """
+        Sensitivity grid, partial effects and the cheapest path to the next tier
+
+        Args:
+            student: Student record as passed to compute_student_ratings
+            k: Steps on each side of every input
+            schema: Rating schema (default: the model's)
+
+        Returns:
+            Dictionary with base_rating, base_tier, inputs (per input: value,
+            step, grid values and ratings, effect of one step up and down)
+            and next_tier (None at the top tier)
+        """
+        schema = schema or self.model.schema
+        base = schema.raw_matrix([student])[0]
+        steps = self.default_steps(schema)
+        mins, maxs = schema.column_mins, schema.column_maxs
+        n_inputs = len(base)
+        offsets = np.arange(-k, k + 1)
+
+        # Grid: each input moved by -k..k steps, one block of rows per input
+        grid_cols = np.repeat(np.arange(n_inputs), len(offsets))
+        grid_values = np.clip(
+            base[grid_cols] + np.tile(offsets, n_inputs) * steps[grid_cols],
+            mins[grid_cols], maxs[grid_cols]
+        )
+
+        # Climb: each input raised step by step up to its maximum
+        climb_lengths = np.maximum(0, np.ceil((maxs - base) / steps)).astype(int)
+        climb_cols = np.repeat(np.arange(n_inputs), climb_lengths)
+        climb_steps = np.concatenate([np.arange(1, n + 1) for n in climb_lengths]) if climb_cols.size else np.empty(0)
+        climb_values = np.minimum(base[climb_cols] + climb_steps * steps[climb_cols], maxs[climb_cols])
+
+        # One batch: the base row, then grid rows, then climb rows
+        cols = np.concatenate((grid_cols, climb_cols)).astype(int)
+        batch = np.repeat(base[None, :], 1 + len(cols), axis=0)
+        batch[1 + np.arange(len(cols)), cols] = np.concatenate((grid_values, climb_values))
+        _, _, overall = self.model.compute_ratings_batch(batch, schema)
+
+        base_rating = float(overall[0])
+        grid_ratings = overall[1:1 + len(grid_cols)].reshape(n_inputs, len(offsets))
+        climb_ratings = overall[1 + len(grid_cols):]
+
+        inputs = []
+        for j, (index, input_name) in enumerate(schema.columns):
+            category = schema.categories[index]
+            ratings = grid_ratings[j]
+            inputs.append({
+                "name": schema.column_names[j],
+                "label": category.label if input_name is None else input_name.replace("_", " ").title(),
+                "value": float(base[j]),
+                "step": float(steps[j]),
+                "min": float(mins[j]),
+                "max": float(maxs[j]),
+                "offsets": offsets.tolist(),
+                "values": grid_values[j * len(offsets):(j + 1) * len(offsets)].tolist(),
+                "ratings": np.round(ratings, 2).tolist(),
+                "effect_up": round(float(ratings[k + 1] - ratings[k]), 4) if k else 0.0,
+                "effect_down": round(float(ratings[k - 1] - ratings[k]), 4) if k else 0.0
+            })
+
+        base_tier = self.classifier.classify(round(base_rating, 2))
+        result = {
+            "schema": schema.name,
+            "base_rating": round(base_rating, 2),
+            "base_tier": base_tier.name,
+            "k": k,
+            "inputs": inputs,
+            "next_tier": None
+        }
+
+        tier_index = self.classifier.tiers.index(base_tier)
+        if tier_index + 1 < len(self.classifier.tiers):
+            target = self.classifier.tiers[tier_index + 1]
+            climbs = np.split(climb_ratings - base_rating, np.cumsum(climb_lengths)[:-1])
+            result["next_tier"] = self._cheapest_path(
+                schema, base, steps, base_rating, target, climbs
+            )
+        return result
+
+    def _cheapest_path(self, schema: RatingSchema, base: np.ndarray, steps: np.ndarray,
+                       base_rating: float, target, climbs: List[np.ndarray]) -> Dict[str, Any]:
+        """Fewest input steps whose combined gain reaches the target tier"""
+        # Marginal gain of the next step of each input (max-heap)
+        heap = [(-gains[0], j, 0) for j, gains in enumerate(climbs) if gains.size and gains[0] > 0]
+        heapq.heapify(heap)
+        taken = np.zeros(len(base), dtype=int)
+        gained = 0.0
+        needed = target.min_rating - base_rating
+        while heap and round(base_rating + gained, 2) < target.min_rating:
+            neg_gain, j, i = heapq.heappop(heap)
+            gained -= float(neg_gain)
+            taken[j] = i + 1
+            if i + 1 < climbs[j].size:
+                marginal = climbs[j][i + 1] - climbs[j][i]
+                if marginal > 0:
+                    heapq.heappush(heap, (-marginal, j, i + 1))
+
+        path = {
+            "tier": target.name,
+            "min_rating": target.min_rating,
+            "gap": round(needed, 2),
+            "reachable": bool(round(base_rating + gained, 2) >= target.min_rating),
+            "total_steps": int(taken.sum()),
+            "changes": []
+        }
+        if not path["reachable"]:
+            return path
+
+        final = base.copy()
+        for j in np.flatnonzero(taken):
+            final[j] = min(base[j] + taken[j] * steps[j], schema.column_maxs[j])
+            path["changes"].append({
+                "name": schema.column_names[j],
+                "steps": int(taken[j]),
+                "from": float(base[j]),
+                "to": float(final[j])
+            })
+        # Rate the combined change to report the exact resulting rating
+        _, _, overall = self.model.compute_ratings_batch(final[None, :], schema)
+        path["rating"] = round(float(overall[0]), 2)
+        return path
+
@@ -0,0 +1,291 @@
+"""
+Shared Model State
+Memory-mapped weight vector, counters and weight-learner statistics shared by
+every API worker process
+"""
+
+import os
+import mmap
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterable, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+MAGIC = b"SRMSTATE"
+FORMAT_VERSION = 2
+
+# magic, version, n_weights, n_counters, names checksum, sequence number
+HEADER = struct.Struct("<8sIIIIQ")
+SEQ_OFFSET = 24
+
+
+def _names_checksum(weight_names: Iterable[str], counter_names: Iterable[str], n_statistics: int) -> int:
+    layout = ",".join(weight_names) + "|" + ",".join(counter_names) + f"|{n_statistics}"
+    return zlib.crc32(layout.encode("utf-8"))
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Exclusive cross-process lock on a lock file, e.g. to merge-save a file
+    several processes write. Each call opens its own descriptor, so threads
+    of one process also exclude each other. Not reentrant.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+class SharedModelState:
+    """
+    Weights, aggregate counters and the weight learner's sufficient
+    statistics in a small memory-mapped file.
+
+    Writers (in any process) take an exclusive file lock, so read-modify-write
+    updates such as adapt_weights compose instead of overwriting each other.
+    Readers never lock: a sequence number is made odd while a write is in
+    progress (a seqlock), and readers retry until they see a stable even value.
+    The sequence number also tells readers cheaply whether anything changed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        weights: Dict[str, float],
+        counters: Optional[Dict[str, int]] = None,
+        counter_names: Iterable[str] = ("total_predictions", "feedback_count"),
+        statistics: Sequence[float] = ()
+    ):
+        """
+        Open (creating if needed) the shared state file.
+
+        Args:
+            path: State file shared by all workers
+            weights: Initial weights, used only if the file does not exist yet
+            counters: Initial counter values, used only when creating the file
+            counter_names: Names of the aggregate counters
+            statistics: Initial learner statistics (see WeightLearner.get_statistics),
+                used only when creating the file; their length fixes the layout
+        """
+        self.path = path
+        self.weight_names = tuple(weights)
+        self.counter_names = tuple(counter_names)
+        self.n_statistics = len(statistics)
+        self._checksum = _names_checksum(self.weight_names, self.counter_names, self.n_statistics)
+        self._weights_offset = HEADER.size
+        self._counters_offset = HEADER.size + 8 * len(self.weight_names)
+        self._statistics_offset = self._counters_offset + 8 * len(self.counter_names)
+        self._size = self._statistics_offset + 8 * self.n_statistics
+
+        # flock excludes other processes only; threads of this process share the fd
+        self._thread_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._thread_lock, self._file_lock():
+            if not self._is_valid():
+                self._initialize(weights, counters or {}, statistics)
+            self._map = mmap.mmap(self._fd, self._size)
+            # A writer that died mid-update leaves the sequence odd
+            if self.sequence % 2:
+                struct.pack_into("<Q", self._map, SEQ_OFFSET, self.sequence + 1)
+
+    # ---- Locking ----
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    @contextmanager
+    def _writing(self):
+        """Exclusive write section; readers see an odd sequence number meanwhile"""
+        with self._thread_lock, self._file_lock():
+            seq = self.sequence
+            struct.pack_into("<Q", self._map, SEQ_OFFSET, seq + 1)
+            try:
+                yield
+            finally:
+                struct.pack_into("<Q", self._map, SEQ_OFFSET, seq + 2)
+
+    # ---- File layout ----
+
+    def _is_valid(self) -> bool:
+        if os.fstat(self._fd).st_size != self._size:
+            return False
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        header = os.read(self._fd, HEADER.size)
+        magic, version, n_weights, n_counters, checksum, _ = HEADER.unpack(header)
+        return (
+            magic == MAGIC and version == FORMAT_VERSION and checksum == self._checksum
+            and n_weights == len(self.weight_names) and n_counters == len(self.counter_names)
+        )
+
+    def _initialize(self, weights: Dict[str, float], counters: Dict[str, int], statistics: Sequence[float]):
+        """Write a fresh state file (caller holds the locks)"""
+        data = HEADER.pack(
+            MAGIC, FORMAT_VERSION, len(self.weight_names), len(self.counter_names),
+            self._checksum, 0
+        )
+        data += struct.pack(f"<{len(self.weight_names)}d", *(float(weights[n]) for n in self.weight_names))
+        data += struct.pack(
+            f"<{len(self.counter_names)}q", *(int(counters.get(n, 0)) for n in self.counter_names)
+        )
+        data += struct.pack(f"<{self.n_statistics}d", *(float(v) for v in statistics))
+        os.ftruncate(self._fd, self._size)
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.write(self._fd, data)
+        os.fsync(self._fd)
+
+    # ---- Reads (lock-free) ----
+
+    @property
+    def sequence(self) -> int:
+        """Changes on every write; even when no write is in progress"""
+        return struct.unpack_from("<Q", self._map, SEQ_OFFSET)[0]
+
+    def _consistent_read(self, fn: Callable[[], Any]) -> Any:
+        while True:
+            before = self.sequence
+            if before % 2:
+                continue
+            value = fn()
+            if self.sequence == before:
+                return value
+
+    def _unpack_weights(self) -> Dict[str, float]:
+        values = struct.unpack_from(f"<{len(self.weight_names)}d", self._map, self._weights_offset)
+        return dict(zip(self.weight_names, values))
+
+    def _unpack_counters(self) -> Dict[str, int]:
+        values = struct.unpack_from(f"<{len(self.counter_names)}q", self._map, self._counters_offset)
+        return dict(zip(self.counter_names, values))
+
+    def _unpack_statistics(self) -> Tuple[float, ...]:
+        return struct.unpack_from(f"<{self.n_statistics}d", self._map, self._statistics_offset)
+
+    def _pack_weights(self, weights: Dict[str, float]):
+        struct.pack_into(
+            f"<{len(self.weight_names)}d", self._map, self._weights_offset,
+            *(float(weights[n]) for n in self.weight_names)
+        )
+
+    def read_weights(self) -> Dict[str, float]:
+        """Current shared weights"""
+        return self._consistent_read(self._unpack_weights)
+
+    def read_weights_versioned(self):
+        """Current shared weights together with the sequence number they belong to"""
+        return self._consistent_read(lambda: (self.sequence, self._unpack_weights()))
+
+    def read_counters(self) -> Dict[str, int]:
+        """Current shared counter totals"""
+        return self._consistent_read(self._unpack_counters)
+
+    def read_statistics(self) -> Tuple[float, ...]:
+        """Current shared learner statistics"""
+        return self._consistent_read(self._unpack_statistics)
+
+    # ---- Writes (locked) ----
+
+    def update_weights(self, update: Callable[[Dict[str, float]], Dict[str, float]]) -> Dict[str, float]:
+        """
+        Atomically replace the weights with update(current_weights).
+
+        Args:
+            update: Function mapping the current weights to the new weights
+
+        Returns:
+            The new weights
+        """
+        with self._writing():
+            weights = update(self._unpack_weights())
+            self._pack_weights(weights)
+            return weights
+
+    def update_learning(
+        self,
+        update: Callable[[Tuple[float, ...], Dict[str, float]], Tuple[Sequence[float], Dict[str, float]]]
+    ) -> Dict[str, float]:
+        """
+        Atomically replace the learner statistics and the weights fitted from them.
+
+        Args:
+            update: Function mapping (current statistics, current weights) to
+                (new statistics, new weights)
+
+        Returns:
+            The new weights
+        """
+        with self._writing():
+            statistics, weights = update(self._unpack_statistics(), self._unpack_weights())
+            if len(statistics) != self.n_statistics:
+                raise ValueError(f"Expected {self.n_statistics} statistics, got {len(statistics)}")
+            struct.pack_into(
+                f"<{self.n_statistics}d", self._map, self._statistics_offset,
+                *(float(v) for v in statistics)
+            )
+            self._pack_weights(weights)
+            return weights
+
+    def set_weights(self, weights: Dict[str, float]):
+        """Overwrite the shared weights"""
+        self.update_weights(lambda _: weights)
+
+    def add_counters(self, deltas: Dict[str, int]):
+        """Atomically add to the shared counters"""
+        if not any(deltas.values()):
+            return
+        with self._writing():
+            counters = self._unpack_counters()
+            struct.pack_into(
+                f"<{len(self.counter_names)}q", self._map, self._counters_offset,
+                *(counters[n] + int(deltas.get(n, 0)) for n in self.counter_names)
+            )
+
+    @contextmanager
+    def exclusive(self):
+        """
+        Hold the cross-process lock without writing state (e.g. to merge-save a
+        file all workers write). Not reentrant: do not update state inside it.
+        """
+        with self._thread_lock, self._file_lock():
+            yield
+
+    def close(self):
+        """Unmap and close the state file"""
+        self._map.close()
+        os.close(self._fd)
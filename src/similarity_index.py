@@ -0,0 +1,411 @@
+"""
+Student Similarity Index
+Top-k nearest-neighbour search over subcategory rating vectors, one index per
+rating schema
+"""
+
+import threading
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+
+from rating_schema import DEFAULT_SCHEMA, RatingSchema, SchemaRegistry
+
+
+def vector_fields(schema: RatingSchema) -> Tuple[str, ...]:
+    """
+    Order of the components in a rating vector: one per schema input column,
+    named by the category label (scalar categories) or the sub-score name (groups)
+    """
+    return tuple(
+        schema.categories[index].label if name is None else name
+        for index, name in schema.columns
+    )
+
+
+def rating_vector(ratings_dict: Dict[str, Any], schema: Optional[RatingSchema] = None) -> np.ndarray:
+    """
+    Flatten a compute_student_ratings result into a vector in vector_fields order.
+    Missing sub-scores of a group fall back to the mean of the ones present.
+
+    Args:
+        ratings_dict: Rating result
+        schema: Schema the result was rated with (default schema if None)
+    """
+    schema = schema or DEFAULT_SCHEMA
+    subcats = ratings_dict["subcategories"]
+    values = []
+    for category in schema.categories:
+        score = subcats[category.label]
+        if category.inputs:
+            score = score or {}
+            default = float(np.mean(list(score.values()))) if score else 50.0
+            values += [float(score.get(name, default)) for name in category.inputs]
+        else:
+            values.append(float(score))
+    return np.asarray(values, dtype=np.float32)
+
+
+class StudentSimilarityIndex:
+    """
+    k-NN index over the rating vectors of one schema.
+
+    The default "brute" backend keeps vectors in a contiguous float32 matrix
+    and answers queries with one matrix-vector product, using
+    ||a - b||^2 = ||a||^2 + ||b||^2 - 2 a.b with cached row norms.
+    "kdtree" and "balltree" backends use scikit-learn trees, rebuilt lazily
+    after profiles change. A lock guards add, remove and query, so plans
+    generated on several threads can share one index.
+    """
+
+    BACKENDS = ("brute", "kdtree", "balltree")
+
+    def __init__(self, schema: Optional[RatingSchema] = None, backend: str = "brute",
+                 initial_capacity: int = 1024):
+        """
+        Args:
+            schema: Schema whose rating vectors are stored (default schema if None)
+            backend: "brute", "kdtree" or "balltree"
+            initial_capacity: Rows allocated up front (the buffer doubles when full)
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {self.BACKENDS}")
+
+        schema = schema or DEFAULT_SCHEMA
+        self.schema_name = schema.name
+        self.fields = vector_fields(schema)
+        self.backend = backend
+        self.dim = len(self.fields)
+
+        self._vectors = np.zeros((initial_capacity, self.dim), dtype=np.float32)
+        self._sq_norms = np.zeros(initial_capacity, dtype=np.float32)
+        self._size = 0
+
+        # Row bookkeeping: one row per student, replaced on re-rating
+        self._student_ids: List[str] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._row_of: Dict[str, int] = {}
+
+        self._tree = None
+        self._tree_dirty = True
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Indexes pickled before schemas existed hold default-schema vectors
+        self.__dict__.setdefault("schema_name", DEFAULT_SCHEMA.name)
+        self.__dict__.setdefault("fields", vector_fields(DEFAULT_SCHEMA))
+        self._lock = threading.Lock()
+
+    def _grow(self):
+        """Double the vector buffer capacity"""
+        capacity = max(1, 2 * len(self._vectors))
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        sq_norms = np.zeros(capacity, dtype=np.float32)
+        sq_norms[:self._size] = self._sq_norms[:self._size]
+        self._vectors, self._sq_norms = vectors, sq_norms
+
+    def add(
+        self,
+        student_id: str,
+        vector: np.ndarray,
+        tasks: Optional[List[Dict[str, Any]]] = None,
+        weak_category: Optional[str] = None
+    ):
+        """
+        Store (or replace) a student profile.
+
+        Args:
+            student_id: Student identifier
+            vector: Rating vector in `fields` order
+            tasks: Tasks assigned to this student
+            weak_category: Weakest category at the time of the plan
+        """
+        student_id = str(student_id)
+        vector = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+
+        with self._lock:
+            row = self._row_of.get(student_id)
+            if row is None:
+                if self._size == len(self._vectors):
+                    self._grow()
+                row = self._size
+                self._size += 1
+                self._row_of[student_id] = row
+                self._student_ids.append(student_id)
+                self._payloads.append({})
+
+            self._vectors[row] = vector
+            self._sq_norms[row] = float(vector @ vector)
+            self._payloads[row] = {
+                "tasks": list(tasks or []),
+                "weak_category": weak_category
+            }
+            self._tree_dirty = True
+
+    def add_ratings(
+        self,
+        ratings_dict: Dict[str, Any],
+        tasks: Optional[List[Dict[str, Any]]] = None,
+        weak_category: Optional[str] = None,
+        schema: Optional[RatingSchema] = None
+    ):
+        """Store a profile from a compute_student_ratings result of this index's schema"""
+        self.add(
+            ratings_dict.get("student_id", "unknown"),
+            rating_vector(ratings_dict, self._check_schema(schema)),
+            tasks,
+            weak_category
+        )
+
+    def remove(self, student_id: str) -> bool:
+        """Drop a student's profile (the last row moves into its place), returns False if absent"""
+        student_id = str(student_id)
+        with self._lock:
+            row = self._row_of.pop(student_id, None)
+            if row is None:
+                return False
+            last = self._size - 1
+            if row != last:
+                self._vectors[row] = self._vectors[last]
+                self._sq_norms[row] = self._sq_norms[last]
+                self._student_ids[row] = self._student_ids[last]
+                self._payloads[row] = self._payloads[last]
+                self._row_of[self._student_ids[row]] = row
+            self._student_ids.pop()
+            self._payloads.pop()
+            self._size = last
+            self._tree_dirty = True
+            return True
+
+    def _check_schema(self, schema: Optional[RatingSchema]) -> RatingSchema:
+        """Schema of a rating result, which must match the stored vectors"""
+        schema = schema or DEFAULT_SCHEMA
+        if vector_fields(schema) != self.fields:
+            raise ValueError(
+                f"Ratings of schema '{schema.name}' do not fit the index of '{self.schema_name}'"
+            )
+        return schema
+
+    def _build_tree(self):
+        """(Re)build the scikit-learn tree over the stored vectors (caller holds the lock)"""
+        from sklearn.neighbors import KDTree, BallTree
+
+        tree_cls = KDTree if self.backend == "kdtree" else BallTree
+        self._tree = tree_cls(self._vectors[:self._size])
+        self._tree_dirty = False
+
+    def _query_rows(self, query: np.ndarray, k: int):
+        """Return (rows, squared distances) of the k nearest profiles, closest first (caller holds the lock)"""
+        n = self._size
+        if self.backend != "brute":
+            if self._tree_dirty:
+                self._build_tree()
+            dist, rows = self._tree.query(query.reshape(1, -1), k=k)
+            return rows[0], dist[0] ** 2
+
+        vectors = self._vectors[:n]
+        d2 = self._sq_norms[:n] - 2.0 * (vectors @ query) + float(query @ query)
+        if k < n:
+            rows = np.argpartition(d2, k - 1)[:k]
+        else:
+            rows = np.arange(n)
+        rows = rows[np.argsort(d2[rows], kind="stable")]
+        return rows, np.maximum(d2[rows], 0.0)
+
+    def query(
+        self,
+        vector: np.ndarray,
+        k: int = 5,
+        exclude: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the k most similar stored students.
+
+        Args:
+            vector: Query rating vector in `fields` order
+            k: Number of neighbours to return
+            exclude: Student id to leave out (usually the query student)
+
+        Returns:
+            List of neighbours with distance, weak category and tasks
+        """
+        query = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+
+        with self._lock:
+            skip = self._row_of.get(str(exclude)) if exclude is not None else None
+            fetch = min(self._size, k + (1 if skip is not None else 0))
+            if fetch <= 0:
+                return []
+
+            rows, d2 = self._query_rows(query, fetch)
+
+            neighbours = []
+            for row, dist2 in zip(rows, d2):
+                if row == skip:
+                    continue
+                payload = self._payloads[row]
+                neighbours.append({
+                    "student_id": self._student_ids[row],
+                    "distance": round(float(np.sqrt(dist2)), 4),
+                    "weak_category": payload["weak_category"],
+                    "tasks": payload["tasks"]
+                })
+        return neighbours[:k]
+
+    def query_ratings(self, ratings_dict: Dict[str, Any], k: int = 5,
+                      schema: Optional[RatingSchema] = None) -> List[Dict[str, Any]]:
+        """Find students similar to a compute_student_ratings result (excluding itself)"""
+        vector = rating_vector(ratings_dict, self._check_schema(schema))
+        return self.query(vector, k, exclude=ratings_dict.get("student_id"))
+
+    def export(self):
+        """Return (vectors, student_ids, payloads) for persistence"""
+        with self._lock:
+            return self._vectors[:self._size].copy(), list(self._student_ids), list(self._payloads)
+
+    @classmethod
+    def from_export(
+        cls,
+        vectors: np.ndarray,
+        student_ids: List[str],
+        payloads: List[Dict[str, Any]],
+        backend: str = "brute",
+        schema: Optional[RatingSchema] = None
+    ) -> "StudentSimilarityIndex":
+        """Rebuild an index from export() output"""
+        index = cls(schema, backend=backend, initial_capacity=max(1024, len(student_ids)))
+        n = len(student_ids)
+        index._vectors[:n] = vectors
+        index._sq_norms[:n] = np.einsum("ij,ij->i", index._vectors[:n], index._vectors[:n])
+        index._size = n
+        index._student_ids = [str(sid) for sid in student_ids]
+        index._payloads = list(payloads)
+        index._row_of = {sid: row for row, sid in enumerate(index._student_ids)}
+        return index
+
+
+class SchemaSimilarityIndex:
+    """
+    One StudentSimilarityIndex per rating schema.
+
+    Schemas rate different categories (and scale them differently), so
+    vectors of two schemas are not comparable; each result is stored in and
+    matched against the index of the schema it was rated with, the way
+    SchemaLeaderboards ranks them. Results without a "schema" field were
+    rated with the default schema.
+    """
+
+    def __init__(self, schemas: Optional[SchemaRegistry] = None, backend: str = "brute"):
+        """
+        Args:
+            schemas: Registry resolving schema names (schemas/ directory if None)
+            backend: Backend of every per-schema index
+        """
+        self.schemas = schemas or SchemaRegistry()
+        self.backend = backend
+        self._indexes: Dict[str, StudentSimilarityIndex] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(index) for index in self._indexes.values())
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"], state["schemas"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.schemas = SchemaRegistry()
+        self._lock = threading.Lock()
+
+    def index(self, schema: Optional[str] = None) -> StudentSimilarityIndex:
+        """
+        Index of one schema (the default if None), created on first use
+
+        Raises:
+            KeyError: If the schema is unknown
+        """
+        name = schema or DEFAULT_SCHEMA.name
+        with self._lock:
+            index = self._indexes.get(name)
+            if index is None:
+                index = self._indexes[name] = StudentSimilarityIndex(self.schemas.get(name), self.backend)
+            return index
+
+    def _resolve(self, ratings_dict: Dict[str, Any]):
+        """(index, schema) of a rating result, or (None, None) for an unknown schema"""
+        name = ratings_dict.get("schema")
+        try:
+            return self.index(name), self.schemas.get(name)
+        except KeyError:
+            return None, None
+
+    def add_ratings(
+        self,
+        ratings_dict: Dict[str, Any],
+        tasks: Optional[List[Dict[str, Any]]] = None,
+        weak_category: Optional[str] = None
+    ) -> bool:
+        """Store a profile in its schema's index, returns False if the schema is unknown"""
+        index, schema = self._resolve(ratings_dict)
+        if index is None:
+            return False
+        index.add_ratings(ratings_dict, tasks, weak_category, schema)
+        return True
+
+    def remove(self, student_id: str, schema: Optional[str] = None) -> bool:
+        """Drop a student's profile from one schema's index, returns False if absent"""
+        with self._lock:
+            index = self._indexes.get(schema or DEFAULT_SCHEMA.name)
+        return index is not None and index.remove(student_id)
+
+    def query_ratings(self, ratings_dict: Dict[str, Any], k: int = 5) -> List[Dict[str, Any]]:
+        """Students of the same schema similar to a rating result (none for an unknown schema)"""
+        index, schema = self._resolve(ratings_dict)
+        if index is None:
+            return []
+        return index.query_ratings(ratings_dict, k, schema)
+
+    def names(self) -> List[str]:
+        """Schemas that have an index"""
+        with self._lock:
+            return sorted(self._indexes)
+
+    def export(self) -> Dict[str, Tuple[np.ndarray, List[str], List[Dict[str, Any]]]]:
+        """export() of every per-schema index, by schema name"""
+        with self._lock:
+            indexes = dict(self._indexes)
+        return {name: index.export() for name, index in indexes.items()}
+
+    @classmethod
+    def from_export(
+        cls,
+        exports: Dict[str, Tuple[np.ndarray, List[str], List[Dict[str, Any]]]],
+        backend: str = "brute",
+        schemas: Optional[SchemaRegistry] = None
+    ) -> "SchemaSimilarityIndex":
+        """Rebuild per-schema indexes from export() output (unknown or changed schemas are dropped)"""
+        similarity = cls(schemas, backend)
+        for name, (vectors, student_ids, payloads) in exports.items():
+            try:
+                schema = similarity.schemas.get(name)
+            except KeyError:
+                continue
+            if np.shape(vectors)[1:] != (len(schema.columns),):
+                # The schema's inputs changed since the vectors were stored
+                continue
+            similarity._indexes[name] = StudentSimilarityIndex.from_export(
+                vectors, student_ids, payloads, backend, schema
+            )
+        return similarity
@@ -0,0 +1,145 @@
+"""
+Structured Logging
+JSON-lines application log written by a background thread, so request
+threads never block on log I/O
+
+Configuration (environment):
+    STUDENT_RATING_LOG_LEVEL    DEBUG / INFO (default) / WARNING / ERROR
+    STUDENT_RATING_LOG_DIR      Directory of app.log (default logs)
+    STUDENT_RATING_LOG_CONSOLE  1 (default) to also echo to stderr, 0 to silence
+"""
+
+import os
+import copy
+import json
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+from datetime import datetime, timezone
+
+LOG_FILE = "app.log"
+MAX_BYTES = 10 * 2**20
+BACKUP_COUNT = 5
+
+ROOT_LOGGER = "student_rating"
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "exc"}
+
+_listener = None
+_lock = threading.Lock()
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {k: v for k, v in vars(record).items() if k not in _RESERVED}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, extra fields, exc"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **_extra_fields(record)
+        }
+        if getattr(record, "exc", None):
+            entry["exc"] = record.exc
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Human-readable: [LEVEL] message key=value ..."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(f"{k}={v}" for k, v in _extra_fields(record).items())
+        line = f"[{record.levelname}] {record.getMessage()}"
+        if fields:
+            line = f"{line} {fields}"
+        if getattr(record, "exc", None):
+            line = f"{line}\n{record.exc}"
+        return line
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueue a picklable copy with the message and traceback already rendered"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args = record.message, None
+        record.exc_info = record.exc_text = record.stack_info = None
+        return record
+
+
+def configure_logging(level: str = None, log_dir: str = None, console: bool = None):
+    """
+    Route the "student_rating" loggers through a queue to a rotating JSON
+    file (and optionally stderr). Safe to call more than once; only the
+    first call takes effect.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+
+        level = (level or os.environ.get("STUDENT_RATING_LOG_LEVEL", "INFO")).upper()
+        log_dir = log_dir or os.environ.get("STUDENT_RATING_LOG_DIR", "logs")
+        if console is None:
+            console = os.environ.get("STUDENT_RATING_LOG_CONSOLE", "1") not in ("0", "false", "off", "no")
+
+        os.makedirs(log_dir, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            os.path.join(log_dir, LOG_FILE), maxBytes=MAX_BYTES,
+            backupCount=BACKUP_COUNT, encoding="utf-8", delay=True
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers = [file_handler]
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(ConsoleFormatter())
+            handlers.append(console_handler)
+
+        # Callers only enqueue; the listener thread formats and writes
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(level)
+        root.addHandler(_QueueHandler(log_queue))
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        root = logging.getLogger(ROOT_LOGGER)
+        for handler in list(root.handlers):
+            if isinstance(handler, _QueueHandler):
+                root.removeHandler(handler)
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Logger for a module, e.g. get_logger(__name__).
+
+    Pass structured fields with `extra`:
+        logger.info("Model saved", extra={"path": filepath})
+    """
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
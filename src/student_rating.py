@@ -4,216 +4,654 @@ FIFA-style rating system for student performance
 """
 
 import numpy as np
-import pandas as pd
 from datetime import datetime
-from typing import Dict, Any, Tuple
-import joblib
+from types import MappingProxyType
+from typing import Dict, Any, Callable, List, Mapping, Tuple
+import threading
 import os
 
+from lazy_imports import lazy_import
+from sharded_counters import ShardedCounters
+from weight_learner import WeightLearner
+from running_stats import RunningStats
+from metrics import timed
+from rating_schema import RatingSchema, DEFAULT_SCHEMA, normalize_formula, normalize_table
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Only needed to save/load the model file
+joblib = lazy_import("joblib")
+
+
+def _table_index(val, vmin: float, size: int):
+    """Lookup-table position of an integer-valued input, or None"""
+    if isinstance(val, float):
+        if not val.is_integer():
+            return None
+        val = int(val)
+    elif not isinstance(val, (int, np.integer)):
+        return None
+    index = int(val) - int(vmin)
+    return index if 0 <= index < size else None
+
 
 class StudentRatingModel:
-    """Core model for calculating student ratings"""
+    """
+    Core model for calculating student ratings
+    
+    Safe to share between threads: weights are an immutable snapshot that
+    adapt_weights replaces in one reference swap (readers never lock),
+    counters are kept per thread and merged on read, and the prediction
+    history and error statistics are guarded by a lock.
+    
+    Worker processes can additionally share weights and counters through a
+    SharedModelState (see attach_shared_state).
+    """
     
-    def __init__(self, random_seed: int = 42):
+    def __init__(self, random_seed: int = 42, schema: RatingSchema = None):
         self.random_seed = random_seed
+        # Categories, input ranges, default weights and focus areas (src/rating_schema.py)
+        self.schema = schema or DEFAULT_SCHEMA
         np.random.seed(random_seed)
         
-        # Default weights - can be adjusted through training
-        self.weights = {
-            "attendance": 0.2,
-            "homework": 0.15,
-            "classwork": 0.1,
-            "class_focus": 0.15,
-            "exam": 0.25,
-            "skills": 0.15
-        }
+        # Serializes writers (weight updates, history, error log, saves)
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._counters = ShardedCounters(("total_predictions", "feedback_count"))
+        
+        # Cross-process state (None unless attach_shared_state is called)
+        self._shared = None
+        self._shared_seq = None
+        self._flushed = dict.fromkeys(self._counters.names, 0)
+        self._flush_lock = threading.Lock()
+        
+        # Default weights from the schema - can be adjusted through training
+        self.weights = dict(self.schema.default_weights)
+        
+        # Learns weights from actual-vs-predicted feedback
+        self.learner = WeightLearner(self._weights.keys(), self._weights)
         
         # History for adaptive learning
-        self.prediction_history = []
-        self.performance_metrics = {
-            "total_predictions": 0,
-            "accuracy_scores": [],
-            "feedback_count": 0
-        }
+        self._history: List[Dict[str, Any]] = []
+        # Feedback errors as running aggregates (constant memory)
+        self.error_stats = RunningStats()
+        # Latest component scores per student (features for weight learning)
+        self._features: Dict[str, np.ndarray] = {}
+        # How much of the history is already in the saved file, and feedback
+        # errors not yet merged into it (shared mode only)
+        self._saved_history = 0
+        self._unsaved_errors: List[float] = []
+    
+    @property
+    def weights(self) -> Mapping[str, float]:
+        """Current weights (read-only snapshot)"""
+        shared = self._shared
+        if shared is not None and shared.sequence != self._shared_seq:
+            self._shared_seq, weights = shared.read_weights_versioned()
+            self._weights = MappingProxyType(weights)
+        return self._weights
+    
+    @weights.setter
+    def weights(self, weights: Dict[str, float]):
+        if self._shared is not None:
+            self._shared.set_weights(weights)
+        self._weights = MappingProxyType(dict(weights))
+    
+    @property
+    def prediction_history(self) -> List[Dict[str, Any]]:
+        """Copy of all predictions made so far"""
+        with self._lock:
+            return list(self._history)
+    
+    @prediction_history.setter
+    def prediction_history(self, history: List[Dict[str, Any]]):
+        with self._lock:
+            self._history = list(history)
+            self._features = {
+                result["student_id"]: self.rating_features(result) for result in self._history
+                if result.get("schema", DEFAULT_SCHEMA.name) == self.schema.name
+            }
+    
+    def rating_features(self, ratings_dict: Dict[str, Any]) -> np.ndarray:
+        """Component scores of a rating, in weight order (groups averaged)"""
+        subcats = ratings_dict["subcategories"]
+        return np.array([
+            np.mean(list(subcats[c.label].values())) if c.inputs else subcats[c.label]
+            for c in self.schema.categories
+        ], dtype=float)
+    
+    @property
+    def performance_metrics(self) -> Dict[str, Any]:
+        """Merged counters and the feedback error statistics state"""
+        metrics = self._counter_totals()
+        with self._lock:
+            metrics["error_stats"] = self.error_stats.get_state()
+        return metrics
+    
+    @performance_metrics.setter
+    def performance_metrics(self, metrics: Dict[str, Any]):
+        with self._lock, self._flush_lock:
+            self._counters.reset(metrics)
+            self._flushed = self._counters.snapshot()
+            self.error_stats = self._error_stats_from(metrics)
+    
+    @staticmethod
+    def _error_stats_from(metrics: Dict[str, Any]) -> RunningStats:
+        """Error statistics from saved metrics (older models stored the raw error list)"""
+        if "error_stats" in metrics:
+            return RunningStats.from_state(metrics["error_stats"])
+        stats = RunningStats()
+        stats.add_many(metrics.get("accuracy_scores", []))
+        return stats
+    
+    def attach_shared_state(self, state):
+        """
+        Share weights and counters with other worker processes
+        
+        After attaching, weights are read from (and weight updates applied
+        atomically to) the shared state, the weight learner fits on the
+        feedback statistics of all workers kept there, local counter
+        increments are flushed to it in batches, and save_model merges this
+        process's new history into the model file instead of overwriting it.
+        
+        Args:
+            state: SharedModelState created from this model's weights, counters
+                and learner statistics (learner.get_statistics())
+        """
+        if state.n_statistics != len(self.learner.get_statistics()):
+            raise ValueError("Shared state does not hold this model's weight-learner statistics")
+        with self._lock, self._flush_lock:
+            self._shared = state
+            self._shared_seq, weights = state.read_weights_versioned()
+            self._weights = MappingProxyType(weights)
+            self.learner.set_statistics(state.read_statistics(), weights)
+            # Local counters now only hold increments not yet flushed
+            self._counters.reset()
+            self._flushed = self._counters.snapshot()
+    
+    def _counter_totals(self) -> Dict[str, int]:
+        """Prediction/feedback counts (across workers in shared mode)"""
+        if self._shared is not None:
+            self._flush_counters()
+            return self._shared.read_counters()
+        return self._counters.snapshot()
+    
+    def _flush_counters(self):
+        """Add local counter increments since the last flush to the shared state"""
+        with self._flush_lock:
+            totals = self._counters.snapshot()
+            self._shared.add_counters({k: totals[k] - self._flushed[k] for k in totals})
+            self._flushed = totals
     
     @staticmethod
     def normalize_1_100(val: float, vmin: float, vmax: float) -> float:
-        """Map any value to 1-100 scale"""
-        return np.clip(1.0 + 99.0 * (val - vmin) / (vmax - vmin + 1e-9), 1.0, 100.0)
+        """
+        Map any value to 1-100 scale
+        
+        Integer inputs of integer domains (1-10 scales, 0-100 percentages) are
+        read from precomputed tables; anything else (fractions, arrays) is computed.
+        """
+        tables = normalize_table(vmin, vmax)
+        if tables is not None:
+            table = tables[1]
+            index = _table_index(val, vmin, len(table))
+            if index is not None:
+                return table[index]
+        return normalize_formula(val, vmin, vmax)
+    
+    @staticmethod
+    def normalize_batch(values, vmin, vmax) -> np.ndarray:
+        """
+        Vectorized normalize_1_100
+        
+        Args:
+            values: Array of raw values
+            vmin, vmax: Range bounds (scalars, or arrays broadcasting against values)
+            
+        Returns:
+            Float array of 1-100 scores, identical to normalize_1_100 element-wise
+        """
+        values = np.asarray(values)
+        # Integer arrays gather from the table; float arrays are cheaper to
+        # compute than to check for integrality first
+        if values.dtype.kind in "biu" and values.size and np.isscalar(vmin) and np.isscalar(vmax):
+            tables = normalize_table(vmin, vmax)
+            if tables is not None:
+                table = tables[0]
+                index = values.astype(np.int64) - int(vmin)
+                if index.min() >= 0 and index.max() < len(table):
+                    return table[index]
+        return normalize_formula(values.astype(float, copy=False), vmin, vmax)
     
-    def compute_student_ratings(self, student: Dict[str, Any]) -> Dict[str, Any]:
+    def _normalize_inputs(self, values: List[Any], ranges: List[Tuple[int, int]]) -> List[float]:
+        """Normalize one student's raw inputs: table hits, then one vectorized pass for the rest"""
+        normalized = []
+        misses = []
+        for i, (val, (vmin, vmax)) in enumerate(zip(values, ranges)):
+            tables = normalize_table(vmin, vmax)
+            index = None if tables is None else _table_index(val, vmin, len(tables[1]))
+            if index is None:
+                misses.append(i)
+                normalized.append(None)
+            else:
+                normalized.append(tables[1][index])
+        if misses:
+            lows, highs = np.array([ranges[i] for i in misses], dtype=float).T
+            computed = normalize_formula(np.array([values[i] for i in misses], dtype=float), lows, highs)
+            for i, score in zip(misses, computed.tolist()):
+                normalized[i] = score
+        return normalized
+    
+    @timed("rating")
+    def compute_student_ratings(self, student: Dict[str, Any], schema: RatingSchema = None) -> Dict[str, Any]:
         """
         Calculate student ratings across multiple dimensions
         
         Args:
-            student: Dictionary with student performance data
+            student: Dictionary with student performance data (an optional
+                "cohort" dict of school/grade/class is copied into the result)
+            schema: Rating schema to apply instead of the model's own (it is
+                rated with its declared weights and not used for weight learning)
             
         Returns:
             Dictionary with overall rating and subcategory scores
         """
-        # ---- Attendance ----
-        att = student.get("attendance", 80)  # percentage
-        r_att = self.normalize_1_100(att, 0, 100)
-        
-        # ---- Homework/Classwork ----
-        hw = student.get("homework", 7)      # 1-10 scale
-        cw = student.get("classwork", 7)     # 1-10 scale
-        r_hw = self.normalize_1_100(hw, 1, 10)
-        r_cw = self.normalize_1_100(cw, 1, 10)
-        
-        # ---- Class Focus ----
-        focus = student.get("class_focus", 70)  # percentage
-        r_focus = self.normalize_1_100(focus, 0, 100)
-        
-        # ---- Exam ----
-        exam = student.get("exam", 65)  # percentage
-        r_exam = self.normalize_1_100(exam, 0, 100)
-        
-        # ---- Skills ----
-        skills = student.get("skills", {
-            "problem_solving": 7,
-            "communication": 7,
-            "discipline": 7
-        })
-        r_skills = {k: self.normalize_1_100(v, 1, 10) for k, v in skills.items()}
-        
-        # ---- Overall rating ----
-        overall = (
-            r_att * self.weights["attendance"] +
-            r_hw * self.weights["homework"] +
-            r_cw * self.weights["classwork"] +
-            r_focus * self.weights["class_focus"] +
-            r_exam * self.weights["exam"] +
-            np.mean(list(r_skills.values())) * self.weights["skills"]
-        )
+        schema = schema or self.schema
+        own_schema = schema is self.schema
+        # One snapshot, so a concurrent weight update cannot mix two weight sets
+        weights = self.weights if own_schema else schema.default_weights
+        
+        # Raw inputs in category order; a group (skills) adds one value per sub-score
+        raws, values, ranges = [], [], []
+        for category in schema.categories:
+            if category.inputs:
+                # Declared sub-scores only, defaults for missing ones (as schema.raw_matrix)
+                given = student.get(category.key) or {}
+                raw = {name: given.get(name, category.default[name]) for name in category.inputs}
+            else:
+                raw = student.get(category.key, category.default)
+            raws.append(raw)
+            if category.inputs:
+                values.extend(raw.values())
+                ranges.extend([(category.vmin, category.vmax)] * len(raw))
+            else:
+                values.append(raw)
+                ranges.append((category.vmin, category.vmax))
+        
+        # Integer inputs (sliders, CSV marks) are table lookups; fractional
+        # ones are normalized together in one vectorized call
+        normalized = self._normalize_inputs(values, ranges)
+        
+        subcategories, features, pos = {}, [], 0
+        for category, raw in zip(schema.categories, raws):
+            if category.inputs:
+                scores = normalized[pos:pos + len(raw)]
+                pos += len(raw)
+                subcategories[category.label] = {k: round(v, 2) for k, v in zip(raw, scores)}
+                features.append(np.mean(scores))
+            else:
+                subcategories[category.label] = round(normalized[pos], 2)
+                features.append(normalized[pos])
+                pos += 1
+        
+        overall = sum(score * weights[key] for score, key in zip(features, schema.keys))
         
         result = {
             "overall_rating": round(overall, 2),
-            "subcategories": {
-                "Attendance": round(r_att, 2),
-                "Homework": round(r_hw, 2),
-                "Classwork": round(r_cw, 2),
-                "Class Focus": round(r_focus, 2),
-                "Exam": round(r_exam, 2),
-                "Skills": {k: round(v, 2) for k, v in r_skills.items()}
-            },
+            "subcategories": subcategories,
             "timestamp": datetime.now().isoformat(),
             "student_id": student.get("student_id", "unknown")
         }
+        if schema is not DEFAULT_SCHEMA:
+            result["schema"] = schema.name
+        if student.get("cohort"):
+            result["cohort"] = dict(student["cohort"])
         
         # Track prediction
-        self.prediction_history.append(result)
-        self.performance_metrics["total_predictions"] += 1
+        with self._lock:
+            self._history.append(result)
+            if own_schema:
+                self._features[result["student_id"]] = np.array(features, dtype=float)
+        self._counters.add("total_predictions")
         
         return result
     
-    def recommend_improvement(self, ratings_dict: Dict[str, Any]) -> Tuple[str, str, Dict[str, float]]:
+    def compute_ratings_batch(self, raw: np.ndarray, schema: RatingSchema = None
+                              ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Rate a cohort matrix in one vectorized pass (not recorded in history)
+        
+        Args:
+            raw: (n, n_columns) inputs, e.g. from schema.raw_matrix(students)
+            schema: Schema of the matrix (default: the model's, with learned weights)
+            
+        Returns:
+            Tuple of (column_scores, category_scores, overall), unrounded
+        """
+        schema = schema or self.schema
+        weights = None
+        if schema is self.schema:
+            current = self.weights
+            weights = np.array([current[key] for key in schema.keys], dtype=float)
+        return schema.evaluate(raw, weights)
+    
+    @timed("recommendation")
+    def recommend_improvement(self, ratings_dict: Dict[str, Any],
+                              schema: RatingSchema = None) -> Tuple[str, str, Dict[str, float]]:
         """
         Analyze ratings and recommend improvements
         
+        The weakest focus area of the schema (e.g. Homework/Classwork averages
+        both categories) gets the recommendation; ties go to the earlier area.
+        
         Returns:
             Tuple of (weakest_category, recommendation, all_scores)
         """
+        schema = schema or self.schema
         subcats = ratings_dict["subcategories"]
         
-        # Find weakest main category
-        main_scores = {
-            "Attendance": subcats["Attendance"],
-            "Homework/Classwork": (subcats["Homework"] + subcats["Classwork"]) / 2,
-            "Class Focus": subcats["Class Focus"],
-            "Exam": subcats["Exam"],
-            "Skills": np.mean(list(subcats["Skills"].values()))
+        category_scores = {
+            c.key: np.mean(list(subcats[c.label].values())) if c.inputs else subcats[c.label]
+            for c in schema.categories
         }
+        main_scores = {}
+        for area in schema.focus_areas:
+            if len(area.categories) == 1:
+                main_scores[area.name] = category_scores[area.categories[0]]
+            else:
+                main_scores[area.name] = sum(category_scores[k] for k in area.categories) / len(area.categories)
         
         weakest = min(main_scores, key=main_scores.get)
         
-        recommendations = {
-            "Attendance": "Improve class presence; track absences and ensure punctuality.",
-            "Homework/Classwork": "Submit homework & classwork on time; improve quality and consistency.",
-            "Class Focus": "Increase concentration in class; use short quizzes and active participation.",
-            "Exam": "Practice exam strategy, time management, and answer organization.",
-            "Skills": "Enhance key skills through practice, presentations, and problem-solving drills."
-        }
+        return weakest, schema.recommendations[weakest], main_scores
+    
+    def subcategory_matrix(self, ratings_list: List[Dict[str, Any]],
+                           schema: RatingSchema = None) -> np.ndarray:
+        """
+        Stack the category scores of many ratings into one matrix
+        
+        Args:
+            ratings_list: Results of compute_student_ratings
+            schema: Schema the ratings were computed with (default: the model's)
+            
+        Returns:
+            Array of shape (n, n_categories) in schema order; groups (skills)
+            hold the mean of their rounded sub-scores
+        """
+        schema = schema or self.schema
+        if not ratings_list:
+            return np.empty((0, len(schema.categories)))
+        matrix = np.empty((len(ratings_list), len(schema.categories)))
+        for index, category in enumerate(schema.categories):
+            if category.inputs:
+                # Sub-score names come from the ratings themselves
+                matrix[:, index] = np.array([
+                    list(r["subcategories"][category.label].values()) for r in ratings_list
+                ], dtype=float).mean(axis=1)
+            else:
+                matrix[:, index] = [r["subcategories"][category.label] for r in ratings_list]
+        return matrix
+    
+    @timed("recommendation")
+    def recommend_improvement_batch(
+        self, category_scores: np.ndarray, schema: RatingSchema = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized recommend_improvement for a whole cohort
+        
+        Args:
+            category_scores: Matrix from subcategory_matrix, shape (n, n_categories)
+            schema: Schema of the matrix (default: the model's)
+            
+        Returns:
+            Tuple of (weakest_areas, recommendations, area_scores): two object
+            arrays of length n and the (n, n_areas) focus-area score matrix in
+            schema.area_names order. Ties resolve to the earlier area, as in
+            recommend_improvement.
+        """
+        schema = schema or self.schema
+        category_scores = np.asarray(category_scores, dtype=float)
+        if category_scores.ndim != 2 or category_scores.shape[1] != len(schema.categories):
+            raise ValueError(
+                f"Expected an (n, {len(schema.categories)}) matrix, got shape {category_scores.shape}"
+            )
         
-        return weakest, recommendations[weakest], main_scores
+        area_scores = schema.area_scores(category_scores)
+        weakest = area_scores.argmin(axis=1)
+        return schema.area_name_lookup[weakest], schema.recommendation_lookup[weakest], area_scores
     
     def adapt_weights(self, feedback: Dict[str, Any]):
         """
         Adjust model weights based on feedback (adaptive learning)
         
+        When the student's component scores are known (from an earlier
+        rating, or passed as "features"), the feedback row is added to the
+        weight learner and the weights are refit by constrained least squares.
+        Otherwise the weak category's weight is nudged by 0.01.
+        
         Args:
             feedback: Dictionary with actual performance vs predicted
+                (optionally student_id, weak_category, features)
         """
-        # Simple adaptive learning - adjust weights based on error
         if "actual_rating" in feedback and "predicted_rating" in feedback:
             error = feedback["actual_rating"] - feedback["predicted_rating"]
             
             # Adjust weights slightly based on error direction
             adjustment = 0.01 * np.sign(error)
             
-            if "weak_category" in feedback:
-                category = feedback["weak_category"].lower()
-                if category in self.weights:
-                    # Increase weight for underperforming category
-                    self.weights[category] = min(0.5, self.weights[category] + abs(adjustment))
-                    # Normalize weights to sum to 1
-                    total = sum(self.weights.values())
-                    self.weights = {k: v / total for k, v in self.weights.items()}
+            def nudge(weights: Dict[str, float]) -> Dict[str, float]:
+                weights = dict(weights)
+                # Increase weight for underperforming category
+                weights[category] = min(0.5, weights[category] + abs(adjustment))
+                # Normalize weights to sum to 1
+                total = sum(weights.values())
+                return {k: v / total for k, v in weights.items()}
+            
+            with self._lock:
+                features = feedback.get("features")
+                if features is None:
+                    features = self._features.get(feedback.get("student_id"))
+                
+                if features is not None:
+                    self._learn(lambda: self.learner.partial_fit(features, feedback["actual_rating"]))
+                elif feedback.get("weak_category"):
+                    category = feedback["weak_category"].lower()
+                    if category in self._weights:
+                        if self._shared is not None:
+                            # Applied to the latest shared weights, under the file lock
+                            self._shared.update_weights(nudge)
+                        else:
+                            self.weights = nudge(self._weights)
+                
+                self.error_stats.add(abs(error))
+                if self._shared is not None:
+                    self._unsaved_errors.append(abs(error))
+            self._counters.add("feedback_count")
+    
+    def adapt_weights_batch(
+        self,
+        student_ids: List[str],
+        actual_ratings: np.ndarray,
+        predicted_ratings: np.ndarray
+    ) -> Dict[str, Any]:
+        """
+        Learn from a batch of feedback in one step
+        
+        Rows for students with a recorded rating are added to the weight
+        learner together and the weights are refit once. Rows for unknown
+        students only count towards the error statistics.
+        
+        Args:
+            student_ids: Student ids, one per feedback row
+            actual_ratings: Teacher ratings
+            predicted_ratings: Ratings the model gave
+            
+        Returns:
+            Summary with learned/unmatched row counts and the learner metrics
+        """
+        actual = np.asarray(actual_ratings, dtype=float)
+        predicted = np.asarray(predicted_ratings, dtype=float)
+        
+        with self._lock:
+            rows = [self._features.get(sid) for sid in student_ids]
+            matched = np.fromiter((r is not None for r in rows), dtype=bool, count=len(rows))
+            
+            if matched.any():
+                features = np.vstack([r for r in rows if r is not None])
+                self._learn(lambda: self.learner.partial_fit(features, actual[matched], max_iter=5000))
             
-            self.performance_metrics["feedback_count"] += 1
-            self.performance_metrics["accuracy_scores"].append(abs(error))
+            errors = np.abs(actual - predicted)
+            self.error_stats.add_many(errors)
+            if self._shared is not None:
+                self._unsaved_errors.extend(errors.tolist())
+        self._counters.add("feedback_count", len(actual))
+        
+        return {
+            "learned": int(matched.sum()),
+            "unmatched": int((~matched).sum()),
+            "weight_learning": self.learner.get_metrics()
+        }
+    
+    def fit_weights(self, features=None, actual_ratings=None) -> Dict[str, Any]:
+        """
+        Refit the weights in bulk
+        
+        Args:
+            features: Component scores, shape (n, 6) in weight order; if
+                omitted, refits on all feedback absorbed so far
+            actual_ratings: Actual ratings, shape (n,)
+            
+        Returns:
+            Convergence metrics of the fit
+        """
+        with self._lock:
+            if features is None:
+                self._learn(self.learner.refit)
+            else:
+                self._learn(lambda: self.learner.fit(features, actual_ratings))
+            return self.learner.get_metrics()
+    
+    def _learn(self, fit: Callable[[], Dict[str, float]]):
+        """
+        Run a weight-learner update and publish the weights (caller holds the lock)
+        
+        In shared mode the update runs under the shared-state lock on the
+        feedback statistics of all workers, and the merged statistics are
+        written back with the weights, so no worker publishes a fit of only
+        the feedback it happened to receive.
+        """
+        if self._shared is None:
+            self.weights = fit()
+            return
+        
+        def update(statistics, weights):
+            self.learner.set_statistics(statistics, weights)
+            weights = fit()
+            return self.learner.get_statistics(), weights
+        
+        self._shared.update_learning(update)
     
     def get_model_performance(self) -> Dict[str, Any]:
-        """Get model performance metrics"""
-        avg_error = (
-            np.mean(self.performance_metrics["accuracy_scores"])
-            if self.performance_metrics["accuracy_scores"]
-            else 0
-        )
+        """Get model performance metrics (constant time)"""
+        counters = self._counter_totals()
+        with self._lock:
+            errors = self.error_stats.summary()
         
         return {
-            "total_predictions": self.performance_metrics["total_predictions"],
-            "feedback_count": self.performance_metrics["feedback_count"],
-            "average_error": round(avg_error, 2),
-            "current_weights": self.weights,
-            "improvement_rate": self._calculate_improvement_rate()
+            "total_predictions": counters["total_predictions"],
+            "feedback_count": counters["feedback_count"],
+            "average_error": round(errors["mean"], 2),
+            "current_weights": dict(self.weights),
+            "improvement_rate": self._calculate_improvement_rate(errors),
+            "error_stats": {k: round(v, 3) for k, v in errors.items()},
+            "weight_learning": self.learner.get_metrics()
         }
     
-    def _calculate_improvement_rate(self) -> float:
+    def _calculate_improvement_rate(self, errors: Dict[str, Any]) -> float:
         """Calculate if model is improving over time"""
-        errors = self.performance_metrics["accuracy_scores"]
-        if len(errors) < 2:
+        if errors["count"] < 2:
             return 0.0
         
-        # Compare first half vs second half
-        mid = len(errors) // 2
-        first_half = np.mean(errors[:mid])
-        second_half = np.mean(errors[mid:])
+        # Compare the all-time average error with the recent window
+        overall = errors["mean"]
+        recent = errors["window_mean"]
         
-        if first_half == 0:
+        if overall == 0:
             return 0.0
         
-        improvement = ((first_half - second_half) / first_half) * 100
+        improvement = ((overall - recent) / overall) * 100
         return round(improvement, 2)
     
+    @timed("persistence")
     def save_model(self, filepath: str):
-        """Save model weights and history"""
-        model_data = {
-            "weights": self.weights,
-            "prediction_history": self.prediction_history,
-            "performance_metrics": self.performance_metrics,
-            "timestamp": datetime.now().isoformat()
-        }
-        joblib.dump(model_data, filepath)
-        print(f"Model saved to {filepath}")
+        """Save model weights and history (atomic replace)"""
+        if self._shared is not None:
+            self._save_shared(filepath)
+            logger.debug("Model saved", extra={"path": filepath, "shared": True})
+            return
+        
+        # Saves are serialized so a newer snapshot is never overwritten by an
+        # older one; predictions only wait for the snapshot, not the write
+        with self._save_lock:
+            model_data = {
+                "weights": dict(self.weights),
+                "prediction_history": self.prediction_history,
+                "performance_metrics": self.performance_metrics,
+                "weight_learner": self.learner.get_state(),
+                "timestamp": datetime.now().isoformat()
+            }
+            self._write_model_file(model_data, filepath)
+        logger.debug("Model saved", extra={"path": filepath})
+    
+    def _save_shared(self, filepath: str):
+        """Merge this process's unsaved history into the file other workers also write"""
+        self._flush_counters()
+        with self._save_lock:
+            with self._lock:
+                new_history = self._history[self._saved_history:]
+                new_errors, self._unsaved_errors = self._unsaved_errors, []
+                saved_history = len(self._history)
+            
+            with self._shared.exclusive():
+                existing = joblib.load(filepath) if os.path.exists(filepath) else {}
+                weights = self._shared.read_weights()
+                # Learner state from the statistics of all workers, not this process's
+                learner = WeightLearner(self.learner.feature_names, self.schema.default_weights)
+                learner.set_statistics(self._shared.read_statistics(), weights)
+                learner.metrics = dict(self.learner.metrics)
+                error_stats = self._error_stats_from(existing.get("performance_metrics", {}))
+                error_stats.add_many(new_errors)
+                metrics = self._shared.read_counters()
+                metrics["error_stats"] = error_stats.get_state()
+                model_data = {
+                    "weights": weights,
+                    "prediction_history": existing.get("prediction_history", []) + new_history,
+                    "performance_metrics": metrics,
+                    "weight_learner": learner.get_state(),
+                    "timestamp": datetime.now().isoformat()
+                }
+                self._write_model_file(model_data, filepath)
+            
+            self._saved_history = saved_history
+    
+    @staticmethod
+    def _write_model_file(model_data: Dict[str, Any], filepath: str):
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
+        joblib.dump(model_data, tmp_path)
+        os.replace(tmp_path, filepath)
     
     def load_model(self, filepath: str):
         """Load model weights and history"""
         if os.path.exists(filepath):
             model_data = joblib.load(filepath)
-            self.weights = model_data["weights"]
-            self.prediction_history = model_data["prediction_history"]
-            self.performance_metrics = model_data["performance_metrics"]
-            print(f"Model loaded from {filepath}")
+            with self._lock:
+                self.weights = model_data["weights"]
+                self.prediction_history = model_data["prediction_history"]
+                self.performance_metrics = model_data["performance_metrics"]
+                self.learner.set_state(model_data.get("weight_learner"))
+                self._saved_history = len(self._history)
+                self._unsaved_errors = []
+            logger.info("Model loaded", extra={"path": filepath, "history": len(self._history)})
         else:
-            print(f"No model found at {filepath}, using default weights")
+            logger.info("No model found, using default weights", extra={"path": filepath})
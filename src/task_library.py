@@ -0,0 +1,326 @@
+"""
+Reusable Task Library
+Persistent store of generated improvement tasks, deduplicated by content hash
+and indexed by category, difficulty and weak area
+"""
+
+import os
+import json
+import atexit
+import hashlib
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set
+
+from shared_state import file_lock
+
+
+# Per-plan fields that are not part of a task's identity
+PLAN_FIELDS = ("task_id", "created_date", "status", "source")
+
+DEFAULT_PATH = "models/task_library.json"
+
+# Serve counts alone are merged into the file at most this often (seconds)
+SAVE_INTERVAL = 60.0
+
+
+def _norm(value: Any) -> str:
+    """Normalize a text field for hashing and index keys"""
+    return " ".join(str(value or "").lower().split())
+
+
+class TaskLibrary:
+    """
+    Library of tasks generated for previous students.
+
+    Tasks are keyed by a hash of their content (title, description, category,
+    difficulty), so the same task generated twice is stored once. Index sets
+    map category, difficulty and weak area to task hashes for fast lookup.
+    Access is guarded by a lock so concurrent plan generation can share it.
+
+    Several processes may use the same file: save() merges under a file lock,
+    adding this instance's new tasks and weak areas and its serve counts
+    since the last save to what is on disk, then reloads the merged library.
+    Within one process, use shared() so every model serves from one copy.
+    Serve counts only affect rotation, so save_if_due() merges them at most
+    every SAVE_INTERVAL seconds; shared libraries are flushed at exit.
+    """
+
+    _shared: Dict[str, "TaskLibrary"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, filepath: str = DEFAULT_PATH):
+        self.filepath = filepath
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+
+        self._by_category: Dict[str, Set[str]] = defaultdict(set)
+        self._by_difficulty: Dict[str, Set[str]] = defaultdict(set)
+        self._by_weak_area: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.RLock()
+        # Changes not yet merged into the file: serve counts and new tasks/weak areas
+        self._served_since_save: Counter = Counter()
+        self._changed_since_save: Set[str] = set()
+        self._last_save = time.monotonic()
+
+        if filepath and os.path.exists(filepath):
+            self.load()
+
+    @classmethod
+    def shared(cls, filepath: str = DEFAULT_PATH) -> "TaskLibrary":
+        """Process-wide library for a file (created and loaded on first use)"""
+        key = os.path.abspath(filepath)
+        with cls._shared_lock:
+            library = cls._shared.get(key)
+            if library is None:
+                if not cls._shared:
+                    atexit.register(cls.flush_shared)
+                library = cls._shared[key] = cls(filepath)
+            return library
+
+    @classmethod
+    def flush_shared(cls):
+        """Save every process-wide library that has unsaved changes"""
+        with cls._shared_lock:
+            libraries = list(cls._shared.values())
+        for library in libraries:
+            if library.dirty:
+                library.save()
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault("_served_since_save", Counter())
+        self.__dict__.setdefault("_changed_since_save", set())
+        self._last_save = time.monotonic()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def task_hash(task: Dict[str, Any]) -> str:
+        """Content hash identifying a task independent of the plan it came from"""
+        content = "|".join(
+            _norm(task.get(field))
+            for field in ("title", "description", "category", "difficulty")
+        )
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+    def _index(self, task_hash: str, task: Dict[str, Any]):
+        """Add a stored task to the lookup indexes"""
+        self._by_category[_norm(task.get("category"))].add(task_hash)
+        self._by_difficulty[_norm(task.get("difficulty"))].add(task_hash)
+        for area in task.get("weak_areas", []):
+            self._by_weak_area[_norm(area)].add(task_hash)
+
+    def add(self, task: Dict[str, Any], weak_area: str) -> bool:
+        """
+        Store a generated task.
+
+        Args:
+            task: Task dictionary as produced by the task generator
+            weak_area: Weakest area of the student the task was generated for
+
+        Returns:
+            True if the task was new, False if it was already in the library
+        """
+        task_hash = self.task_hash(task)
+        with self._lock:
+            existing = self.tasks.get(task_hash)
+
+            if existing is not None:
+                if weak_area not in existing["weak_areas"]:
+                    existing["weak_areas"].append(weak_area)
+                    self._by_weak_area[_norm(weak_area)].add(task_hash)
+                    self._changed_since_save.add(task_hash)
+                return False
+
+            stored = {k: v for k, v in task.items() if k not in PLAN_FIELDS}
+            stored["task_hash"] = task_hash
+            stored["weak_areas"] = [weak_area]
+            stored["times_served"] = 0
+            stored["added_date"] = datetime.now().isoformat()
+
+            self.tasks[task_hash] = stored
+            self._index(task_hash, stored)
+            self._changed_since_save.add(task_hash)
+            return True
+
+    def add_many(self, tasks: List[Dict[str, Any]], weak_area: str) -> int:
+        """Store several tasks, returns the number of new ones"""
+        with self._lock:
+            return sum(self.add(task, weak_area) for task in tasks)
+
+    def find(
+        self,
+        category: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        weak_area: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Look up stored tasks; all given filters must match.
+
+        Args:
+            category: Focus area the task addresses
+            difficulty: Easy/Medium/Hard
+            weak_area: Weakest area the task was generated for
+            limit: Maximum number of tasks to return
+
+        Returns:
+            List of task copies, least-served first
+        """
+        with self._lock:
+            selected = None
+            for index, key in (
+                (self._by_category, category),
+                (self._by_difficulty, difficulty),
+                (self._by_weak_area, weak_area)
+            ):
+                if key is None:
+                    continue
+                hashes = index.get(_norm(key), set())
+                selected = hashes if selected is None else selected & hashes
+
+            if selected is None:
+                selected = self.tasks.keys()
+
+            matches = sorted(
+                (self.tasks[h] for h in selected),
+                key=lambda t: (t["times_served"], t["added_date"])
+            )
+            if limit is not None:
+                matches = matches[:limit]
+            return [dict(task) for task in matches]
+
+    def serve(
+        self,
+        weak_area: str,
+        focus_areas: List[str],
+        num_tasks: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Build a task list for a new plan from the library.
+
+        Tasks generated for the same weak area are used, preferring those
+        whose category is one of the plan's focus areas.
+
+        Args:
+            weak_area: Student's weakest area
+            focus_areas: Key focus areas of the merged strategy
+            num_tasks: Number of tasks needed
+
+        Returns:
+            Task list ready for a plan, or None if the library cannot fill it
+        """
+        with self._lock:
+            candidates = self.find(weak_area=weak_area)
+            if len(candidates) < num_tasks:
+                return None
+
+            focus = {_norm(area) for area in focus_areas}
+            candidates.sort(key=lambda t: _norm(t.get("category")) not in focus)
+
+            tasks = []
+            for i, task in enumerate(candidates[:num_tasks]):
+                self.tasks[task["task_hash"]]["times_served"] += 1
+                self._served_since_save[task["task_hash"]] += 1
+                for key in ("times_served", "weak_areas", "added_date"):
+                    task.pop(key, None)
+                task.update({
+                    "task_id": i + 1,
+                    "created_date": datetime.now().isoformat(),
+                    "status": "pending",
+                    "source": "library"
+                })
+                tasks.append(task)
+            return tasks
+
+    @property
+    def dirty(self) -> bool:
+        """Whether there are tasks, weak areas or serve counts not yet saved"""
+        return bool(self._served_since_save or self._changed_since_save)
+
+    def save_if_due(self, interval: float = SAVE_INTERVAL) -> bool:
+        """
+        Save if there are new tasks or weak areas, or serve counts older than `interval` seconds.
+
+        Returns:
+            True if the library was saved
+        """
+        with self._lock:
+            due = bool(self._changed_since_save) or (
+                bool(self._served_since_save) and time.monotonic() - self._last_save >= interval
+            )
+        if due:
+            self.save()
+        return due
+
+    def save(self, filepath: Optional[str] = None):
+        """
+        Merge this library into the file (atomic replace under a file lock).
+
+        Tasks other processes saved meanwhile are kept, serve counts are added
+        to the ones on disk, and the merged library is loaded back.
+        """
+        filepath = filepath or self.filepath
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+
+        with file_lock(f"{filepath}.lock"), self._lock:
+            merged = self._read(filepath) if os.path.exists(filepath) else {}
+            for task_hash, task in self.tasks.items():
+                on_disk = merged.get(task_hash)
+                if on_disk is None:
+                    merged[task_hash] = dict(task)
+                    continue
+                for area in task["weak_areas"]:
+                    if area not in on_disk["weak_areas"]:
+                        on_disk["weak_areas"].append(area)
+                on_disk["times_served"] += self._served_since_save[task_hash]
+
+            tmp_path = f"{filepath}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"tasks": list(merged.values())}, f, indent=2)
+            os.replace(tmp_path, filepath)
+
+            self._replace(merged)
+            self._last_save = time.monotonic()
+
+    def load(self, filepath: Optional[str] = None):
+        """Load the library from disk and rebuild the indexes (unsaved changes are dropped)"""
+        filepath = filepath or self.filepath
+        tasks = self._read(filepath)
+        with self._lock:
+            self._replace(tasks)
+
+    def _read(self, filepath: str) -> Dict[str, Dict[str, Any]]:
+        """Tasks stored in a library file, keyed by hash"""
+        with open(filepath, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        tasks = {}
+        for task in data.get("tasks", []):
+            task_hash = task.get("task_hash") or self.task_hash(task)
+            task["task_hash"] = task_hash
+            task.setdefault("weak_areas", [])
+            task.setdefault("times_served", 0)
+            task.setdefault("added_date", datetime.now().isoformat())
+            tasks[task_hash] = task
+        return tasks
+
+    def _replace(self, tasks: Dict[str, Dict[str, Any]]):
+        """Swap in a full task set and rebuild the indexes (caller holds the lock)"""
+        self.tasks = tasks
+        self._by_category.clear()
+        self._by_difficulty.clear()
+        self._by_weak_area.clear()
+        for task_hash, task in tasks.items():
+            self._index(task_hash, task)
+        self._served_since_save.clear()
+        self._changed_since_save.clear()
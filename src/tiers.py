@@ -0,0 +1,135 @@
+"""
+Rating Tiers
+Tier banding (ELITE ... NEEDS IMPROVEMENT) for single ratings and whole cohorts
+"""
+
+import numpy as np
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Sequence
+
+
+class Tier(NamedTuple):
+    """One tier band: ratings >= min_rating (up to the next tier) fall in it"""
+    name: str
+    label: str
+    min_rating: float
+    color: str
+
+
+DEFAULT_TIERS = (
+    Tier("NEEDS IMPROVEMENT", "NEEDS IMPROVEMENT ⚠️", 0, "#dc3545"),
+    Tier("DEVELOPING", "DEVELOPING", 50, "#fd7e14"),
+    Tier("GOOD", "GOOD ⭐", 65, "#ffc107"),
+    Tier("EXCELLENT", "EXCELLENT ⭐⭐", 75, "#17a2b8"),
+    Tier("ELITE", "ELITE ⭐⭐⭐", 85, "#28a745"),
+)
+
+
+class TierClassifier:
+    """
+    Maps overall ratings to tiers.
+
+    Tiers are kept in ascending order of their lower bound; a rating belongs
+    to the highest tier whose min_rating it reaches. The lowest tier also
+    takes anything below its bound. Batch classification is one
+    np.searchsorted over the bounds, so cohorts need no per-row branching.
+    """
+
+    def __init__(self, tiers: Optional[Iterable[Tier]] = None):
+        tiers = sorted(tiers if tiers is not None else DEFAULT_TIERS, key=lambda t: t.min_rating)
+        if not tiers:
+            raise ValueError("At least one tier is required")
+        bounds = [t.min_rating for t in tiers]
+        if len(set(bounds)) != len(bounds):
+            raise ValueError(f"Tier bounds must be distinct, got {bounds}")
+
+        self.tiers = tuple(tiers)
+        self.names = tuple(t.name for t in self.tiers)
+        # Bounds above the lowest tier; searchsorted against these gives the tier index
+        self._bounds = np.array(bounds[1:], dtype=float)
+        self._labels = np.array([t.label for t in self.tiers], dtype=object)
+
+    @classmethod
+    def from_thresholds(cls, thresholds: Sequence[float]) -> "TierClassifier":
+        """
+        Default tier names with custom lower bounds.
+
+        Args:
+            thresholds: Lower bounds of DEVELOPING, GOOD, EXCELLENT and ELITE
+                (ascending), e.g. [50, 65, 75, 85]
+
+        Returns:
+            TierClassifier using those bounds
+        """
+        if len(thresholds) != len(DEFAULT_TIERS) - 1:
+            raise ValueError(f"Expected {len(DEFAULT_TIERS) - 1} thresholds, got {len(thresholds)}")
+        bounds = [DEFAULT_TIERS[0].min_rating] + [float(t) for t in thresholds]
+        if any(lo >= hi for lo, hi in zip(bounds, bounds[1:])):
+            raise ValueError(f"Thresholds must be strictly ascending, got {list(thresholds)}")
+        return cls(tier._replace(min_rating=bound) for tier, bound in zip(DEFAULT_TIERS, bounds))
+
+    def classify(self, rating: float) -> Tier:
+        """Tier for one rating"""
+        return self.tiers[int(np.searchsorted(self._bounds, rating, side="right"))]
+
+    def label(self, rating: float) -> str:
+        """Display label for one rating, e.g. 'EXCELLENT ⭐⭐'"""
+        return self.classify(rating).label
+
+    def classify_batch(self, ratings: Iterable[float]) -> np.ndarray:
+        """
+        Tier indices for many ratings.
+
+        Args:
+            ratings: Overall ratings (any array-like)
+
+        Returns:
+            Integer array of indices into self.tiers
+        """
+        return np.searchsorted(self._bounds, np.asarray(ratings, dtype=float), side="right")
+
+    def labels_batch(self, ratings: Iterable[float]) -> np.ndarray:
+        """Display labels for many ratings (object array)"""
+        return self._labels[self.classify_batch(ratings)]
+
+    def histogram(self, ratings: Iterable[float], assume_sorted: bool = False) -> Dict[str, int]:
+        """
+        Number of ratings per tier.
+
+        Args:
+            ratings: Overall ratings
+            assume_sorted: Ratings are already ascending (e.g. from the
+                leaderboard); counts then come from one bisect per tier
+                bound instead of classifying every rating
+
+        Returns:
+            Dictionary of tier name -> count, lowest tier first
+        """
+        ratings = np.asarray(ratings, dtype=float)
+        if assume_sorted:
+            edges = np.searchsorted(ratings, self._bounds, side="left")
+            counts = np.diff(np.concatenate(([0], edges, [len(ratings)])))
+        else:
+            counts = np.bincount(self.classify_batch(ratings), minlength=len(self.tiers))
+        return dict(zip(self.names, counts.tolist()))
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Tier table (name, label, min_rating, exclusive upper_bound, color), lowest tier first"""
+        upper = list(self._bounds) + [None]
+        return [
+            {
+                "name": tier.name,
+                "label": tier.label,
+                "min_rating": tier.min_rating,
+                "upper_bound": float(hi) if hi is not None else None,
+                "color": tier.color
+            }
+            for tier, hi in zip(self.tiers, upper)
+        ]
+
+
+default_classifier = TierClassifier()
+
+# API responses keep the lowest tier's original label (no emoji), as clients
+# have always received it; the web app shows the DEFAULT_TIERS labels
+API_TIERS = (DEFAULT_TIERS[0]._replace(label="NEEDS IMPROVEMENT"),) + DEFAULT_TIERS[1:]
+api_classifier = TierClassifier(API_TIERS)
@@ -0,0 +1,221 @@
+"""
+Weight Learning Engine
+Constrained least-squares fitting of rating weights from actual-vs-predicted
+teacher feedback
+"""
+
+import time
+import numpy as np
+from typing import Dict, Any, Iterable, Optional, Sequence, Tuple
+
+
+def project_to_simplex(v: np.ndarray) -> np.ndarray:
+    """Euclidean projection onto {w : w >= 0, sum(w) = 1}"""
+    u = np.sort(v)[::-1]
+    css = np.cumsum(u) - 1.0
+    idx = np.arange(1, len(v) + 1)
+    rho = idx[u - css / idx > 0][-1]
+    return np.maximum(v - css[rho - 1] / rho, 0.0)
+
+
+class WeightLearner:
+    """
+    Learn rating weights w minimizing ||X w - y||^2 subject to w >= 0, sum(w) = 1.
+
+    X holds the per-component scores (1-100) a rating was computed from and y
+    the teacher's actual rating. Only the sufficient statistics X'X, X'y, y'y
+    and n are kept, so a feedback row costs O(d^2) to absorb no matter how
+    many came before, and a refit is a d-dimensional problem solved with
+    accelerated projected gradient descent. A ridge term pulls towards the
+    prior weights; it is worth prior_samples feedback rows (plus a small
+    constant l2), so a handful of rows cannot swing the weights wildly while
+    large batches are fit almost purely from data.
+    """
+
+    def __init__(
+        self,
+        feature_names: Iterable[str],
+        prior_weights: Dict[str, float],
+        prior_samples: float = 20.0,
+        l2: float = 0.001,
+        tol: float = 1e-7,
+        chunk_size: int = 262144
+    ):
+        self.feature_names = tuple(feature_names)
+        self.prior = np.array([prior_weights[n] for n in self.feature_names], dtype=float)
+        self.prior_samples = prior_samples
+        self.l2 = l2
+        self.tol = tol
+        self.chunk_size = chunk_size
+
+        d = len(self.feature_names)
+        self._gram = np.zeros((d, d))
+        self._xty = np.zeros(d)
+        self._yty = 0.0
+        self.n_samples = 0
+
+        self.weights = self.prior.copy()
+        self.metrics: Dict[str, Any] = {}
+
+    # ---- Sufficient statistics ----
+
+    def _accumulate(self, X: np.ndarray, y: np.ndarray):
+        """Add rows to X'X, X'y, y'y in chunks (bounded temporary memory)"""
+        for start in range(0, len(y), self.chunk_size):
+            Xc = X[start:start + self.chunk_size]
+            yc = y[start:start + self.chunk_size]
+            self._gram += Xc.T @ Xc
+            self._xty += Xc.T @ yc
+            self._yty += float(yc @ yc)
+        self.n_samples += len(y)
+
+    @staticmethod
+    def _as_arrays(X, y):
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        if X.shape[0] != y.shape[0]:
+            raise ValueError(f"X has {X.shape[0]} rows but y has {y.shape[0]}")
+        return X, y
+
+    # ---- Fitting ----
+
+    def partial_fit(self, X, y, max_iter: int = 200) -> Dict[str, float]:
+        """
+        Absorb new feedback rows and update the weights (warm start).
+
+        Args:
+            X: Component scores, shape (n, d) or (d,)
+            y: Actual ratings, shape (n,) or scalar
+
+        Returns:
+            Updated weights by name
+        """
+        X, y = self._as_arrays(X, y)
+        self._accumulate(X, y)
+        return self._solve(max_iter)
+
+    def fit(self, X, y, max_iter: int = 5000) -> Dict[str, float]:
+        """
+        Refit from scratch on a (possibly very large) feedback batch.
+
+        Args:
+            X: Component scores, shape (n, d)
+            y: Actual ratings, shape (n,)
+
+        Returns:
+            Fitted weights by name
+        """
+        X, y = self._as_arrays(X, y)
+        self.reset()
+        self._accumulate(X, y)
+        return self._solve(max_iter)
+
+    def refit(self, max_iter: int = 5000) -> Dict[str, float]:
+        """Solve to convergence on all feedback absorbed so far"""
+        return self._solve(max_iter)
+
+    def reset(self):
+        """Forget all feedback and return to the prior weights"""
+        self._gram[:] = 0.0
+        self._xty[:] = 0.0
+        self._yty = 0.0
+        self.n_samples = 0
+        self.weights = self.prior.copy()
+        self.metrics = {}
+
+    def _solve(self, max_iter: int) -> Dict[str, float]:
+        """FISTA on 0.5 w'Aw - c'w over the simplex, A = X'X/n + lam*I"""
+        if self.n_samples == 0:
+            return self.get_weights()
+
+        started = time.perf_counter()
+        d = len(self.prior)
+        gram = self._gram / self.n_samples
+        lam = (self.l2 + self.prior_samples / self.n_samples) * np.trace(gram) / d
+        A = gram + lam * np.eye(d)
+        c = self._xty / self.n_samples + lam * self.prior
+        step = 1.0 / np.linalg.eigvalsh(A)[-1]
+
+        w = self.weights.copy()
+        z, t = w.copy(), 1.0
+        delta = np.inf
+        iterations = 0
+        for iterations in range(1, max_iter + 1):
+            w_next = project_to_simplex(z - step * (A @ z - c))
+            delta = float(np.abs(w_next - w).max())
+            t_next = (1.0 + np.sqrt(1.0 + 4.0 * t * t)) / 2.0
+            z = w_next + ((t - 1.0) / t_next) * (w_next - w)
+            w, t = w_next, t_next
+            if delta < self.tol:
+                break
+
+        self.weights = w
+        self.metrics = {
+            "iterations": iterations,
+            "converged": delta < self.tol,
+            "final_step": delta,
+            "rmse": round(self._rmse(w), 4),
+            "rmse_prior_weights": round(self._rmse(self.prior), 4),
+            "solve_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+        return self.get_weights()
+
+    def _rmse(self, w: np.ndarray) -> float:
+        """Training RMSE of weights w from the sufficient statistics"""
+        sse = w @ self._gram @ w - 2.0 * (w @ self._xty) + self._yty
+        return float(np.sqrt(max(sse, 0.0) / self.n_samples))
+
+    # ---- Reporting / persistence ----
+
+    def get_weights(self) -> Dict[str, float]:
+        return dict(zip(self.feature_names, self.weights.tolist()))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Convergence metrics of the last solve"""
+        return {"n_samples": self.n_samples, **self.metrics}
+
+    def get_state(self) -> Dict[str, Any]:
+        """Plain-data state for saving with the model"""
+        return {
+            "feature_names": list(self.feature_names),
+            "gram": self._gram.tolist(),
+            "xty": self._xty.tolist(),
+            "yty": self._yty,
+            "n_samples": self.n_samples,
+            "weights": self.weights.tolist(),
+            "metrics": self.metrics
+        }
+
+    def get_statistics(self) -> Tuple[float, ...]:
+        """Sufficient statistics as a flat vector: X'X, X'y, y'y, n"""
+        return (*self._gram.ravel().tolist(), *self._xty.tolist(), self._yty, float(self.n_samples))
+
+    def set_statistics(self, values: Sequence[float], weights: Optional[Dict[str, float]] = None):
+        """
+        Replace the sufficient statistics (e.g. with the totals of all workers).
+
+        Args:
+            values: Flat vector from get_statistics
+            weights: Current weights to warm-start the next solve from
+        """
+        d = len(self.feature_names)
+        values = np.asarray(values, dtype=float)
+        if values.shape != (d * d + d + 2,):
+            raise ValueError(f"Expected {d * d + d + 2} statistics, got {values.shape[0]}")
+        self._gram = values[:d * d].reshape(d, d).copy()
+        self._xty = values[d * d:d * d + d].copy()
+        self._yty = float(values[-2])
+        self.n_samples = int(values[-1])
+        if weights is not None:
+            self.weights = np.array([weights[n] for n in self.feature_names], dtype=float)
+
+    def set_state(self, state: Optional[Dict[str, Any]]):
+        """Restore state saved by get_state (ignored if the features differ)"""
+        if not state or tuple(state.get("feature_names", ())) != self.feature_names:
+            return
+        self._gram = np.array(state["gram"], dtype=float)
+        self._xty = np.array(state["xty"], dtype=float)
+        self._yty = float(state["yty"])
+        self.n_samples = int(state["n_samples"])
+        self.weights = np.array(state["weights"], dtype=float)
+        self.metrics = dict(state.get("metrics", {}))
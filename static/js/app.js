@@ -37,7 +37,8 @@ async function analyzeStudent(event) {
     showLoading(true);
     
     try {
-        const response = await fetch('/api/analyze', {
+        // Streaming endpoint: rating arrives first, AI suggestions follow token by token
+        const response = await fetch('/api/analyze/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -49,9 +50,15 @@ async function analyzeStudent(event) {
             throw new Error('Analysis failed');
         }
         
-        const data = await response.json();
-        currentAnalysis = data;
-        displayResults(data);
+        await readEventStream(response, (eventName, data) => {
+            if (eventName === 'analysis') {
+                currentAnalysis = data;
+                displayResults(data);
+                showLoading(false);
+            } else if (eventName === 'token') {
+                appendAiSuggestion(data.text);
+            }
+        });
         
     } catch (error) {
         alert('Error: ' + error.message);
@@ -60,6 +67,40 @@ async function analyzeStudent(event) {
     }
 }
 
+// Read a Server-Sent Events response body, calling onEvent(name, data) per message
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const message = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let eventName = 'message';
+            let dataText = '';
+            message.split('\n').forEach(line => {
+                if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                else if (line.startsWith('data:')) dataText += line.slice(5).trim();
+            });
+            
+            if (dataText) onEvent(eventName, JSON.parse(dataText));
+        }
+    }
+}
+
+// Append a streamed chunk of AI suggestions
+function appendAiSuggestion(text) {
+    document.getElementById('ai-section').style.display = 'block';
+    document.getElementById('ai-content').textContent += text;
+}
+
 // Display results
 function displayResults(data) {
     // Update overall rating
@@ -99,6 +140,7 @@ function displayResults(data) {
         document.getElementById('ai-content').textContent = data.ai_suggestions;
     } else {
         document.getElementById('ai-section').style.display = 'none';
+        document.getElementById('ai-content').textContent = '';
     }
     
     // Show results
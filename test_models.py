@@ -89,6 +89,26 @@ except Exception as e:
     print(f"   ✗ Error: {e}")
     print()
 
+# Check Startup Budget
+print("4. Checking Startup Budget...")
+startup_ok = True
+try:
+    sys.path.insert(0, 'benchmarks')
+    from startup_benchmark import run_startup_benchmark, check_budget
+    
+    startup = run_startup_benchmark(repeat=1)
+    print(f"   ✓ API import: {startup['api_import']:.2f}s")
+    print(f"   ✓ API first response: {startup['api_first_response']:.2f}s")
+    print(f"   ✓ Webapp model imports: {startup['webapp_import']:.2f}s")
+    for violation in check_budget(startup):
+        startup_ok = False
+        print(f"   ✗ Budget: {violation}")
+    print()
+except Exception as e:
+    startup_ok = False
+    print(f"   ✗ Error: {e}")
+    print()
+
 print("=" * 60)
 print("All tests completed!")
 print()
@@ -96,3 +116,6 @@ print("Tips:")
 print("- Set GROQ_API_KEY environment variable for AI-powered features")
 print("- Run 'python app.py' to start the web application")
 print("=" * 60)
+
+if not startup_ok:
+    sys.exit(1)
@@ -0,0 +1,65 @@
+"""
+Shared test setup: modules are imported from src/ (as the app does) and
+per-call logs and stage timers are kept quiet
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+os.environ.setdefault("STUDENT_RATING_LOG_LEVEL", "WARNING")
+os.environ.setdefault("STUDENT_RATING_METRICS", "0")
+
+
+class StubSuggestionGenerator:
+    """Stands in for GroqSuggestionGenerator in the API"""
+
+    PLAN = "1. Practice daily.\n2. Review mistakes.\n"
+
+    def generate_improvement_plan(self, *args, **kwargs) -> str:
+        return self.PLAN
+
+    def stream_improvement_plan(self, *args, **kwargs):
+        yield from self.PLAN.splitlines(keepends=True)
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """
+    The API module with fresh model state, a scratch model file and a Groq stub
+
+    Every global that holds the model or accumulates traffic is replaced, so
+    tests never touch models/ or the live aggregates. Use TestClient(api.app).
+    """
+    monkeypatch.setenv("GROQ_API_KEY", "")
+    if os.path.join(ROOT, "api") not in sys.path:
+        sys.path.insert(0, os.path.join(ROOT, "api"))
+    import main
+    from cohorts import SchemaCohorts
+    from job_queue import JobQueue
+    from leaderboard import SchemaLeaderboards
+    from request_coalescer import RequestCoalescer
+    from sensitivity import SensitivityAnalyzer
+    from student_rating import StudentRatingModel
+
+    model = StudentRatingModel()
+    job_queue = JobQueue(max_workers=1)
+    job_queue.register_handler("ai_suggestions", main._generate_ai_suggestions)
+    for name, value in {
+        "model": model,
+        "model_path": str(tmp_path / "student_rating_model.pkl"),
+        "leaderboards": SchemaLeaderboards(model.schema.name),
+        "cohorts": SchemaCohorts(model.schema.name, main.tier_classifier),
+        "sensitivity": SensitivityAnalyzer(model, main.tier_classifier),
+        "job_queue": job_queue,
+        "coalescer": RequestCoalescer(ttl_seconds=main.coalescer.ttl_seconds),
+        "groq_client": StubSuggestionGenerator(),
+        "groq_available": True
+    }.items():
+        monkeypatch.setattr(main, name, value)
+    yield main
+    job_queue.shutdown(wait=True)
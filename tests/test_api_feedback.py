@@ -0,0 +1,73 @@
+"""Tests for /api/feedback/bulk: formats, row validation report, matching and errors"""
+
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+STUDENT = {
+    "student_id": "a", "attendance": 90, "homework": 8, "classwork": 7, "class_focus": 75,
+    "exam": 70, "problem_solving": 8, "communication": 7, "discipline": 9
+}
+ROWS = [
+    {"student_id": "a", "actual_rating": 80, "predicted_rating": 75},
+    {"student_id": "bad", "actual_rating": 200, "predicted_rating": 3},
+    {"student_id": "zz", "actual_rating": 60, "predicted_rating": 62},
+]
+
+
+@pytest.fixture
+def client(api):
+    client = TestClient(api.app)
+    assert client.post("/api/analyze", json=STUDENT).status_code == 200
+    return client
+
+
+@pytest.mark.parametrize("content_type, body", [
+    ("text/csv", "student_id,actual_rating,predicted_rating\na,80,75\nbad,200,3\nzz,60,62\n"),
+    ("application/x-ndjson", "\n".join(json.dumps(r) for r in ROWS)),
+    ("application/json", json.dumps(ROWS)),
+])
+def test_batch_is_validated_matched_and_learned(api, client, content_type, body):
+    response = client.post("/api/feedback/bulk", content=body, headers={"content-type": content_type})
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["received"], result["valid"], result["invalid"]) == (3, 2, 1)
+    assert result["invalid_rows"] == [2]
+    # "a" was rated before, "zz" was not
+    assert (result["learned"], result["unmatched"]) == (1, 1)
+    assert result["weight_learning"]["n_samples"] >= 1
+    assert api.model.performance_metrics["feedback_count"] == 2
+    assert os.path.exists(api.model_path)
+
+
+def test_format_parameter_overrides_the_content_type(client):
+    response = client.post("/api/feedback/bulk?format=json", content=json.dumps(ROWS[:1]),
+                           headers={"content-type": "text/plain"})
+    assert response.status_code == 200
+    assert response.json()["learned"] == 1
+
+
+def test_only_invalid_rows_learn_nothing(client):
+    response = client.post("/api/feedback/bulk", content="student_id,actual_rating,predicted_rating\nbad,200,3\n",
+                           headers={"content-type": "text/csv"})
+    assert response.status_code == 200
+    assert response.json()["valid"] == 0
+    assert (response.json()["learned"], response.json()["unmatched"]) == (0, 0)
+
+
+@pytest.mark.parametrize("content_type, body, detail", [
+    ("application/json", "[{\"student_id\": ", "Could not parse json feedback"),
+    ("text/csv", "student_id,actual_rating\na,80\n", "Missing required column(s): predicted_rating"),
+])
+def test_malformed_body_is_a_400(client, content_type, body, detail):
+    response = client.post("/api/feedback/bulk", content=body, headers={"content-type": content_type})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith(detail)
+
+
+def test_unknown_content_type_is_a_415(client):
+    response = client.post("/api/feedback/bulk", content="<rows/>", headers={"content-type": "application/xml"})
+    assert response.status_code == 415
@@ -0,0 +1,60 @@
+"""Tests for /api/analyze/stream: event order, payloads and the path without Groq"""
+
+import json
+
+from fastapi.testclient import TestClient
+
+STUDENT = {
+    "student_id": "STREAM1", "attendance": 90, "homework": 8, "classwork": 7, "class_focus": 75,
+    "exam": 40, "problem_solving": 8, "communication": 7, "discipline": 9
+}
+
+
+def events(response):
+    """(event, data) pairs of a Server-Sent Events body"""
+    parsed = []
+    for message in response.text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.splitlines())
+        parsed.append((fields["event"], json.loads(fields["data"])))
+    return parsed
+
+
+def test_analysis_then_tokens_then_done(api):
+    response = TestClient(api.app).post("/api/analyze/stream", json=STUDENT)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    stream = events(response)
+    names = [name for name, _ in stream]
+    assert names[0] == "analysis" and names[-1] == "done"
+    assert set(names[1:-1]) == {"token"} and len(names) > 3
+
+    analysis = stream[0][1]
+    assert analysis["student_id"] == "STREAM1"
+    assert analysis["weak_category"] == "Exam"
+    assert analysis["tier"] == api.tier_classifier.label(analysis["overall_rating"])
+    assert set(analysis["all_scores"]) == set(api.model.schema.area_names)
+    # The rating was stored like /api/analyze does
+    assert api.leaderboards.board().get("STREAM1")["overall_rating"] == analysis["overall_rating"]
+
+    text = "".join(data["text"] for name, data in stream if name == "token")
+    assert text == api.groq_client.PLAN
+    assert "timestamp" in stream[-1][1]
+
+
+def test_without_groq_only_analysis_and_done(api, monkeypatch):
+    monkeypatch.setattr(api, "groq_available", False)
+    monkeypatch.setattr(api, "groq_client", None)
+
+    stream = events(TestClient(api.app).post("/api/analyze/stream", json=STUDENT))
+
+    assert [name for name, _ in stream] == ["analysis", "done"]
+    assert stream[0][1]["student_id"] == "STREAM1"
+
+
+def test_missing_inputs_are_rejected_before_streaming(api):
+    student = {k: v for k, v in STUDENT.items() if k != "exam"}
+    response = TestClient(api.app).post("/api/analyze/stream", json=student)
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Inputs for schema 'default': missing exam"
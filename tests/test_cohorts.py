@@ -0,0 +1,134 @@
+"""Tests for cohort aggregates: hierarchical groups, replace/withdraw and quantiles"""
+
+import numpy as np
+import pytest
+
+from cohorts import CohortAnalytics, SchemaCohorts, group_name, normalize_name
+from running_stats import merge_moments
+
+
+def result(student_id, rating, school=None, grade=None, class_name=None):
+    cohort = {k: v for k, v in (("school", school), ("grade", grade), ("class", class_name)) if v}
+    return {"student_id": student_id, "overall_rating": rating, "cohort": cohort}
+
+
+def test_grades_and_classes_are_keyed_by_school():
+    analytics = CohortAnalytics()
+    analytics.update(result("n1", 90, "north", "7", "A"))
+    analytics.update(result("s1", 40, "south", "7", "A"))
+    analytics.update(result("n2", 70, "north", "8", "A"))
+
+    assert analytics.summary("class", "north/7/A")["mean"] == 90
+    assert analytics.summary("class", "south/7/A")["mean"] == 40
+    assert analytics.summary("class", "north/8/A")["count"] == 1
+    assert analytics.summary("grade", "north/7")["count"] == 1
+    assert analytics.summary("school", "north")["count"] == 2
+    assert analytics.summary("class", "A") is None
+    # A level that is not given stays empty in the path
+    assert CohortAnalytics.group_keys({"grade": "7"}) == (("all", "all"), ("grade", "/7"))
+    assert group_name("north", None, "A") == "north//A"
+
+
+def test_equivalent_grade_and_class_names_share_a_group():
+    analytics = CohortAnalytics()
+    analytics.update(result("a", 60, "north", "07", "A"))
+    analytics.update(result("b", 80, "north ", 7, " A"))
+    analytics.update(result("c", 70, "north", "7.0", "A"))
+
+    assert [normalize_name(n) for n in ("07", " 7 ", 7.0, "7.0", "7b", "1e3", "", None)] == [
+        "7", "7", "7", "7", "7b", "1e3", None, None
+    ]
+    assert analytics.summary("class", "north/7/A")["count"] == 3
+    # Lookups are normalised the same way
+    assert analytics.summary("grade", "north/07")["count"] == 3
+    assert [g["name"] for g in analytics.groups("grade")] == ["north/7"]
+
+
+def test_schema_cohorts_keep_each_schema_apart():
+    class Model:
+        """Weakest area of every result is "Exam" (enough for seeding)"""
+        def subcategory_matrix(self, results, schema=None):
+            return results
+
+        def recommend_improvement_batch(self, matrix, schema=None):
+            return ["Exam"] * len(matrix), None, None
+
+    cohorts = SchemaCohorts.from_history([
+        {"student_id": "a", "overall_rating": 60.0, "cohort": {"school": "north"}},
+        {"student_id": "a", "overall_rating": 90.0, "schema": "exam_focused", "cohort": {"school": "north"}},
+        {"student_id": "b", "overall_rating": 80.0, "schema": "exam_focused", "cohort": {"school": "north"}},
+    ], Model(), schemas={"exam_focused": object()})
+
+    assert cohorts.names() == ["default", "exam_focused"]
+    assert cohorts.analytics().summary("school", "north")["mean"] == 60
+    assert cohorts.analytics("exam_focused").summary("school", "north")["mean"] == 85
+    # The same student in two schemas counts once in each
+    assert len(cohorts.analytics()) == 1 and len(cohorts.analytics("exam_focused")) == 2
+
+    cohorts.update_batch([{"student_id": "c", "overall_rating": 40.0, "schema": "exam_focused"},
+                          {"student_id": "a", "overall_rating": 50.0}], ["Exam", "Skills"])
+    assert cohorts.analytics().summary("all", "all")["weakest_categories"] == {"Skills": 1}
+    assert cohorts.analytics("exam_focused").summary("all", "all")["count"] == 3
+
+
+def test_replace_and_remove_match_a_fresh_rebuild():
+    rng = np.random.default_rng(0)
+    analytics = CohortAnalytics()
+    latest = {}
+    for step in range(2000):
+        student_id = f"S{rng.integers(200)}"
+        if rng.random() < 0.1:
+            analytics.remove(student_id)
+            latest.pop(student_id, None)
+            continue
+        row = result(student_id, float(rng.uniform(0, 100)), f"school{rng.integers(3)}", str(rng.integers(2)))
+        if rng.random() < 0.5:
+            analytics.update(row)
+        else:
+            analytics.update_batch([row])
+        latest[student_id] = row
+
+    fresh = CohortAnalytics()
+    fresh.update_batch(list(latest.values()))
+    assert len(analytics) == len(latest)
+    assert analytics.groups() == fresh.groups()
+    for group in fresh.groups():
+        incremental = analytics.summary(group["level"], group["name"])
+        rebuilt = fresh.summary(group["level"], group["name"])
+        assert incremental["std"] == pytest.approx(rebuilt["std"], abs=0.01)
+        for key in ("count", "mean", "quantiles", "tiers", "min", "max"):
+            assert incremental[key] == rebuilt[key]
+
+
+def test_summary_statistics_and_quantiles():
+    ratings = np.random.default_rng(1).uniform(30, 95, 5000)
+    analytics = CohortAnalytics()
+    analytics.update_batch([result(f"S{i}", r, "north") for i, r in enumerate(ratings)])
+    summary = analytics.summary("school", "north")
+
+    assert summary["count"] == 5000
+    assert summary["mean"] == pytest.approx(ratings.mean(), abs=0.01)
+    assert summary["std"] == pytest.approx(ratings.std(), abs=0.01)
+    for q in (10, 25, 50, 75, 90):
+        assert summary["quantiles"][f"p{q}"] == pytest.approx(np.percentile(ratings, q), abs=0.1)
+    assert sum(summary["tiers"].values()) == 5000
+
+
+def test_withdrawing_everyone_drops_the_group():
+    analytics = CohortAnalytics()
+    analytics.update_batch([result("a", 60, "north"), result("b", 80, "north")])
+    analytics.update(result("a", 70, "south"))
+    assert analytics.summary("school", "north")["count"] == 1
+    assert analytics.remove("b")
+    assert analytics.summary("school", "north") is None
+    assert not analytics.remove("b")
+
+
+def test_inverse_merge_recovers_the_remainder():
+    values = np.array([1e6 + 0.1, 1e6 + 0.2, 1e6 + 0.4, 1e6 + 0.8])
+    total = (4, values.mean(), float(((values - values.mean()) ** 2).sum()))
+    count, mean, m2 = merge_moments(total, (1, values[-1], 0.0), sign=-1)
+    rest = values[:3]
+    assert count == 3
+    assert mean == pytest.approx(rest.mean(), abs=1e-9)
+    assert m2 == pytest.approx(((rest - rest.mean()) ** 2).sum(), rel=1e-6)
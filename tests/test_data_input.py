@@ -0,0 +1,130 @@
+"""Tests for student and feedback input: schema columns, row validation and batch parsing"""
+
+import json
+import re
+
+import pytest
+
+from data_input import StudentDataInput
+from rating_schema import DEFAULT_SCHEMA, RatingSchema
+
+HEADER = "student_id,attendance,homework,classwork,class_focus,exam,problem_solving,communication,discipline"
+
+
+def write(tmp_path, text, name="students.csv"):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_default_schema_rows_become_student_records(tmp_path):
+    path = write(tmp_path, f"{HEADER},grade\nS1,90,8,7,75,72,8,7,9,07\nS2,70,6,6,60,55,6,6,5,\n")
+
+    students, report = StudentDataInput.read_from_csv(path)
+
+    assert report == {"received": 2, "valid": 2, "invalid": 0, "invalid_rows": [], "errors": []}
+    assert students[0] == {
+        "student_id": "S1", "attendance": 90.0, "homework": 8.0, "classwork": 7.0,
+        "class_focus": 75.0, "exam": 72.0,
+        "skills": {"problem_solving": 8.0, "communication": 7.0, "discipline": 9.0},
+        "cohort": {"grade": "07"}
+    }
+    assert "cohort" not in students[1]
+    # Records are in the shape the schema reads
+    assert DEFAULT_SCHEMA.raw_matrix(students).shape == (2, len(DEFAULT_SCHEMA.columns))
+
+
+def test_columns_come_from_the_schema(tmp_path):
+    schema = RatingSchema.from_dict({
+        "name": "riverside",
+        "categories": [
+            {"key": "exam", "range": [0, 50], "weight": 0.6},
+            {"key": "projects", "range": [1, 5], "weight": 0.4, "inputs": ["teamwork", "creativity"]}
+        ]
+    })
+    path = write(tmp_path, "student_id,exam,teamwork,creativity,attendance\nR1,40,4,3,99\n")
+
+    students, report = StudentDataInput.read_from_csv(path, schema)
+
+    assert report["valid"] == 1
+    assert students == [{"student_id": "R1", "exam": 40.0,
+                         "projects": {"teamwork": 4.0, "creativity": 3.0}}]
+
+
+def test_rows_missing_declared_inputs_are_reported_not_defaulted(tmp_path):
+    path = write(tmp_path, f"{HEADER}\nS1,90,8,7,75,72,8,7,9\nS2,70,,6,60,abc,6,6,5\nS3,80,7,7,70,,7,7,\n")
+
+    students, report = StudentDataInput.read_from_csv(path)
+
+    assert [s["student_id"] for s in students] == ["S1"]
+    assert report["invalid"] == 2
+    assert report["invalid_rows"] == [2, 3]
+    assert report["errors"] == [
+        "row 2 missing homework; non-numeric exam",
+        "row 3 missing exam, discipline"
+    ]
+
+
+def test_a_missing_column_invalidates_every_row(tmp_path):
+    path = write(tmp_path, "student_id,attendance,homework\nS1,90,8\nS2,80,7\n")
+
+    students, report = StudentDataInput.read_from_csv(path)
+
+    assert students == []
+    assert report["invalid_rows"] == [1, 2]
+    assert report["errors"][0] == (
+        "row 1 missing classwork, class_focus, exam, problem_solving, communication, discipline"
+    )
+
+
+def test_unreadable_file_raises_value_error(tmp_path):
+    with pytest.raises(ValueError):
+        StudentDataInput.read_from_csv(str(tmp_path / "nope.csv"))
+
+
+FEEDBACK_ROWS = [
+    {"student_id": "a", "actual_rating": 80, "predicted_rating": 75},
+    {"student_id": "bad", "actual_rating": 200, "predicted_rating": 3},
+    {"student_id": "c", "actual_rating": 55.5, "predicted_rating": 60, "weak_category": "Exam"},
+    {"student_id": "", "actual_rating": 50, "predicted_rating": 50},
+    {"student_id": "e", "actual_rating": "n/a", "predicted_rating": 40},
+]
+
+
+def feedback_body(fmt):
+    if fmt == "csv":
+        lines = ["student_id,actual_rating,predicted_rating,weak_category"]
+        lines += [f"{r['student_id']},{r['actual_rating']},{r['predicted_rating']},{r.get('weak_category', '')}"
+                  for r in FEEDBACK_ROWS]
+        return "\n".join(lines).encode()
+    if fmt == "ndjson":
+        return "\n".join(json.dumps(r) for r in FEEDBACK_ROWS).encode()
+    return json.dumps(FEEDBACK_ROWS).encode()
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson", "json"])
+def test_feedback_batch_formats_parse_the_same(fmt):
+    feedback, report = StudentDataInput.read_feedback_batch(feedback_body(fmt), fmt)
+
+    assert report == {"received": 5, "valid": 2, "invalid": 3, "invalid_rows": [2, 4, 5]}
+    assert feedback["student_id"].tolist() == ["a", "c"]
+    assert feedback["actual_rating"].tolist() == [80.0, 55.5]
+    assert feedback["predicted_rating"].tolist() == [75.0, 60.0]
+    # Extra columns are kept
+    assert feedback["weak_category"].tolist()[1] == "Exam"
+
+
+def test_feedback_batch_keeps_ids_as_text():
+    feedback, _ = StudentDataInput.read_feedback_batch(b"student_id,actual_rating,predicted_rating\n007,70,65\n")
+    assert feedback["student_id"].tolist() == ["007"]
+
+
+@pytest.mark.parametrize("body, fmt, message", [
+    (b"student_id,actual_rating\na,80\n", "csv", "Missing required column(s): predicted_rating"),
+    (b"[{\"student_id\": ", "json", "Could not parse json feedback"),
+    (b"not json\n", "ndjson", "Could not parse ndjson feedback"),
+    (b"a,b\n", "xml", "Unsupported feedback format: xml"),
+])
+def test_malformed_feedback_batches_raise_value_error(body, fmt, message):
+    with pytest.raises(ValueError, match=re.escape(message)):
+        StudentDataInput.read_feedback_batch(body, fmt)
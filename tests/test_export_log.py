@@ -0,0 +1,48 @@
+"""Tests for the segmented export log: size and day rollover, filtered reads"""
+
+import os
+from datetime import datetime
+
+import export_log
+from export_log import SegmentLog
+
+
+def test_new_segment_when_current_one_is_full(tmp_path):
+    log = SegmentLog(str(tmp_path), max_bytes=200)
+    paths = [log.append("analysis", {"rating": i, "pad": "x" * 80}, student_id=f"S{i}") for i in range(5)]
+
+    assert len(set(paths)) == len(log.segments()) > 1
+    assert paths == sorted(paths)
+    # A segment only rolls over once it has reached max_bytes
+    for path in log.segments()[:-1]:
+        assert os.path.getsize(path) >= 200
+    assert [r["student_id"] for r in log.read()] == [f"S{i}" for i in range(5)]
+
+
+def test_new_segment_each_day(tmp_path, monkeypatch):
+    log = SegmentLog(str(tmp_path), prefix="exports")
+    day = {"now": datetime(2026, 3, 1, 23, 59)}
+
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return day["now"]
+
+    monkeypatch.setattr(export_log, "datetime", FixedDatetime)
+    first = log.append("analysis", {})
+    day["now"] = datetime(2026, 3, 2, 0, 1)
+    second = log.append("analysis", {})
+
+    assert os.path.basename(first) == "exports-20260301-000.jsonl"
+    assert os.path.basename(second) == "exports-20260302-000.jsonl"
+
+
+def test_read_filters_by_kind_and_fields(tmp_path):
+    log = SegmentLog(str(tmp_path))
+    log.append("analysis", {"r": 1}, student_id="A")
+    log.append("predictions", {"r": 2}, student_id="A")
+    log.append("analysis", {"r": 3}, student_id="B")
+
+    assert [r["data"]["r"] for r in log.read("analysis")] == [1, 3]
+    assert [r["data"]["r"] for r in log.read(student_id="A")] == [1, 2]
+    assert list(SegmentLog(str(tmp_path / "missing")).read()) == []
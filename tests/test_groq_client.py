@@ -0,0 +1,55 @@
+"""Tests for Groq prompt building and error handling (no network calls)"""
+
+import pytest
+
+from groq_client import GroqSuggestionGenerator
+from rating_schema import RatingSchema
+from student_rating import StudentRatingModel
+
+ARTS = RatingSchema.from_dict({
+    "name": "arts",
+    "categories": [
+        {"key": "portfolio", "label": "Portfolio", "range": [0, 100], "weight": 0.6, "default": 70},
+        {"key": "studio", "label": "Studio", "range": [1, 10], "weight": 0.4, "default": 7,
+         "inputs": ["drawing", "oil_painting"]}
+    ]
+})
+
+
+class FailingCompletions:
+    def create(self, **kwargs):
+        raise RuntimeError("rate limited")
+
+
+class FailingClient:
+    class chat:
+        completions = FailingCompletions()
+
+
+def generator():
+    gen = GroqSuggestionGenerator(api_key="test")
+    gen._client = FailingClient()
+    return gen
+
+
+def test_prompt_lists_the_categories_of_any_schema():
+    ratings = StudentRatingModel().compute_student_ratings(
+        {"student_id": "a1", "portfolio": 90, "studio": {"drawing": 4, "oil_painting": 8}}, ARTS
+    )
+    prompt = GroqSuggestionGenerator._build_improvement_prompt(
+        "a1", ratings, "Studio", "Practice", {"Studio": 60.0}
+    )
+
+    assert "- Portfolio: 90.1/100" in prompt
+    assert "- Studio:\n  * Drawing: 34.0/100\n  * Oil Painting: 78.0/100" in prompt
+    assert "Attendance" not in prompt
+
+
+def test_errors_become_messages_unless_raise_on_error():
+    ratings = StudentRatingModel().compute_student_ratings({"student_id": "a1"}, ARTS)
+    args = ("a1", ratings, "Studio", "Practice", {"Studio": 60.0})
+
+    assert "rate limited" in generator().generate_improvement_plan(*args)
+    with pytest.raises(RuntimeError):
+        generator().generate_improvement_plan(*args, raise_on_error=True)
+    assert "rate limited" in "".join(generator().stream_improvement_plan(*args))
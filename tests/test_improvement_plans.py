@@ -0,0 +1,96 @@
+"""Tests for pipelined batch plan generation: one plan each, completion order, bounded concurrency"""
+
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from improvement_model import StudentImprovementModel
+
+
+class StubPlanner(StudentImprovementModel):
+    """Merge and task steps replaced by timed local stubs that record concurrency"""
+
+    def __init__(self, delays=None, fail=()):
+        super().__init__()
+        self._groq_api_key = None
+        self.delays = delays or {}
+        self.fail = set(fail)
+        self.active = 0
+        self.max_active = 0
+        self.finished = []
+        self._stub_lock = threading.Lock()
+
+    def _step(self, student_id, stage):
+        with self._stub_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delays.get(student_id, 0.005))
+            if (student_id, stage) in self.fail:
+                raise RuntimeError(f"{stage} failed for {student_id}")
+        finally:
+            with self._stub_lock:
+                self.active -= 1
+                if stage == "tasks":
+                    self.finished.append(student_id)
+
+    def merge_suggestions_with_groq(self, rating_recommendation, teacher_suggestion,
+                                    student_data, weak_category):
+        self._step(student_data["student_id"], "merge")
+        return {"merged_strategy": f"plan for {student_data['student_id']}",
+                "key_focus_areas": [weak_category], "source": "stub"}
+
+    def generate_task_list_with_groq(self, merged_strategy, student_data, num_tasks=5):
+        self._step(student_data["student_id"], "tasks")
+        return [{"task_id": 1, "title": f"Task for {student_data['student_id']}"}]
+
+
+def plan_requests(n):
+    return [
+        {"student_data": {"student_id": f"S{i}"}, "rating_recommendation": "Study more.",
+         "teacher_suggestion": "Practice.", "weak_category": "Exam"}
+        for i in range(n)
+    ]
+
+
+def test_every_student_gets_exactly_one_plan():
+    planner = StubPlanner()
+    plans = list(planner.create_improvement_plans(plan_requests(25), max_concurrency=4))
+
+    assert Counter(p["student_id"] for p in plans) == Counter(f"S{i}" for i in range(25))
+    for plan in plans:
+        assert plan["tasks"][0]["title"] == f"Task for {plan['student_id']}"
+
+
+def test_plans_are_yielded_in_completion_order():
+    # Later students finish first
+    delays = {f"S{i}": 0.01 * (4 - i) for i in range(4)}
+    planner = StubPlanner(delays)
+    plans = [p["student_id"] for p in planner.create_improvement_plans(plan_requests(4), max_concurrency=4)]
+
+    assert plans == planner.finished
+    assert plans == ["S3", "S2", "S1", "S0"]
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 3])
+def test_calls_in_flight_stay_within_max_concurrency(max_concurrency):
+    planner = StubPlanner()
+    plans = list(planner.create_improvement_plans(plan_requests(12), max_concurrency=max_concurrency))
+
+    assert len(plans) == 12
+    assert 1 <= planner.max_active <= max_concurrency
+    if max_concurrency > 1:
+        # Merges of later students overlap with earlier students' work
+        assert planner.max_active > 1
+
+
+def test_a_failing_student_does_not_drop_the_others():
+    planner = StubPlanner(fail={("S1", "merge"), ("S3", "tasks")})
+    plans = {p["student_id"]: p for p in planner.create_improvement_plans(plan_requests(5), max_concurrency=2)}
+
+    assert sorted(plans) == [f"S{i}" for i in range(5)]
+    assert plans["S1"]["merged_strategy"]["source"] == "fallback"
+    assert plans["S3"]["tasks"][0]["title"] == "Improve Exam"
+    assert plans["S0"]["merged_strategy"]["source"] == "stub"
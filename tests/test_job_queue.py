@@ -0,0 +1,69 @@
+"""Tests for the background job queue: outcomes and durable-store retention"""
+
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from job_queue import JobQueue, QueueFullError
+
+
+def wait_for(queue, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_handler_exception_marks_job_failed():
+    queue = JobQueue(max_workers=1)
+
+    def boom(payload):
+        raise RuntimeError("groq down")
+
+    queue.register_handler("ok", lambda payload: payload["x"] * 2)
+    queue.register_handler("boom", boom)
+
+    done = wait_for(queue, queue.submit("ok", {"x": 21})["id"])
+    assert (done["status"], done["result"], done["error"]) == ("completed", 42, None)
+
+    failed = wait_for(queue, queue.submit("boom", {})["id"])
+    assert (failed["status"], failed["result"], failed["error"]) == ("failed", None, "groq down")
+    queue.shutdown(wait=True)
+
+
+def test_queue_full():
+    queue = JobQueue(max_workers=1, max_pending=1)
+    queue.register_handler("slow", lambda payload: time.sleep(0.2))
+    queue.submit("slow", {})
+    with pytest.raises(QueueFullError):
+        queue.submit("slow", {})
+    queue.shutdown(wait=True)
+
+
+def test_prune_by_age_and_count(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    queue = JobQueue(db_path=db_path, retention_days=1, max_stored=2)
+    queue.register_handler("ok", lambda payload: payload)
+    ids = [queue.submit("ok", {"n": n})["id"] for n in range(4)]
+    for job_id in ids:
+        wait_for(queue, job_id)
+    queue.shutdown(wait=True)
+
+    old = (datetime.now() - timedelta(days=2)).isoformat()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (old, ids[3]))
+        conn.execute(
+            "INSERT INTO jobs VALUES ('open', 'ok', 'pending', '{}', NULL, NULL, ?, ?)", (old, old)
+        )
+
+    # ids[3] is too old; of the rest only the newest two are kept; pending jobs stay
+    assert queue.prune() == 2
+    with sqlite3.connect(db_path) as conn:
+        remaining = {row[0] for row in conn.execute("SELECT id FROM jobs")}
+    assert "open" in remaining and ids[3] not in remaining
+    assert len(remaining) == 3
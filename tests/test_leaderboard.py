@@ -0,0 +1,65 @@
+"""Tests for the leaderboard index (rank, percentile, top-k, per-schema boards)"""
+
+import pytest
+
+from leaderboard import StudentLeaderboard, SchemaLeaderboards
+
+
+@pytest.fixture
+def board():
+    board = StudentLeaderboard()
+    for student_id, rating in [("a", 90.0), ("b", 75.0), ("c", 75.0), ("d", 60.0)]:
+        board.add(student_id, rating)
+    return board
+
+
+def test_rank_is_one_for_best_and_shared_on_ties(board):
+    assert board.get("a")["rank"] == 1
+    assert board.get("b")["rank"] == board.get("c")["rank"] == 2
+    assert board.get("d")["rank"] == 4
+
+
+def test_percentile_counts_ties_as_half(board):
+    # d: nothing below, itself tied -> 0.5 / 4
+    assert board.get("d")["percentile"] == 12.5
+    # b and c: one below, two tied -> (1 + 1) / 4
+    assert board.get("b")["percentile"] == 50.0
+    assert board.get("a")["percentile"] == 87.5
+
+
+def test_update_replaces_previous_rating(board):
+    board.add("d", 95.0)
+    assert len(board) == 4
+    assert board.get("d")["rank"] == 1
+    assert board.get("a")["rank"] == 2
+
+
+def test_remove(board):
+    assert board.remove("a")
+    assert not board.remove("a")
+    assert "a" not in board
+    assert board.get("b")["rank"] == 1
+
+
+def test_top_k_highest_first(board):
+    leaders = board.top_k(2)
+    assert [entry["overall_rating"] for entry in leaders] == [90.0, 75.0]
+    assert board.top_k(100)[-1]["student_id"] == "d"
+    assert board.top_k(0) == []
+
+
+def test_unknown_student():
+    assert StudentLeaderboard().get("nobody") is None
+
+
+def test_schema_leaderboards_rank_each_schema_separately():
+    boards = SchemaLeaderboards.from_history([
+        {"student_id": "a", "overall_rating": 60.0},
+        {"student_id": "b", "overall_rating": 80.0, "schema": "exam_focused"},
+        {"student_id": "a", "overall_rating": 90.0, "schema": "exam_focused"},
+    ])
+    assert boards.names() == ["default", "exam_focused"]
+    assert len(boards.board()) == 1
+    assert boards.board().get("a")["overall_rating"] == 60.0
+    assert boards.board("exam_focused").get("a")["rank"] == 1
+    assert boards.board("exam_focused").get("b")["rank"] == 2
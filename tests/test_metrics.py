@@ -0,0 +1,127 @@
+"""Tests for the Prometheus exposition: cumulative buckets, +Inf, _sum/_count and label escaping"""
+
+import re
+from collections import defaultdict
+
+import pytest
+from fastapi.testclient import TestClient
+
+import metrics
+
+SAMPLE = re.compile(r"^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(?P<labels>.*)\})? (?P<value>\S+)$")
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"(?:,|$)')
+ESCAPES = {"\\": "\\", "n": "\n", '"': '"'}
+
+
+def parse_exposition(text):
+    """Samples as {metric name: [(labels dict, value)]}, plus HELP/TYPE per metric"""
+    samples, types = defaultdict(list), {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ", 3)
+            types[name] = kind
+            continue
+        if not line or line.startswith("#"):
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"malformed sample line: {line!r}"
+        raw = match["labels"] or ""
+        labels = {
+            key: re.sub(r"\\(.)", lambda m: ESCAPES[m[1]], value)
+            for key, value in LABEL.findall(raw)
+        }
+        # Every label must have been consumed by the pattern
+        assert "".join(f'{k}="{v}",' for k, v in LABEL.findall(raw)).rstrip(",") == raw
+        samples[match["name"]].append((labels, float(match["value"])))
+    return samples, types
+
+
+def series_of(samples, name, **labels):
+    """Buckets (le -> count), sum and count of one histogram series"""
+    match = lambda found: all(found.get(k) == v for k, v in labels.items())
+    buckets = {
+        found["le"]: value for found, value in samples[f"{name}_bucket"] if match(found)
+    }
+    (total,) = [value for found, value in samples[f"{name}_sum"] if match(found)]
+    (count,) = [value for found, value in samples[f"{name}_count"] if match(found)]
+    return buckets, total, count
+
+
+def test_buckets_are_cumulative_and_end_at_inf():
+    registry = metrics.MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo", ("stage",), buckets=(0.1, 1.0, 5.0))
+    for value in (0.05, 0.1, 0.5, 0.7, 3.0, 12.0):
+        histogram.observe(value, "rating")
+
+    samples, types = parse_exposition(registry.render())
+    buckets, total, count = series_of(samples, "demo_seconds", stage="rating")
+
+    assert types == {"demo_seconds": "histogram"}
+    assert list(buckets) == ["0.1", "1", "5", "+Inf"]
+    # le is inclusive: 0.1 lands in the 0.1 bucket
+    assert list(buckets.values()) == [2, 4, 5, 6]
+    assert buckets["+Inf"] == count == 6
+    assert total == pytest.approx(16.35)
+
+
+def test_label_values_are_escaped():
+    registry = metrics.MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo", ("route",), buckets=(1.0,))
+    awkward = 'C:\\path "quoted"\nnext'
+    histogram.observe(0.5, awkward)
+
+    text = registry.render()
+    assert '\\\\path \\"quoted\\"\\nnext' in text
+    assert len(text.splitlines()) == 2 + 4  # HELP, TYPE, 2 buckets, sum, count
+
+    samples, _ = parse_exposition(text)
+    buckets, total, count = series_of(samples, "demo_seconds", route=awkward)
+    assert buckets == {"1": 1, "+Inf": 1}
+    assert (total, count) == (0.5, 1)
+
+
+def test_unlabelled_histogram_renders_bare_sum_and_count():
+    registry = metrics.MetricsRegistry()
+    registry.histogram("demo_seconds", "Demo", buckets=(1.0,)).observe(2.0)
+
+    lines = registry.render().splitlines()
+    assert 'demo_seconds_bucket{le="1"} 0' in lines
+    assert 'demo_seconds_bucket{le="+Inf"} 1' in lines
+    assert "demo_seconds_sum 2" in lines
+    assert "demo_seconds_count 1" in lines
+
+
+def test_metrics_endpoint_reports_request_durations(api, monkeypatch):
+    registry = metrics.MetricsRegistry()
+    requests = registry.histogram(
+        "student_rating_http_request_seconds", "API request duration",
+        labelnames=("method", "route", "status")
+    )
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    monkeypatch.setattr(metrics, "registry", registry)
+    monkeypatch.setattr(metrics, "HTTP_REQUEST_SECONDS", requests)
+
+    client = TestClient(api.app)
+    for _ in range(3):
+        assert client.get("/api/health").status_code == 200
+    assert client.get("/api/no-such-route").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == metrics.PROMETHEUS_CONTENT_TYPE
+
+    samples, types = parse_exposition(response.text)
+    assert types["student_rating_http_request_seconds"] == "histogram"
+    buckets, total, count = series_of(
+        samples, "student_rating_http_request_seconds",
+        method="GET", route="/api/health", status="200"
+    )
+    counts = list(buckets.values())
+    assert counts == sorted(counts)
+    assert list(buckets)[-1] == "+Inf"
+    assert buckets["+Inf"] == count == 3
+    assert total > 0
+    _, _, missing = series_of(
+        samples, "student_rating_http_request_seconds", route="unmatched", status="404"
+    )
+    assert missing == 1
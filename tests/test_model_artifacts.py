@@ -0,0 +1,60 @@
+"""Tests for loading serving models: artifact first, pickle as fallback"""
+
+import os
+import pickle
+
+from model_artifacts import load_model, MANIFEST_FILE
+from improvement_model import StudentImprovementModel
+from scoring_model import StudentScoringModel
+
+
+def test_artifact_is_preferred_over_pickle(tmp_path):
+    model = StudentScoringModel()
+    model.model_version = "artifact"
+    model.to_artifact(str(tmp_path / StudentScoringModel.ARTIFACT_NAME))
+    legacy = StudentScoringModel()
+    legacy.model_version = "pickle"
+    with open(tmp_path / f"{StudentScoringModel.ARTIFACT_NAME}.pkl", "wb") as f:
+        pickle.dump(legacy, f)
+
+    assert load_model(StudentScoringModel, str(tmp_path)).model_version == "artifact"
+
+    # A broken artifact falls back to the pickle
+    os.remove(tmp_path / StudentScoringModel.ARTIFACT_NAME / MANIFEST_FILE)
+    assert load_model(StudentScoringModel, str(tmp_path)).model_version == "pickle"
+
+
+def test_missing_model_returns_none(tmp_path):
+    assert load_model(StudentScoringModel, str(tmp_path)) is None
+
+
+def test_legacy_improvement_pickle_gets_current_attributes():
+    model = StudentImprovementModel.__new__(StudentImprovementModel)
+    model.__setstate__({"model_version": "1.0", "created_date": "2025-12-09", "groq_client": None})
+
+    assert "groq_client" not in model.__dict__
+    assert len(model.similarity_index) == 0
+    assert model.improvement_history == []
+
+
+def test_similarity_indexes_round_trip_per_schema(tmp_path, monkeypatch):
+    import rating_schema
+    from student_rating import StudentRatingModel
+
+    monkeypatch.setattr(rating_schema, "SCHEMA_DIR", os.path.join(os.path.dirname(__file__), "..", "schemas"))
+    rater = StudentRatingModel()
+    exam_focused = rating_schema.SchemaRegistry().get("exam_focused")
+    model = StudentImprovementModel.__new__(StudentImprovementModel)
+    model.__setstate__({"model_version": "1.0", "created_date": "2025-12-09"})
+    model.similarity_index.add_ratings(rater.compute_student_ratings({"student_id": "a", "exam": 60}), [], "Exam")
+    model.similarity_index.add_ratings(
+        rater.compute_student_ratings({"student_id": "b", "exam": 90}, exam_focused), [], "Skills"
+    )
+
+    model.to_artifact(str(tmp_path / "improvement"))
+    loaded = StudentImprovementModel.from_artifact(str(tmp_path / "improvement"))
+
+    assert loaded.similarity_index.names() == ["default", "exam_focused"]
+    assert loaded.similarity_index.index("exam_focused").query(
+        model.similarity_index.index("exam_focused").export()[0][0], k=1
+    )[0]["weak_category"] == "Skills"
@@ -0,0 +1,60 @@
+"""Tests for the normalization lookup tables: identical to normalize_formula everywhere"""
+
+import numpy as np
+import pytest
+
+from rating_schema import DEFAULT_SCHEMA, MAX_TABLE_SIZE, normalize_formula, normalize_table
+from student_rating import StudentRatingModel
+
+DOMAINS = sorted({(c.vmin, c.vmax) for c in DEFAULT_SCHEMA.categories} | {(0, 50), (1, 5), (-10, 10)})
+
+
+def formula(values, vmin, vmax):
+    return normalize_formula(np.asarray(values, dtype=float), vmin, vmax).tolist()
+
+
+@pytest.mark.parametrize("vmin, vmax", DOMAINS)
+def test_table_equals_formula_over_the_whole_domain(vmin, vmax):
+    array, table = normalize_table(vmin, vmax)
+    domain = list(range(int(vmin), int(vmax) + 1))
+
+    assert table == formula(domain, vmin, vmax)
+    assert array.tolist() == table
+    assert (table[0], table[-1]) == pytest.approx((1.0, 100.0))
+
+
+@pytest.mark.parametrize("vmin, vmax", DOMAINS)
+def test_normalize_inputs_matches_formula_for_any_input(vmin, vmax):
+    model = StudentRatingModel()
+    span = vmax - vmin
+    values = (
+        list(range(int(vmin), int(vmax) + 1))                      # table hits (int)
+        + [float(v) for v in range(int(vmin), int(vmax) + 1)]      # integral floats
+        + [np.int64(vmin), np.int64(vmax), np.float64(vmin + 1)]   # numpy scalars
+        + [vmin - 1, vmax + 1, vmin - span, vmax + span, -1000]    # out of range, clipped
+        + [vmin + 0.5, vmax - 0.25, vmin + span / 3, vmax + 0.5]   # fractional
+    )
+
+    normalized = model._normalize_inputs(values, [(vmin, vmax)] * len(values))
+    assert normalized == formula(values, vmin, vmax)
+    assert [model.normalize_1_100(v, vmin, vmax) for v in values] == normalized
+
+
+def test_mixed_domains_in_one_student():
+    model = StudentRatingModel()
+    values = [100, 7, 6.5, 11, -3, 55.5]
+    ranges = [(0, 100), (1, 10), (1, 10), (1, 10), (0, 100), (0, 100)]
+
+    expected = [normalize_formula(float(v), lo, hi) for v, (lo, hi) in zip(values, ranges)]
+    assert model._normalize_inputs(values, ranges) == expected
+
+
+def test_non_integer_or_oversized_domains_have_no_table():
+    assert normalize_table(0.5, 10) is None
+    assert normalize_table(0, MAX_TABLE_SIZE) is None
+    assert normalize_table(0, MAX_TABLE_SIZE - 1) is not None
+
+    model = StudentRatingModel()
+    values = [0.5, 3, 10, 20]
+    assert model._normalize_inputs(values, [(0.5, 10)] * 4) == formula(values, 0.5, 10)
+    assert model._normalize_inputs([1500], [(0, 5000)]) == formula([1500], 0, 5000)
@@ -0,0 +1,53 @@
+"""Tests for profile sessions: which threads end up in a profile"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+import profiling
+from profiling import profile_session, profiled
+
+
+def caller_work():
+    return sum(range(1000))
+
+
+def worker_work():
+    return sum(range(2000))
+
+
+def profiled_functions(session):
+    return {entry["function"] for entry in session.summary(top=100)["top"]}
+
+
+def run_in_worker(func):
+    # Like run_in_threadpool: the worker runs in a copy of the caller's context
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(context.run, profiled(func)).result()
+
+
+def test_worker_only_session_excludes_the_calling_thread(tmp_path):
+    with profile_session("worker-only", str(tmp_path), include_caller=False) as session:
+        caller_work()
+        run_in_worker(worker_work)
+
+    functions = profiled_functions(session)
+    assert any("worker_work" in f for f in functions)
+    assert not any("caller_work" in f for f in functions)
+    assert session.summary()["scope"] == "worker threads only"
+    assert session.path is not None
+
+
+def test_default_session_includes_the_calling_thread(tmp_path):
+    with profile_session("caller", str(tmp_path)) as session:
+        caller_work()
+        run_in_worker(worker_work)
+
+    functions = profiled_functions(session)
+    assert any("caller_work" in f for f in functions)
+    assert any("worker_work" in f for f in functions)
+
+
+def test_profiled_is_a_no_op_without_a_session():
+    assert profiling.current_session() is None
+    assert profiled(worker_work)() == sum(range(2000))
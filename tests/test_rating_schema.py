@@ -0,0 +1,145 @@
+"""Tests for schema evaluation: scalar rating path vs the compiled evaluator"""
+
+import os
+
+import numpy as np
+import pytest
+
+from rating_schema import RatingSchema, DEFAULT_SCHEMA
+from student_rating import StudentRatingModel
+
+SCHEMA_DIR = os.path.join(os.path.dirname(__file__), "..", "schemas")
+
+
+def random_students(schema, n, seed=0):
+    rng = np.random.default_rng(seed)
+    students = []
+    for i in range(n):
+        student = {"student_id": f"S{i}"}
+        for category in schema.categories:
+            if category.inputs:
+                # Some sub-scores missing, plus one the schema does not declare
+                student[category.key] = {
+                    name: float(rng.integers(category.vmin, category.vmax + 1))
+                    for name in category.inputs if rng.random() < 0.7
+                }
+                student[category.key]["undeclared"] = 1
+            elif rng.random() < 0.9:
+                student[category.key] = float(rng.uniform(category.vmin, category.vmax))
+        students.append(student)
+    return students
+
+
+@pytest.mark.parametrize("schema", [
+    DEFAULT_SCHEMA, RatingSchema.load(os.path.join(SCHEMA_DIR, "exam_focused.json"))
+], ids=lambda s: s.name)
+def test_scalar_path_matches_compiled_evaluator(schema):
+    model = StudentRatingModel()
+    students = random_students(schema, 50)
+
+    scalar = [model.compute_student_ratings(s, schema)["overall_rating"] for s in students]
+    _, _, overall = model.compute_ratings_batch(schema.raw_matrix(students), schema)
+
+    np.testing.assert_allclose(scalar, np.round(overall, 2), atol=0.011)
+
+
+def test_group_reports_declared_inputs_only():
+    model = StudentRatingModel()
+    result = model.compute_student_ratings({"skills": {"problem_solving": 9, "leadership": 1}})
+
+    skills = DEFAULT_SCHEMA.categories[DEFAULT_SCHEMA.keys.index("skills")]
+    assert list(result["subcategories"]["Skills"]) == list(skills.inputs)
+    _, _, overall = model.compute_ratings_batch(
+        DEFAULT_SCHEMA.raw_matrix([{"skills": {"problem_solving": 9, "leadership": 1}}])
+    )
+    assert result["overall_rating"] == pytest.approx(overall[0], abs=0.005)
+
+
+def test_schema_round_trips_through_dict():
+    schema = RatingSchema.load(os.path.join(SCHEMA_DIR, "exam_focused.json"))
+    copy = RatingSchema.from_dict(schema.to_dict())
+    raw = schema.raw_matrix(random_students(schema, 10, seed=1))
+    np.testing.assert_allclose(copy.evaluate(raw)[2], schema.evaluate(raw)[2])
+
+
+def test_invalid_weights_are_rejected():
+    spec = DEFAULT_SCHEMA.to_dict()
+    spec["categories"][0]["weight"] += 0.5
+    with pytest.raises(ValueError):
+        RatingSchema.from_dict(spec)
+
+
+RIVERSIDE = RatingSchema.from_dict({
+    "name": "riverside",
+    "categories": [
+        {"key": "exam", "label": "Exam", "range": [0, 50], "weight": 0.5},
+        {"key": "lab", "label": "Lab", "range": [1, 5], "weight": 0.2},
+        {"key": "projects", "label": "Projects", "range": [1, 5], "weight": 0.3,
+         "inputs": ["teamwork", "creativity"]}
+    ],
+    "focus_areas": [
+        {"name": "Practical", "categories": ["lab", "projects"], "recommendation": "Spend more time in the lab."},
+        {"name": "Exam", "categories": ["exam"], "recommendation": "Do past papers."}
+    ]
+})
+
+PARITY_SCHEMAS = [
+    DEFAULT_SCHEMA, RatingSchema.load(os.path.join(SCHEMA_DIR, "exam_focused.json")), RIVERSIDE
+]
+
+
+def tied_students(schema):
+    """Every input at its minimum, then at its maximum: all areas tie"""
+    return [
+        {"student_id": f"T{bound}", **{
+            c.key: ({name: value for name in c.inputs} if c.inputs else value)
+            for c in schema.categories
+            for value in [c.vmin if bound == "min" else c.vmax]
+        }}
+        for bound in ("min", "max")
+    ]
+
+
+@pytest.mark.parametrize("schema", PARITY_SCHEMAS, ids=lambda s: s.name)
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_batch_scores_match_scalar_ratings(schema, seed):
+    model = StudentRatingModel()
+    if schema is DEFAULT_SCHEMA:
+        # Learned weights apply to the model's own schema in both paths
+        rng = np.random.default_rng(seed)
+        raw = rng.uniform(0.5, 1.5, len(schema.keys))
+        model.weights = dict(zip(schema.keys, raw / raw.sum()))
+    students = random_students(schema, 40, seed) + tied_students(schema)
+
+    scalar = [model.compute_student_ratings(s, schema) for s in students]
+    column_scores, category_scores, overall = model.compute_ratings_batch(schema.raw_matrix(students), schema)
+
+    np.testing.assert_allclose([r["overall_rating"] for r in scalar], np.round(overall, 2), atol=0.011)
+    for ratings, columns in zip(scalar, column_scores):
+        flat = [
+            ratings["subcategories"][schema.categories[index].label][name] if name
+            else ratings["subcategories"][schema.categories[index].label]
+            for index, name in schema.columns
+        ]
+        np.testing.assert_allclose(flat, columns, atol=0.006)
+    np.testing.assert_allclose(model.subcategory_matrix(scalar, schema), category_scores, atol=0.006)
+
+
+@pytest.mark.parametrize("schema", PARITY_SCHEMAS, ids=lambda s: s.name)
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_batch_recommendations_match_scalar(schema, seed):
+    model = StudentRatingModel()
+    students = random_students(schema, 40, seed) + tied_students(schema)
+    scalar_ratings = [model.compute_student_ratings(s, schema) for s in students]
+
+    weakest, recommendations, area_scores = model.recommend_improvement_batch(
+        model.subcategory_matrix(scalar_ratings, schema), schema
+    )
+
+    for ratings, area, recommendation, scores in zip(scalar_ratings, weakest, recommendations, area_scores):
+        expected_area, expected_recommendation, expected_scores = model.recommend_improvement(ratings, schema)
+        assert area == expected_area
+        assert recommendation == expected_recommendation
+        np.testing.assert_allclose(scores, [expected_scores[name] for name in schema.area_names])
+    # Ties go to the first focus area in both paths
+    assert list(weakest[-2:]) == [schema.area_names[0]] * 2
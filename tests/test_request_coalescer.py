@@ -0,0 +1,102 @@
+"""Tests for request coalescing: sharing, error propagation and cancellation"""
+
+import asyncio
+
+import pytest
+
+from request_coalescer import RequestCoalescer
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_identical_requests_share_one_computation():
+    async def scenario():
+        coalescer = RequestCoalescer(ttl_seconds=0)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"rating": 80}
+
+        results = await asyncio.gather(*(coalescer.run("k", compute) for _ in range(5)))
+        return calls, results, coalescer.get_stats()
+
+    calls, results, stats = run(scenario())
+    assert len(calls) == 1
+    assert all(r == {"rating": 80} for r in results)
+    assert (stats["executed"], stats["coalesced"], stats["in_flight"]) == (1, 4, 0)
+
+
+def test_errors_reach_every_caller_and_are_not_cached():
+    async def scenario():
+        coalescer = RequestCoalescer(ttl_seconds=60)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("bad input")
+
+        results = await asyncio.gather(
+            *(coalescer.run("k", compute) for _ in range(3)), return_exceptions=True
+        )
+        with pytest.raises(ValueError):
+            await coalescer.run("k", compute)
+        return calls, results
+
+    calls, results = run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len(calls) == 2
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    async def scenario():
+        coalescer = RequestCoalescer(ttl_seconds=60)
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return 42
+
+        leader = asyncio.ensure_future(coalescer.run("k", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(coalescer.run("k", compute))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        value = await follower
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return value, coalescer
+
+    value, coalescer = run(scenario())
+    assert value == 42
+    assert coalescer.get_stats()["in_flight"] == 0
+
+
+def test_computation_finishes_and_is_cached_after_all_callers_leave():
+    async def scenario():
+        coalescer = RequestCoalescer(ttl_seconds=60)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "done"
+
+        caller = asyncio.ensure_future(coalescer.run("k", compute))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0.05)
+        value = await coalescer.run("k", compute)
+        return value, calls, coalescer.get_stats()
+
+    value, calls, stats = run(scenario())
+    assert value == "done"
+    assert len(calls) == 1
+    assert stats["cache_hits"] == 1
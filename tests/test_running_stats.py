@@ -0,0 +1,92 @@
+"""Tests for running statistics: batched adds match one-by-one adds, state round trip, inverse merge"""
+
+import numpy as np
+import pytest
+
+from running_stats import RunningStats, merge_moments
+
+
+def one_by_one(values, **kwargs):
+    stats = RunningStats(**kwargs)
+    for value in values:
+        stats.add(value)
+    return stats
+
+
+def assert_same(batched, looped):
+    assert batched.count == looped.count
+    assert batched.mean == pytest.approx(looped.mean, rel=1e-12, abs=1e-12)
+    assert batched.std == pytest.approx(looped.std, rel=1e-9, abs=1e-12)
+    assert batched.ewma == pytest.approx(looped.ewma, rel=1e-9)
+    assert batched.window_mean == pytest.approx(looped.window_mean, rel=1e-12)
+    assert list(batched._recent) == pytest.approx(list(looped._recent))
+
+
+@pytest.mark.parametrize("batches", [
+    [1],            # one value seeds the EWMA
+    [7],            # first batch seeds the EWMA with its first value
+    [3, 1, 50],     # mixed batch sizes
+    [250],          # batch longer than the window
+    [40, 300, 2],   # long batch after short ones
+])
+def test_add_many_matches_repeated_add(batches):
+    rng = np.random.default_rng(sum(batches))
+    values = rng.normal(60, 15, sum(batches))
+
+    batched = RunningStats(window=100, alpha=0.1)
+    start = 0
+    for size in batches:
+        batched.add_many(values[start:start + size])
+        start += size
+
+    assert_same(batched, one_by_one(values, window=100, alpha=0.1))
+
+
+def test_add_many_after_add_and_empty_batches():
+    values = np.random.default_rng(3).uniform(0, 100, 120)
+    batched = RunningStats(window=50)
+    batched.add(values[0])
+    batched.add_many([])
+    batched.add_many(values[1:])
+    assert_same(batched, one_by_one(values, window=50))
+
+
+def test_large_offset_keeps_variance_precise():
+    values = 1e9 + np.random.default_rng(4).uniform(0, 1, 1000)
+    batched = RunningStats()
+    batched.add_many(values[:500])
+    batched.add_many(values[500:])
+    assert batched.std == pytest.approx(values.std(ddof=1), rel=1e-6)
+
+
+def test_state_round_trip_continues_identically():
+    values = np.random.default_rng(5).normal(50, 10, 400)
+    stats = RunningStats(window=30, alpha=0.2)
+    stats.add_many(values[:200])
+
+    restored = RunningStats.from_state(stats.get_state())
+    assert restored.summary() == stats.summary()
+
+    restored.add_many(values[200:])
+    assert_same(restored, one_by_one(values, window=30, alpha=0.2))
+
+
+def test_merge_moments_withdraw_inverts_merge():
+    rng = np.random.default_rng(6)
+    a, b = rng.normal(70, 5, 300), rng.normal(40, 20, 80)
+
+    def moments(x):
+        return len(x), float(x.mean()), float(((x - x.mean()) ** 2).sum())
+
+    merged = merge_moments(moments(a), moments(b))
+    assert merged[0] == 380
+    assert merged[1] == pytest.approx(np.concatenate([a, b]).mean())
+    assert merged[2] == pytest.approx(moments(np.concatenate([a, b]))[2])
+
+    count, mean, m2 = merge_moments(merged, moments(b), sign=-1)
+    assert count == 300
+    assert mean == pytest.approx(a.mean(), rel=1e-12)
+    assert m2 == pytest.approx(moments(a)[2], rel=1e-9)
+
+    # Withdrawing everything leaves an empty summary
+    assert merge_moments(merged, merged, sign=-1) == (0, 0.0, 0.0)
@@ -0,0 +1,81 @@
+"""Tests for the what-if analyzer: grid ratings and the path to the next tier"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from rating_schema import RatingSchema, DEFAULT_SCHEMA
+from sensitivity import SensitivityAnalyzer
+from student_rating import StudentRatingModel
+from tiers import Tier, TierClassifier
+
+SMALL = RatingSchema.from_dict({
+    "name": "small",
+    "categories": [
+        {"key": "exam", "label": "Exam", "range": [0, 100], "weight": 0.5, "default": 50},
+        {"key": "homework", "label": "Homework", "range": [1, 10], "weight": 0.3, "default": 5},
+        {"key": "attendance", "label": "Attendance", "range": [0, 100], "weight": 0.2, "default": 90}
+    ]
+})
+
+STUDENT = {"student_id": "w1", "exam": 55, "homework": 6, "attendance": 92}
+
+
+def rating(model, values):
+    return model.compute_ratings_batch(np.array([values], dtype=float), SMALL)[2][0]
+
+
+def test_next_tier_path_is_the_fewest_steps():
+    model = StudentRatingModel()
+    analyzer = SensitivityAnalyzer(model)
+    result = analyzer.analyze(STUDENT, schema=SMALL)
+    path = result["next_tier"]
+
+    assert result["base_tier"] == "DEVELOPING"
+    assert path["tier"] == "GOOD" and path["reachable"]
+    assert path["rating"] >= 65
+
+    # Brute force over every combination of steps
+    base = SMALL.raw_matrix([STUDENT])[0]
+    steps = analyzer.default_steps(SMALL)
+    ranges = [range(int(np.ceil((SMALL.column_maxs[j] - base[j]) / steps[j])) + 1) for j in range(3)]
+    best = min(
+        sum(combo) for combo in itertools.product(*ranges)
+        if round(rating(model, np.minimum(base + np.array(combo) * steps, SMALL.column_maxs)), 2) >= 65
+    )
+    assert path["total_steps"] == best
+    assert sum(change["steps"] for change in path["changes"]) == best
+
+
+def test_grid_matches_single_ratings():
+    model = StudentRatingModel()
+    result = SensitivityAnalyzer(model).analyze(STUDENT, k=2, schema=SMALL)
+    exam = result["inputs"][0]
+
+    assert exam["values"] == [45.0, 50.0, 55.0, 60.0, 65.0]
+    expected = [rating(model, [v, 6, 92]) for v in exam["values"]]
+    np.testing.assert_allclose(exam["ratings"], np.round(expected, 2))
+    assert exam["effect_up"] == pytest.approx(expected[3] - expected[2], abs=1e-4)
+    assert result["base_rating"] == round(expected[2], 2)
+
+
+def test_top_tier_and_unreachable_tier():
+    model = StudentRatingModel()
+    top = {"student_id": "t", "exam": 100, "homework": 10, "attendance": 100}
+    assert SensitivityAnalyzer(model).analyze(top, schema=SMALL)["next_tier"] is None
+
+    # A tier above the maximum rating cannot be reached by any change
+    classifier = TierClassifier([Tier("LOW", "LOW", 0, "#000"), Tier("MYTHIC", "MYTHIC", 101, "#fff")])
+    path = SensitivityAnalyzer(model, classifier).analyze(STUDENT, schema=SMALL)["next_tier"]
+    assert path["tier"] == "MYTHIC" and not path["reachable"]
+    assert path["changes"] == []
+
+
+def test_default_schema_and_k_zero():
+    model = StudentRatingModel()
+    result = SensitivityAnalyzer(model).analyze({"student_id": "d"}, k=0)
+
+    assert result["schema"] == DEFAULT_SCHEMA.name
+    assert len(result["inputs"]) == len(DEFAULT_SCHEMA.columns)
+    assert all(i["effect_up"] == 0.0 and len(i["ratings"]) == 1 for i in result["inputs"])
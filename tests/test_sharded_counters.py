@@ -0,0 +1,63 @@
+"""Tests for sharded counters: exact totals under concurrent increments"""
+
+import threading
+
+from sharded_counters import ShardedCounters
+from student_rating import StudentRatingModel
+
+
+def run_threads(target, n_threads):
+    start = threading.Barrier(n_threads)
+
+    def worker():
+        start.wait()
+        target()
+
+    threads = [threading.Thread(target=worker) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_increments_are_exact():
+    counters = ShardedCounters(("a", "b"))
+    snapshots = []
+
+    def increment():
+        for i in range(20_000):
+            counters.add("a")
+            if i % 2:
+                counters.add("b", 3)
+            if i % 5000 == 0:
+                snapshots.append(counters.snapshot()["a"])
+
+    run_threads(increment, 8)
+
+    # Shards of finished threads still count
+    assert counters.snapshot() == {"a": 160_000, "b": 240_000}
+    assert all(0 <= value <= 160_000 for value in snapshots)
+
+
+def test_reset_sets_totals_and_clears_shards():
+    counters = ShardedCounters(("a",))
+    run_threads(lambda: counters.add("a", 5), 4)
+    counters.reset({"a": 7})
+    assert counters.snapshot() == {"a": 7}
+    counters.add("a")
+    assert counters.snapshot() == {"a": 8}
+
+
+def test_prediction_counts_survive_concurrent_ratings():
+    model = StudentRatingModel()
+    before = model.performance_metrics["total_predictions"]
+    student = {"student_id": "S1", "attendance": 90, "homework": 8, "classwork": 7,
+               "class_focus": 75, "exam": 70, "skills": {"problem_solving": 8}}
+
+    def rate():
+        for _ in range(300):
+            model.compute_student_ratings(student)
+
+    run_threads(rate, 8)
+
+    assert model.performance_metrics["total_predictions"] == before + 2400
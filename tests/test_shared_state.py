@@ -0,0 +1,67 @@
+"""Tests for cross-worker weight learning through the shared state file"""
+
+import numpy as np
+import pytest
+
+from shared_state import SharedModelState
+from student_rating import StudentRatingModel
+
+
+def worker(path):
+    model = StudentRatingModel()
+    model.attach_shared_state(SharedModelState(
+        path, model.weights, model.performance_metrics,
+        statistics=model.learner.get_statistics()
+    ))
+    return model
+
+
+def feedback_rows(n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    features = rng.uniform(1, 100, size=(n, 6))
+    actual = features @ np.array([0.3, 0.1, 0.25, 0.15, 0.1, 0.1]) + rng.normal(0, 1, n)
+    return features, actual
+
+
+def test_weights_are_fit_on_feedback_from_all_workers(tmp_path):
+    path = str(tmp_path / "state.bin")
+    workers = [worker(path), worker(path)]
+    reference = StudentRatingModel()
+
+    features, actual = feedback_rows()
+    for i, (x, y) in enumerate(zip(features, actual)):
+        feedback = {"actual_rating": float(y), "predicted_rating": 50.0, "features": x}
+        workers[i % 2].adapt_weights(feedback)
+        reference.adapt_weights(feedback)
+
+    assert workers[0]._shared.read_statistics()[-1] == len(actual)
+    for model in workers:
+        for name, value in reference.weights.items():
+            assert model.weights[name] == pytest.approx(value, abs=1e-9)
+    np.testing.assert_allclose(
+        workers[0]._shared.read_statistics(), reference.learner.get_statistics()
+    )
+
+
+def test_save_writes_merged_learner_state(tmp_path):
+    path = str(tmp_path / "state.bin")
+    model_path = str(tmp_path / "model.pkl")
+    first, second = worker(path), worker(path)
+
+    features, actual = feedback_rows(20, seed=1)
+    first.fit_weights(features[:10], actual[:10])
+    second.adapt_weights({"actual_rating": float(actual[10]), "predicted_rating": 50.0,
+                          "features": features[10]})
+    first.save_model(model_path)
+
+    loaded = StudentRatingModel()
+    loaded.load_model(model_path)
+    assert loaded.learner.n_samples == 11
+    assert loaded.weights == pytest.approx(dict(second.weights))
+
+
+def test_attach_requires_learner_statistics(tmp_path):
+    model = StudentRatingModel()
+    state = SharedModelState(str(tmp_path / "state.bin"), model.weights)
+    with pytest.raises(ValueError):
+        model.attach_shared_state(state)
@@ -0,0 +1,163 @@
+"""Tests for the similarity index: exact top-k, exclusion, replacement and per-schema vectors"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from rating_schema import DEFAULT_SCHEMA, RatingSchema
+from similarity_index import (
+    SchemaSimilarityIndex, StudentSimilarityIndex, rating_vector, vector_fields
+)
+from student_rating import StudentRatingModel
+
+RIVERSIDE = RatingSchema.from_dict({
+    "name": "riverside",
+    "categories": [
+        {"key": "exam", "label": "Exam", "range": [0, 50], "weight": 0.6},
+        {"key": "projects", "label": "Projects", "range": [1, 5], "weight": 0.4,
+         "inputs": ["teamwork", "creativity"]}
+    ]
+})
+
+
+class Registry:
+    """Schema lookup with the default schema and RIVERSIDE"""
+
+    def get(self, name=None):
+        schemas = {None: DEFAULT_SCHEMA, "default": DEFAULT_SCHEMA, "riverside": RIVERSIDE}
+        if name not in schemas:
+            raise KeyError(name)
+        return schemas[name]
+
+
+def brute_force(vectors, ids, query, k, exclude=None):
+    distances = np.sqrt(((vectors.astype(float) - query) ** 2).sum(axis=1))
+    order = [i for i in np.argsort(distances, kind="stable") if ids[i] != exclude]
+    return [ids[i] for i in order[:k]], distances[order[:k]]
+
+
+@pytest.mark.parametrize("backend", StudentSimilarityIndex.BACKENDS)
+def test_top_k_matches_a_brute_force_scan(backend):
+    rng = np.random.default_rng(0)
+    vectors = rng.uniform(1, 100, (2000, len(DEFAULT_SCHEMA.columns))).astype(np.float32)
+    ids = [f"S{i}" for i in range(len(vectors))]
+    index = StudentSimilarityIndex(backend=backend, initial_capacity=16)
+    for student_id, vector in zip(ids, vectors):
+        index.add(student_id, vector)
+
+    for query in rng.uniform(1, 100, (20, vectors.shape[1])):
+        expected_ids, expected_distances = brute_force(vectors, ids, query, 10)
+        found = index.query(query, k=10)
+        assert [n["student_id"] for n in found] == expected_ids
+        assert [n["distance"] for n in found] == pytest.approx(expected_distances, abs=1e-2)
+
+
+def test_query_student_is_excluded():
+    index = StudentSimilarityIndex()
+    for i in range(5):
+        index.add(f"S{i}", np.full(index.dim, 10.0 * i))
+
+    found = index.query(np.full(index.dim, 20.0), k=3, exclude="S2")
+    assert [n["student_id"] for n in found] == ["S1", "S3", "S0"]
+    # k is still met when the excluded student is among the nearest
+    assert len(index.query(np.full(index.dim, 20.0), k=4, exclude="S2")) == 4
+
+
+def test_re_adding_a_student_replaces_their_vector():
+    index = StudentSimilarityIndex()
+    index.add("a", np.full(index.dim, 10.0), weak_category="Exam")
+    index.add("b", np.full(index.dim, 50.0))
+    index.add("a", np.full(index.dim, 90.0), weak_category="Skills")
+
+    assert len(index) == 2
+    nearest = index.query(np.full(index.dim, 95.0), k=2)
+    assert [n["student_id"] for n in nearest] == ["a", "b"]
+    assert nearest[0]["weak_category"] == "Skills"
+    assert index.query(np.full(index.dim, 10.0), k=1)[0]["student_id"] == "b"
+
+
+def test_remove_moves_the_last_row_into_place():
+    index = StudentSimilarityIndex()
+    for i in range(4):
+        index.add(f"S{i}", np.full(index.dim, 10.0 * i))
+
+    assert index.remove("S1")
+    assert not index.remove("S1")
+    assert len(index) == 3
+    assert index.query(np.full(index.dim, 30.0), k=1)[0]["student_id"] == "S3"
+    assert [n["student_id"] for n in index.query(np.full(index.dim, 0.0), k=3)] == ["S0", "S2", "S3"]
+
+
+def test_concurrent_adds_and_queries():
+    index = StudentSimilarityIndex(initial_capacity=1)
+    errors = []
+
+    def writer(offset):
+        for i in range(500):
+            index.add(f"{offset}-{i}", np.full(index.dim, float(i % 100)))
+
+    def reader():
+        try:
+            for _ in range(500):
+                for neighbour in index.query(np.full(index.dim, 50.0), k=5):
+                    assert neighbour["distance"] >= 0
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    threads += [threading.Thread(target=reader) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(index) == 2000
+
+
+def test_vectors_follow_the_schema_columns():
+    model = StudentRatingModel()
+    ratings = model.compute_student_ratings(
+        {"student_id": "R1", "exam": 40, "projects": {"teamwork": 4, "creativity": 2}}, RIVERSIDE
+    )
+
+    assert vector_fields(RIVERSIDE) == ("Exam", "teamwork", "creativity")
+    assert vector_fields(DEFAULT_SCHEMA)[-3:] == ("problem_solving", "communication", "discipline")
+    vector = rating_vector(ratings, RIVERSIDE)
+    assert vector.tolist() == pytest.approx([
+        ratings["subcategories"]["Exam"],
+        ratings["subcategories"]["Projects"]["teamwork"],
+        ratings["subcategories"]["Projects"]["creativity"]
+    ])
+    with pytest.raises(ValueError):
+        StudentSimilarityIndex().add_ratings(ratings, schema=RIVERSIDE)
+
+
+def test_schema_indexes_keep_schemas_apart():
+    model = StudentRatingModel()
+    similarity = SchemaSimilarityIndex(Registry())
+    default = model.compute_student_ratings({"student_id": "D1", "exam": 70})
+    riverside = [
+        model.compute_student_ratings(
+            {"student_id": f"R{i}", "exam": 10 * i, "projects": {"teamwork": 3, "creativity": 3}}, RIVERSIDE
+        )
+        for i in range(1, 4)
+    ]
+
+    assert similarity.add_ratings(default, weak_category="Exam")
+    for ratings in riverside:
+        assert similarity.add_ratings(ratings)
+    assert not similarity.add_ratings(dict(default, schema="unknown"))
+
+    assert similarity.names() == ["default", "riverside"]
+    assert len(similarity) == 4
+    assert [n["student_id"] for n in similarity.query_ratings(riverside[0], k=5)] == ["R2", "R3"]
+    assert similarity.query_ratings(default) == []
+    assert similarity.query_ratings(dict(default, schema="unknown")) == []
+
+    rebuilt = SchemaSimilarityIndex.from_export(similarity.export(), schemas=Registry())
+    assert rebuilt.names() == ["default", "riverside"]
+    assert len(rebuilt.index("riverside")) == 3
+    assert similarity.remove("R2", "riverside")
+    assert [n["student_id"] for n in similarity.query_ratings(riverside[0], k=5)] == ["R3"]
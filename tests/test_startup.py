@@ -0,0 +1,40 @@
+"""Startup budget: API and webapp imports stay fast and leave heavy dependencies unloaded"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from startup_benchmark import (
+    API_HEAVY_MODULES, HEAVY_MODULES, check_budget, run_startup_benchmark
+)
+
+
+@pytest.fixture(scope="module")
+def startup():
+    return run_startup_benchmark(repeat=1, include_server=False)
+
+
+def test_imports_stay_within_the_startup_budget(startup):
+    assert "api_first_response" not in startup
+    assert check_budget(startup) == []
+
+
+def test_heavy_modules_are_not_imported_at_startup(startup):
+    assert {"groq", "sklearn", "pandas"} <= set(API_HEAVY_MODULES)
+    assert {"groq", "sklearn"} <= set(HEAVY_MODULES)
+    assert startup["api_heavy_loaded"] == []
+    assert startup["webapp_heavy_loaded"] == []
+
+
+def test_check_budget_reports_slow_imports_and_heavy_modules(monkeypatch):
+    monkeypatch.delenv("STARTUP_BUDGET_IMPORT", raising=False)
+    results = {"api_import": 99.0, "api_heavy_loaded": ["pandas"],
+               "webapp_import": 0.1, "webapp_heavy_loaded": []}
+
+    violations = check_budget(results)
+    assert len(violations) == 2
+    assert violations[0].startswith("api_import: 99.00s exceeds budget")
+    assert violations[1] == "api_heavy_loaded: pandas imported at startup"
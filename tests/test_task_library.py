@@ -0,0 +1,98 @@
+"""Tests for the task library: dedup, serving rotation and merge-on-save"""
+
+import pytest
+
+from task_library import TaskLibrary
+
+
+def make_task(n, category="Exam"):
+    return {"title": f"Task {n}", "description": f"Do thing {n}", "category": category,
+            "difficulty": "Easy", "task_id": n, "status": "pending"}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "task_library.json")
+
+
+def test_same_task_is_stored_once(path):
+    library = TaskLibrary(path)
+    assert library.add(make_task(1), "Exam")
+    assert not library.add(dict(make_task(1), task_id=9), "Skills")
+    assert len(library) == 1
+    assert library.find(weak_area="Skills")[0]["weak_areas"] == ["Exam", "Skills"]
+
+
+def test_serve_rotates_least_served_first(path):
+    library = TaskLibrary(path)
+    library.add_many([make_task(i) for i in range(3)], "Exam")
+    first = {t["title"] for t in library.serve("Exam", ["Exam"], 2)}
+    second = {t["title"] for t in library.serve("Exam", ["Exam"], 2)}
+    assert "Task 2" not in first and "Task 2" in second
+    assert library.serve("Exam", [], 4) is None
+
+
+def test_serve_counts_survive_reload(path):
+    library = TaskLibrary(path)
+    library.add_many([make_task(i) for i in range(2)], "Exam")
+    library.serve("Exam", [], 1)
+    assert library.dirty
+    library.save()
+    assert not library.dirty
+
+    reloaded = TaskLibrary(path)
+    assert sorted(t["times_served"] for t in reloaded.tasks.values()) == [0, 1]
+
+
+def test_save_merges_other_writers(path):
+    a, b = TaskLibrary(path), TaskLibrary(path)
+    a.add(make_task(1), "Exam")
+    a.save()
+    b.add(make_task(2), "Skills")
+    b.save()
+    # b's save keeps a's task and b now sees it too
+    assert len(b) == 2
+    assert len(TaskLibrary(path)) == 2
+
+    # Serve counts from both writers add up
+    a.load()
+    a.serve("Exam", [], 1)
+    b.serve("Exam", [], 1)
+    a.save()
+    b.save()
+    task_hash = TaskLibrary.task_hash(make_task(1))
+    assert TaskLibrary(path).tasks[task_hash]["times_served"] == 2
+
+
+def test_shared_returns_one_instance_per_file(path, tmp_path):
+    assert TaskLibrary.shared(path) is TaskLibrary.shared(path)
+    assert TaskLibrary.shared(path) is not TaskLibrary.shared(str(tmp_path / "other.json"))
+
+
+def test_serve_counts_are_saved_periodically_not_per_plan(path):
+    library = TaskLibrary(path)
+    library.add_many([make_task(i) for i in range(2)], "Exam")
+    # New tasks are saved right away
+    assert library.save_if_due()
+
+    library.serve("Exam", [], 1)
+    assert not library.save_if_due(interval=60)
+    assert library.dirty
+    assert sum(t["times_served"] for t in TaskLibrary(path).tasks.values()) == 0
+
+    assert library.save_if_due(interval=0)
+    assert not library.dirty
+    assert sum(t["times_served"] for t in TaskLibrary(path).tasks.values()) == 1
+    assert not library.save_if_due(interval=0)
+
+
+def test_flush_shared_saves_pending_serve_counts(path, monkeypatch):
+    monkeypatch.setattr(TaskLibrary, "_shared", {})
+    library = TaskLibrary.shared(path)
+    library.add_many([make_task(i) for i in range(2)], "Exam")
+    library.save()
+    library.serve("Exam", [], 2)
+
+    TaskLibrary.flush_shared()
+    assert not library.dirty
+    assert sum(t["times_served"] for t in TaskLibrary(path).tasks.values()) == 2
@@ -0,0 +1,63 @@
+"""Tests for tier banding: inclusive lower bounds and batch/scalar agreement"""
+
+import numpy as np
+import pytest
+
+from tiers import TierClassifier, DEFAULT_TIERS, default_classifier
+
+
+@pytest.mark.parametrize("rating, expected", [
+    (0, "NEEDS IMPROVEMENT"),
+    (-5, "NEEDS IMPROVEMENT"),
+    (49.999, "NEEDS IMPROVEMENT"),
+    (50, "DEVELOPING"),
+    (64.999, "DEVELOPING"),
+    (65, "GOOD"),
+    (74.999, "GOOD"),
+    (75, "EXCELLENT"),
+    (84.999, "EXCELLENT"),
+    (85, "ELITE"),
+    (100, "ELITE"),
+])
+def test_lower_bounds_are_inclusive(rating, expected):
+    assert default_classifier.classify(rating).name == expected
+
+
+def test_batch_matches_scalar_and_histogram():
+    ratings = np.array([0, 49.999, 50, 65, 74.999, 75, 85, 100, 50, 85])
+    indices = default_classifier.classify_batch(ratings)
+
+    assert [default_classifier.tiers[i].name for i in indices] == [
+        default_classifier.classify(r).name for r in ratings
+    ]
+    expected = {"NEEDS IMPROVEMENT": 2, "DEVELOPING": 2, "GOOD": 2, "EXCELLENT": 1, "ELITE": 3}
+    assert default_classifier.histogram(ratings) == expected
+    assert default_classifier.histogram(np.sort(ratings), assume_sorted=True) == expected
+
+
+def test_describe_upper_bounds_are_next_lower_bounds():
+    table = default_classifier.describe()
+    assert [row["min_rating"] for row in table] == [t.min_rating for t in DEFAULT_TIERS]
+    assert [row["upper_bound"] for row in table] == [50.0, 65.0, 75.0, 85.0, None]
+
+
+def test_custom_thresholds():
+    classifier = TierClassifier.from_thresholds([40, 60, 70, 90])
+    assert classifier.classify(40).name == "DEVELOPING"
+    assert classifier.classify(89.9).name == "EXCELLENT"
+    assert classifier.classify(90).name == "ELITE"
+
+    with pytest.raises(ValueError):
+        TierClassifier.from_thresholds([60, 50, 70, 90])
+    with pytest.raises(ValueError):
+        TierClassifier.from_thresholds([50, 65, 75])
+
+
+def test_api_labels_keep_the_original_lowest_tier_string():
+    from tiers import api_classifier
+
+    assert api_classifier.label(10) == "NEEDS IMPROVEMENT"
+    assert default_classifier.label(10) == "NEEDS IMPROVEMENT ⚠️"
+    assert list(api_classifier.labels_batch([10, 50, 90])) == ["NEEDS IMPROVEMENT", "DEVELOPING", "ELITE ⭐⭐⭐"]
+    assert api_classifier.names == default_classifier.names
+    assert [t["label"] for t in api_classifier.describe()][1:] == [t.label for t in DEFAULT_TIERS[1:]]
@@ -6,21 +6,31 @@ FIFA-style student performance analysis with interactive UI
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
 import os
 import sys
-import pickle
 from datetime import datetime
-import json
+from contextlib import nullcontext
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+from lazy_imports import lazy_import
+
+# Charts load plotly on first use
+go = lazy_import("plotly.graph_objects")
+px = lazy_import("plotly.express")
+
 from student_rating import StudentRatingModel
 from csv_processor import CSVReportProcessor
 from improvement_model import StudentImprovementModel
 from prediction_model import StudentPredictionModel
+from leaderboard import StudentLeaderboard
+from tiers import default_classifier as tier_classifier
+from sensitivity import SensitivityAnalyzer
+from groq_client import GroqSuggestionGenerator
+from model_artifacts import load_model
+import profiling
+from export_log import SegmentLog
 
 # Page configuration
 st.set_page_config(
@@ -35,10 +45,44 @@ if 'rating_model' not in st.session_state:
     st.session_state.rating_model = StudentRatingModel()
 if 'csv_processor' not in st.session_state:
     st.session_state.csv_processor = CSVReportProcessor()
+# Saved models: memory-mapped artifacts (models/<name>/), legacy pickles as fallback
 if 'improvement_model' not in st.session_state:
-    st.session_state.improvement_model = StudentImprovementModel()
+    st.session_state.improvement_model = load_model(StudentImprovementModel) or StudentImprovementModel()
 if 'prediction_model' not in st.session_state:
-    st.session_state.prediction_model = StudentPredictionModel()
+    st.session_state.prediction_model = load_model(StudentPredictionModel) or StudentPredictionModel()
+if 'leaderboard' not in st.session_state:
+    st.session_state.leaderboard = StudentLeaderboard()
+
+# Exports (analysis, plans, predictions) are appended to logs/exports/*.jsonl
+export_log = SegmentLog()
+
+
+def render_ai_suggestions(student_id, ratings, weak_category, recommendation, all_scores):
+    """Stream the Groq improvement plan into the page as it is generated"""
+    if 'suggestion_generator' not in st.session_state:
+        st.session_state.suggestion_generator = GroqSuggestionGenerator()
+    
+    with st.expander("🤖 AI Improvement Suggestions", expanded=True):
+        st.write_stream(
+            st.session_state.suggestion_generator.stream_improvement_plan(
+                student_id, ratings, weak_category, recommendation, all_scores
+            )
+        )
+
+
+def analysis_profile(label):
+    """Profile session for an analysis run when the sidebar toggle is on"""
+    return profiling.profile_session(label) if profile_analysis else nullcontext()
+
+
+def render_profile(profile):
+    """Show the hot spots of a profiled analysis run"""
+    if profile is None:
+        return
+    summary = profile.summary()
+    with st.expander(f"🔬 Profile ({summary['total_seconds']:.3f}s profiled)", expanded=False):
+        st.caption(f"Saved to {profile.path}")
+        st.dataframe(pd.DataFrame(summary["top"]), use_container_width=True)
 
 # Custom CSS
 st.markdown("""
@@ -77,18 +121,26 @@ with st.sidebar:
     groq_available = os.environ.get("GROQ_API_KEY") is not None
     if groq_available:
         st.success("✅ AI Features Active")
+        stream_ai = st.checkbox("🤖 Stream AI suggestions with results", value=True)
     else:
+        stream_ai = False
         st.info("ℹ️ AI Features: Set GROQ_API_KEY for advanced suggestions")
     
+    # Admins (STUDENT_RATING_ADMIN_TOKEN set) can profile analysis runs
+    profile_analysis = False
+    if profiling.profiling_available() and st.checkbox("🔬 Profile analysis"):
+        admin_token = st.text_input("Admin token", type="password")
+        profile_analysis = profiling.is_authorized(admin_token)
+        if admin_token and not profile_analysis:
+            st.error("Invalid admin token")
+    
     st.markdown("---")
     st.markdown("### 📊 Rating Tiers")
-    st.markdown("""
-    - 85-100: **ELITE** ⭐⭐⭐
-    - 75-84: **EXCELLENT** ⭐⭐
-    - 65-74: **GOOD** ⭐
-    - 50-64: **DEVELOPING**
-    - 0-49: **NEEDS IMPROVEMENT** ⚠️
-    """)
+    st.markdown("\n".join(
+        f"- {t['min_rating']:g}-{t['upper_bound'] - 1 if t['upper_bound'] else 100:g}: "
+        f"**{t['name']}** {t['label'][len(t['name']):].strip()}"
+        for t in reversed(tier_classifier.describe())
+    ))
 
 # Main content area
 if mode == "Upload CSV":
@@ -130,38 +182,27 @@ if mode == "Upload CSV":
                             # Extract student name from filename
                             student_name = selected_file.replace('.csv', '')
                             
-                            # Process CSV
-                            student_data = st.session_state.csv_processor.process_student_csv(
-                                file_path, student_name
-                            )
-                            
-                            # Calculate ratings
-                            ratings = st.session_state.rating_model.compute_student_ratings(student_data)
-                            
-                            # Get recommendations
-                            weak_category, recommendation, all_scores = st.session_state.rating_model.recommend_improvement(ratings)
+                            with analysis_profile(f"webapp upload {student_name}") as profile:
+                                # Process CSV
+                                student_data = st.session_state.csv_processor.process_student_csv(
+                                    file_path, student_name
+                                )
+                                
+                                # Calculate ratings
+                                ratings = st.session_state.rating_model.compute_student_ratings(student_data)
+                                st.session_state.leaderboard.update(ratings)
+                                
+                                # Get recommendations
+                                weak_category, recommendation, all_scores = st.session_state.rating_model.recommend_improvement(ratings)
                             
                             # Display results
                             st.success("✅ Analysis Complete!")
+                            render_profile(profile)
                             st.markdown("---")
                             
                             # Overall rating
                             overall = ratings["overall_rating"]
-                            if overall >= 85:
-                                tier = "ELITE ⭐⭐⭐"
-                                color = "#28a745"
-                            elif overall >= 75:
-                                tier = "EXCELLENT ⭐⭐"
-                                color = "#17a2b8"
-                            elif overall >= 65:
-                                tier = "GOOD ⭐"
-                                color = "#ffc107"
-                            elif overall >= 50:
-                                tier = "DEVELOPING"
-                                color = "#fd7e14"
-                            else:
-                                tier = "NEEDS IMPROVEMENT ⚠️"
-                                color = "#dc3545"
+                            tier = tier_classifier.classify(overall)
                             
                             col1, col2, col3 = st.columns(3)
                             with col1:
@@ -169,7 +210,7 @@ if mode == "Upload CSV":
                             with col2:
                                 st.metric("Overall Rating", f"{overall:.1f}/100")
                             with col3:
-                                st.markdown(f"<h3 style='color: {color};'>{tier}</h3>", unsafe_allow_html=True)
+                                st.markdown(f"<h3 style='color: {tier.color};'>{tier.label}</h3>", unsafe_allow_html=True)
                             
                             st.markdown("---")
                             
@@ -233,6 +274,9 @@ if mode == "Upload CSV":
                             st.warning(f"**Weakest Area:** {weak_category}")
                             st.info(f"**Recommendation:** {recommendation}")
                             
+                            if stream_ai:
+                                render_ai_suggestions(student_name, ratings, weak_category, recommendation, all_scores)
+                            
                             # Generate Improvement Plan
                             with st.expander("📋 View Detailed Improvement Plan", expanded=False):
                                 teacher_input = st.text_area(
@@ -251,7 +295,8 @@ if mode == "Upload CSV":
                                                 rating_recommendation=recommendation,
                                                 teacher_suggestion=teacher_suggestion,
                                                 weak_category=weak_category,
-                                                num_tasks=5
+                                                num_tasks=5,
+                                                ratings=ratings
                                             )
                                             
                                             st.success("✅ Improvement Plan Generated!")
@@ -290,13 +335,20 @@ if mode == "Upload CSV":
                                                     st.markdown(f"**Expected Impact:** {task['expected_impact']}")
                                                     st.markdown("")
                                             
+                                            # Similar past students
+                                            if improvement_plan.get('similar_students'):
+                                                st.markdown("---")
+                                                st.markdown("### 👥 Similar Students")
+                                                for peer in improvement_plan['similar_students']:
+                                                    task_titles = ", ".join(t['title'] for t in peer['tasks']) or "No tasks recorded"
+                                                    st.markdown(f"- **{peer['student_id']}** (distance {peer['distance']:.1f}, weakest: {peer['weak_category']}): {task_titles}")
+                                            
                                             # Save plan
-                                            os.makedirs("logs", exist_ok=True)
-                                            plan_filename = f"logs/improvement_plan_{student_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                                            with open(plan_filename, 'w') as f:
-                                                json.dump(improvement_plan, f, indent=2)
+                                            plan_segment = export_log.append(
+                                                "improvement_plan", improvement_plan, student_id=student_name
+                                            )
                                             
-                                            st.success(f"💾 Plan saved to: {plan_filename}")
+                                            st.success(f"💾 Plan saved to: {plan_segment}")
                                             
                                         except Exception as e:
                                             st.error(f"Error generating improvement plan: {e}")
@@ -405,11 +457,11 @@ if mode == "Upload CSV":
                                             )
                                             
                                             # Save predictions
-                                            pred_filename = f"logs/predictions_{student_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                                            with open(pred_filename, 'w') as f:
-                                                json.dump(predictions, f, indent=2)
+                                            pred_segment = export_log.append(
+                                                "predictions", predictions, student_id=student_name
+                                            )
                                             
-                                            st.success(f"💾 Predictions saved to: {pred_filename}")
+                                            st.success(f"💾 Predictions saved to: {pred_segment}")
                                             
                                         except Exception as e:
                                             st.error(f"Error generating predictions: {e}")
@@ -426,13 +478,10 @@ if mode == "Upload CSV":
                                     "recommendation": recommendation
                                 }
                                 
-                                # Save to logs
-                                os.makedirs("logs", exist_ok=True)
-                                filename = f"logs/analysis_{student_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                                with open(filename, 'w') as f:
-                                    json.dump(results, f, indent=2)
+                                # Append to the export log (one JSON line per export)
+                                segment = export_log.append("analysis", results, student_id=student_name)
                                 
-                                st.success(f"✅ Results saved to: {filename}")
+                                st.success(f"✅ Results saved to: {segment}")
                     
                     except Exception as e:
                         st.error(f"❌ Error processing file: {e}")
@@ -484,27 +533,74 @@ elif mode == "Manual Entry":
         
         # Calculate ratings
         ratings = st.session_state.rating_model.compute_student_ratings(student_data)
+        st.session_state.leaderboard.update(ratings)
         weak_category, recommendation, all_scores = st.session_state.rating_model.recommend_improvement(ratings)
         
         # Display results (same as above)
         st.success("✅ Analysis Complete!")
         overall = ratings["overall_rating"]
         
-        if overall >= 85:
-            tier = "ELITE ⭐⭐⭐"
-        elif overall >= 75:
-            tier = "EXCELLENT ⭐⭐"
-        elif overall >= 65:
-            tier = "GOOD ⭐"
-        elif overall >= 50:
-            tier = "DEVELOPING"
-        else:
-            tier = "NEEDS IMPROVEMENT ⚠️"
-        
-        st.markdown(f"### Overall Rating: {overall:.1f}/100 - {tier}")
+        st.markdown(f"### Overall Rating: {overall:.1f}/100 - {tier_classifier.label(overall)}")
         st.warning(f"**Weakest Area:** {weak_category}")
         st.info(f"**Recommendation:** {recommendation}")
 
+        # What-if analysis: the whole perturbation grid is rated in one batch
+        # and drawn as a single figure, so exploring it needs no reruns
+        st.subheader("🔮 What-if Analysis")
+        what_if = SensitivityAnalyzer(st.session_state.rating_model).analyze(student_data)
+        next_tier = what_if["next_tier"]
+
+        fig = go.Figure()
+        for item in what_if["inputs"]:
+            fig.add_trace(go.Scatter(
+                x=item["offsets"],
+                y=item["ratings"],
+                customdata=item["values"],
+                mode="lines+markers",
+                name=item["label"],
+                hovertemplate=f"{item['label']} = %{{customdata:g}}<br>Rating: %{{y:.2f}}<extra></extra>"
+            ))
+        if next_tier:
+            fig.add_hline(
+                y=next_tier["min_rating"], line_dash="dash",
+                annotation_text=f"{next_tier['tier']} ({next_tier['min_rating']:g})"
+            )
+        fig.update_layout(
+            title="Overall Rating vs. Input Change",
+            xaxis_title="Steps from current value (±5 on percentages, ±1 on 1-10 scales)",
+            yaxis_title="Overall Rating"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        effects = pd.DataFrame([
+            {
+                "Input": item["label"],
+                "Current": item["value"],
+                "Step": item["step"],
+                "+1 Step": item["effect_up"],
+                "-1 Step": item["effect_down"]
+            }
+            for item in what_if["inputs"]
+        ]).sort_values("+1 Step", ascending=False)
+        st.dataframe(effects, use_container_width=True, hide_index=True)
+
+        if next_tier is None:
+            st.success(f"Already in the top tier ({what_if['base_tier']})")
+        elif not next_tier["reachable"]:
+            st.warning(f"{next_tier['tier']} is out of reach even with every input at its maximum")
+        else:
+            labels = {item["name"]: item["label"] for item in what_if["inputs"]}
+            changes = ", ".join(
+                f"{labels[c['name']]} {c['from']:g} → {c['to']:g}" for c in next_tier["changes"]
+            )
+            st.info(
+                f"**Fastest path to {next_tier['tier']}** ({next_tier['total_steps']} steps, "
+                f"rating {next_tier['rating']:.2f}): {changes}"
+            )
+
+        if stream_ai:
+            render_ai_suggestions(student_id, ratings, weak_category, recommendation, all_scores)
+
 elif mode == "Batch Analysis":
     st.header("📊 Batch Analysis - Compare Multiple Students")
     
@@ -522,7 +618,8 @@ elif mode == "Batch Analysis":
             if selected_files and st.button("🔍 Analyze Selected Students", type="primary"):
                 results = []
                 
-                with st.spinner("Processing students..."):
+                with st.spinner("Processing students..."), \
+                        analysis_profile(f"webapp batch {len(selected_files)} files") as profile:
                     for file in selected_files:
                         try:
                             file_path = os.path.join(data_folder, file)
@@ -532,6 +629,7 @@ elif mode == "Batch Analysis":
                                 file_path, student_name
                             )
                             ratings = st.session_state.rating_model.compute_student_ratings(student_data)
+                            st.session_state.leaderboard.update(ratings)
                             
                             results.append({
                                 'Student': student_name,
@@ -547,14 +645,41 @@ elif mode == "Batch Analysis":
                 
                 if results:
                     st.success(f"✅ Analyzed {len(results)} students")
+                    render_profile(profile)
                     
                     # Create comparison DataFrame
                     df = pd.DataFrame(results)
+                    df.insert(2, 'Tier', tier_classifier.labels_batch(df['Overall']))
                     
-                    # Rankings
+                    # Rankings within this batch; the session rank also counts
+                    # every student rated earlier in this session
                     st.subheader("🏆 Rankings")
-                    df_sorted = df.sort_values('Overall', ascending=False)
-                    st.dataframe(df_sorted, use_container_width=True)
+                    batch_board = StudentLeaderboard()
+                    for name, overall in zip(df['Student'], df['Overall']):
+                        batch_board.add(name, overall)
+                    standings = [batch_board.get(name) for name in df['Student']]
+                    df_ranked = df.assign(
+                        Rank=[standing['rank'] for standing in standings],
+                        Percentile=[standing['percentile'] for standing in standings],
+                        **{'Session Rank': [
+                            f"{st.session_state.leaderboard.get(name)['rank']} / {len(st.session_state.leaderboard)}"
+                            for name in df['Student']
+                        ]}
+                    ).set_index('Rank').sort_index()
+                    st.dataframe(df_ranked, use_container_width=True)
+                    st.caption("Rank and percentile are within the selected students; "
+                               "Session Rank is among all students rated in this session.")
+                    
+                    # Tier distribution (one vectorized pass over the cohort)
+                    tier_counts = tier_classifier.histogram(df['Overall'])
+                    tier_colors = {t.name: t.color for t in tier_classifier.tiers}
+                    fig_tiers = go.Figure(go.Bar(
+                        x=list(tier_counts),
+                        y=list(tier_counts.values()),
+                        marker_color=[tier_colors[name] for name in tier_counts]
+                    ))
+                    fig_tiers.update_layout(title="Tier Distribution", yaxis_title="Students")
+                    st.plotly_chart(fig_tiers, use_container_width=True)
                     
                     # Comparison chart
                     st.subheader("📈 Performance Comparison")